@@ -0,0 +1,120 @@
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+from pytest_freezegun import freeze_time
+
+from tests.caches.test_instrument_cache import gen_instruments_response
+from tinkoff.invest import (
+    Bond,
+    BondsResponse,
+    CurrenciesResponse,
+    Currency,
+    Etf,
+    EtfsResponse,
+    Future,
+    FuturesResponse,
+    InstrumentIdType,
+    Share,
+    SharesResponse,
+)
+from tinkoff.invest.async_services import InstrumentsService
+from tinkoff.invest.caching.instruments_cache.async_instruments_cache import (
+    AsyncInstrumentsCache,
+)
+from tinkoff.invest.caching.instruments_cache.settings import InstrumentsCacheSettings
+
+INSTRUMENT_METHODS = {
+    "shares": (SharesResponse, Share),
+    "futures": (FuturesResponse, Future),
+    "etfs": (EtfsResponse, Etf),
+    "bonds": (BondsResponse, Bond),
+    "currencies": (CurrenciesResponse, Currency),
+}
+
+
+@pytest.fixture()
+def instruments_service(mocker) -> InstrumentsService:
+    service = mocker.Mock(spec=InstrumentsService)
+    for method_name, (response_type, type_) in INSTRUMENT_METHODS.items():
+        response = gen_instruments_response(response_type, type_)
+
+        async def _get_instruments(*args, response=response, **kwargs):
+            await asyncio.sleep(0)
+            return response
+
+        method = AsyncMock(side_effect=_get_instruments)
+        method.__name__ = method_name
+        setattr(service, method_name, method)
+    return service
+
+
+@pytest.fixture()
+def settings() -> InstrumentsCacheSettings:
+    return InstrumentsCacheSettings(ttl=timedelta(seconds=1))
+
+
+@pytest.fixture()
+def frozen_datetime():
+    with freeze_time() as frozen_datetime:
+        yield frozen_datetime
+
+
+@pytest.fixture()
+def instruments_cache(
+    settings: InstrumentsCacheSettings,
+    instruments_service: InstrumentsService,
+    frozen_datetime,
+) -> AsyncInstrumentsCache:
+    return AsyncInstrumentsCache(
+        settings=settings, instruments_service=instruments_service
+    )
+
+
+class TestAsyncInstrumentsCache:
+    async def test_refresh_loads_all_types(
+        self,
+        instruments_cache: AsyncInstrumentsCache,
+        instruments_service: InstrumentsService,
+    ):
+        await instruments_cache.refresh()
+        shares = await instruments_cache.shares()
+
+        for method_name in INSTRUMENT_METHODS:
+            getattr(instruments_service, method_name).assert_awaited_once()
+        assert shares.instruments
+
+    async def test_deduplicates_concurrent_misses(
+        self,
+        instruments_cache: AsyncInstrumentsCache,
+        instruments_service: InstrumentsService,
+    ):
+        share = (await instruments_service.shares()).instruments[0]
+        instruments_service.shares.reset_mock()
+
+        results = await asyncio.gather(
+            *(
+                instruments_cache.share_by(
+                    id_type=InstrumentIdType.INSTRUMENT_ID_TYPE_UID,
+                    class_code=share.class_code,
+                    id=share.uid,
+                )
+                for _ in range(10)
+            )
+        )
+
+        instruments_service.shares.assert_awaited_once()
+        assert all(result.instrument is share for result in results)
+
+    async def test_refreshes_on_ttl(
+        self,
+        instruments_cache: AsyncInstrumentsCache,
+        instruments_service: InstrumentsService,
+        frozen_datetime,
+    ):
+        await instruments_cache.bonds()
+        frozen_datetime.tick(timedelta(seconds=10))
+        await instruments_cache.bonds()
+
+        assert instruments_service.bonds.await_count == 2
@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from tinkoff.invest import (
+    MoneyValue,
+    Quotation,
+    SecurityTradingStatus,
+    Share,
+    SharesResponse,
+)
+from tinkoff.invest._grpc_helpers import protobuf_to_dataclass
+from tinkoff.invest.caching.instruments_cache.columnar_store import (
+    ColumnarInstrumentStore,
+)
+from tinkoff.invest.grpc import instruments_pb2
+
+
+def make_share(ticker: str, currency: str, exchange: str, lot: int) -> Share:
+    share = protobuf_to_dataclass(instruments_pb2.Share(), Share)
+    share.ticker = ticker
+    share.figi = f"FIGI-{ticker}"
+    share.uid = f"uid-{ticker}"
+    share.currency = currency
+    share.exchange = exchange
+    share.lot = lot
+    share.klong = Quotation(units=2, nano=500_000_000)
+    share.nominal = MoneyValue(currency=currency, units=-1, nano=-250_000_000)
+    share.ipo_date = datetime(2020, 5, 17, 10, 30, tzinfo=timezone.utc)
+    share.trading_status = SecurityTradingStatus.SECURITY_TRADING_STATUS_NORMAL_TRADING
+    share.required_tests = ["test"]
+    return share
+
+
+@pytest.fixture()
+def shares():
+    return [
+        make_share("SBER", "rub", "MOEX", 10),
+        make_share("GAZP", "rub", "MOEX", 10),
+        make_share("AAPL", "usd", "SPB", 1),
+        make_share("YNDX", "rub", "MOEX_PLUS", 1),
+    ]
+
+
+@pytest.fixture()
+def store(shares):
+    return ColumnarInstrumentStore.from_instruments_response(
+        SharesResponse(instruments=shares)
+    )
+
+
+class TestColumnarInstrumentStore:
+    def test_materializes_rows(self, store, shares):
+        assert len(store) == len(shares)
+        assert store.instrument_type is Share
+        for row, share in enumerate(shares):
+            assert str(store[row]) == str(share)
+        assert store[-1].ticker == "YNDX"
+
+    def test_filters_by_equality_and_collections(self, store):
+        rub = store.filter(currency="rub", exchange=["MOEX", "SPB"])
+        single_lot = store.filter(lot=1)
+        missing = store.filter(currency="eur")
+
+        assert [share.ticker for share in rub] == ["SBER", "GAZP"]
+        assert [share.ticker for share in single_lot] == ["AAPL", "YNDX"]
+        assert missing == []
+
+    def test_filters_by_vectorized_mask(self, store):
+        mask = store.column("lot") > 5
+
+        assert [share.ticker for share in store.filter(mask, currency="rub")] == [
+            "SBER",
+            "GAZP",
+        ]
+
+    def test_filters_money_and_quotation(self, store):
+        assert len(store.filter(klong=Quotation(units=2, nano=500_000_000))) == 4
+        assert len(store.filter(nominal=MoneyValue("usd", -1, -250_000_000))) == 1
+
+    def test_stores_strings_once(self, store):
+        assert store.column("currency").tolist() == ["rub", "rub", "usd", "rub"]
+        assert store.nbytes < sum(len(str(share)) for share in store)
+
+    def test_filters_quotation_by_decimal(self, store):
+        assert len(store.filter(klong=Decimal("2.5"))) == 4
+        assert len(store.filter(nominal=Decimal("-1.25"))) == 4
+
+    def test_counts_encoded_string_bytes(self):
+        latin = ColumnarInstrumentStore.from_instruments_response(
+            SharesResponse(instruments=[make_share("SBER", "rub", "MOEX", 1)])
+        )
+        cyrillic = ColumnarInstrumentStore.from_instruments_response(
+            SharesResponse(instruments=[make_share("СБЕР", "rub", "MOEX", 1)])
+        )
+
+        assert cyrillic.nbytes - latin.nbytes == 3 * len("СБЕР")
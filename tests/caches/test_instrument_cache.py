@@ -1,8 +1,13 @@
+import copy
+import dataclasses
 import random
+import threading
+import time
 import uuid
 from datetime import timedelta
+from pathlib import Path
 from typing import Any, Callable, Dict, Iterator, Type
-from unittest.mock import Mock
+from unittest.mock import DEFAULT, Mock
 
 import pytest
 from pytest_freezegun import freeze_time
@@ -18,18 +23,27 @@ from tinkoff.invest import (
     Etf,
     EtfResponse,
     EtfsResponse,
+    FindInstrumentResponse,
     Future,
     FutureResponse,
     FuturesResponse,
     InstrumentIdType,
+    InstrumentType,
     Share,
     ShareResponse,
     SharesResponse,
 )
+from tinkoff.invest.caching.instruments_cache.instrument_index import InstrumentIndex
 from tinkoff.invest.caching.instruments_cache.instruments_cache import InstrumentsCache
 from tinkoff.invest.caching.instruments_cache.models import InstrumentsResponse
 from tinkoff.invest.caching.instruments_cache.settings import InstrumentsCacheSettings
+from tinkoff.invest.caching.instruments_cache.snapshot import (
+    InstrumentsCacheSnapshot,
+    load_snapshot,
+    save_snapshot,
+)
 from tinkoff.invest.services import Services
+from tinkoff.invest.utils import now
 
 
 def uid() -> str:
@@ -273,3 +287,342 @@ class TestInstrumentCache:
         )
 
         get_instruments.assert_called_once()
+
+
+def get_instruments_methods(services: Services):
+    return [
+        services.instruments.shares,
+        services.instruments.futures,
+        services.instruments.etfs,
+        services.instruments.bonds,
+        services.instruments.currencies,
+    ]
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Condition was not met in time"
+        time.sleep(0.01)
+
+
+class TestInstrumentCacheSnapshot:
+    @pytest.fixture()
+    def settings(self, tmp_path: Path) -> InstrumentsCacheSettings:
+        return InstrumentsCacheSettings(snapshot_path=tmp_path / "instruments")
+
+    def test_loads_from_snapshot_without_requests(
+        self,
+        mocked_services: Services,
+        settings: InstrumentsCacheSettings,
+        instrument_map,
+    ):
+        InstrumentsCache(
+            settings=settings, instruments_service=mocked_services.instruments
+        ).close()
+        assert settings.snapshot_path.exists()
+        for method in get_instruments_methods(mocked_services):
+            method.reset_mock()
+
+        instruments_cache = InstrumentsCache(
+            settings=settings, instruments_service=mocked_services.instruments
+        )
+        share = instrument_map[Share].instruments[0]
+        from_cache = instruments_cache.share_by(
+            id_type=InstrumentIdType.INSTRUMENT_ID_TYPE_FIGI,
+            class_code=share.class_code,
+            id=share.figi,
+        )
+        instruments_cache.close()
+
+        for method in get_instruments_methods(mocked_services):
+            method.assert_not_called()
+        assert from_cache.instrument.uid == share.uid
+        assert from_cache.instrument.name == share.name
+
+    def test_refreshes_expired_snapshot_in_background(
+        self,
+        mocked_services: Services,
+        settings: InstrumentsCacheSettings,
+        instrument_map,
+    ):
+        save_snapshot(
+            settings.snapshot_path,
+            InstrumentsCacheSnapshot(
+                created_at=now() - 2 * settings.ttl,
+                ttl=settings.ttl,
+                instruments_responses={
+                    "etfs": instrument_map[Etf],
+                    "shares": instrument_map[Share],
+                    "bonds": instrument_map[Bond],
+                    "currencies": instrument_map[Currency],
+                    "futures": instrument_map[Future],
+                },
+            ),
+        )
+
+        instruments_cache = InstrumentsCache(
+            settings=settings, instruments_service=mocked_services.instruments
+        )
+        wait_for(lambda: not load_snapshot(settings.snapshot_path).is_expired())
+        instruments_cache.close()
+
+        for method in get_instruments_methods(mocked_services):
+            method.assert_called_once()
+
+    def test_does_not_reschedule_refresh_after_close(
+        self,
+        mocked_services: Services,
+        settings: InstrumentsCacheSettings,
+    ):
+        instruments_cache = InstrumentsCache(
+            settings=settings, instruments_service=mocked_services.instruments
+        )
+        instruments_cache.close()
+        for method in get_instruments_methods(mocked_services):
+            method.reset_mock()
+
+        instruments_cache._refresh_snapshot()
+        instruments_cache._schedule_snapshot_refresh(delay=timedelta())
+
+        assert instruments_cache._refresh_timer is None
+        for method in get_instruments_methods(mocked_services):
+            method.assert_not_called()
+
+
+def test_refreshes_instrument_types_concurrently(
+    mocked_services: Services, settings: InstrumentsCacheSettings
+):
+    methods = get_instruments_methods(mocked_services)
+    barrier = threading.Barrier(len(methods))
+
+    def wait_for_all_requests(*args, **kwargs):
+        barrier.wait(timeout=5)
+        return DEFAULT
+
+    for method in methods:
+        method.side_effect = wait_for_all_requests
+
+    InstrumentsCache(settings=settings, instruments_service=mocked_services.instruments)
+
+    for method in methods:
+        method.assert_called_once()
+
+
+def test_returns_shared_read_only_instruments_response(
+    instruments_cache: InstrumentsCache,
+):
+    shares = instruments_cache.shares()
+
+    assert instruments_cache.shares() is shares
+    assert isinstance(shares, SharesResponse)
+    assert isinstance(shares.instruments, tuple)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        shares.instruments = []
+    assert isinstance(copy.copy(shares).instruments, list)
+
+
+class TestStaleWhileRevalidate:
+    @pytest.fixture()
+    def settings(self) -> InstrumentsCacheSettings:
+        return InstrumentsCacheSettings(
+            ttl=timedelta(seconds=1), stale_while_revalidate=True
+        )
+
+    def _share_by_uid(self, instruments_cache: InstrumentsCache, share: Share):
+        return instruments_cache.share_by(
+            id_type=InstrumentIdType.INSTRUMENT_ID_TYPE_UID,
+            class_code=share.class_code,
+            id=share.uid,
+        )
+
+    def test_serves_stale_storage_while_refreshing(
+        self,
+        mocked_services: Services,
+        settings: InstrumentsCacheSettings,
+        instruments_cache: InstrumentsCache,
+        instrument_map,
+        frozen_datetime,
+    ):
+        share = instrument_map[Share].instruments[0]
+        shares = mocked_services.instruments.shares
+        shares.reset_mock()
+        refresh_allowed = threading.Event()
+
+        def blocked_shares(*args, **kwargs):
+            refresh_allowed.wait(timeout=5)
+            return DEFAULT
+
+        shares.side_effect = blocked_shares
+        frozen_datetime.tick(timedelta(seconds=10))
+
+        from_stale = self._share_by_uid(instruments_cache, share)
+        self._share_by_uid(instruments_cache, share)
+        refresh_allowed.set()
+        wait_for(
+            lambda: instruments_cache.get_refresh_stats()["shares"].refresh_count == 2
+        )
+        instruments_cache.close()
+
+        assert from_stale.instrument.uid == share.uid
+        shares.assert_called_once()
+
+    def test_counts_refresh_failures(
+        self,
+        mocked_services: Services,
+        settings: InstrumentsCacheSettings,
+        instruments_cache: InstrumentsCache,
+        instrument_map,
+        frozen_datetime,
+    ):
+        share = instrument_map[Share].instruments[0]
+        mocked_services.instruments.shares.side_effect = ValueError("unavailable")
+        frozen_datetime.tick(timedelta(seconds=10))
+
+        from_stale = self._share_by_uid(instruments_cache, share)
+        wait_for(
+            lambda: instruments_cache.get_refresh_stats()["shares"].failure_count == 1
+        )
+        instruments_cache.close()
+
+        stats = instruments_cache.get_refresh_stats()["shares"]
+        assert from_stale.instrument.uid == share.uid
+        assert stats.refresh_count == 1
+        assert "unavailable" in stats.last_error
+
+
+class TestInstrumentIndex:
+    @pytest.mark.parametrize(
+        ("instrument_class", "instrument_type"),
+        [
+            (Share, InstrumentType.INSTRUMENT_TYPE_SHARE),
+            (Bond, InstrumentType.INSTRUMENT_TYPE_BOND),
+            (Etf, InstrumentType.INSTRUMENT_TYPE_ETF),
+            (Currency, InstrumentType.INSTRUMENT_TYPE_CURRENCY),
+            (Future, InstrumentType.INSTRUMENT_TYPE_FUTURES),
+        ],
+    )
+    def test_resolves_any_instrument_type(
+        self,
+        mocked_services: Services,
+        instruments_cache: InstrumentsCache,
+        instrument_map,
+        instrument_class: Type,
+        instrument_type: InstrumentType,
+    ):
+        instrument = instrument_map[instrument_class].instruments[0]
+        index = instruments_cache.get_instrument_index()
+        mocked_services.instruments.get_instrument_by = Mock()
+
+        by_figi = index.get(id=instrument.figi)
+        by_ticker = index.get(
+            id_type=InstrumentIdType.INSTRUMENT_ID_TYPE_TICKER,
+            class_code=instrument.class_code,
+            id=instrument.ticker,
+        )
+        found = index.find(instrument.uid)
+
+        assert by_figi is by_ticker is found
+        assert found.instrument is instrument
+        assert found.instrument_type == instrument_type
+        mocked_services.instruments.get_instrument_by.assert_not_called()
+
+    def test_replaces_one_instrument_type(self):
+        share, new_share = gen_instruments(Share, 2)
+        (bond,) = gen_instruments(Bond, 1)
+        index = InstrumentIndex(
+            {
+                InstrumentType.INSTRUMENT_TYPE_SHARE: [share],
+                InstrumentType.INSTRUMENT_TYPE_BOND: [bond],
+            }
+        )
+
+        replaced = index.replace(InstrumentType.INSTRUMENT_TYPE_SHARE, [new_share])
+
+        assert replaced.find(share.uid) is None
+        assert replaced.get(id=new_share.figi).instrument is new_share
+        assert replaced.find(bond.uid) is index.find(bond.uid)
+        assert index.find(share.uid).instrument is share
+        assert len(replaced) == len(index) == 2
+
+    def test_returns_none_for_unknown_id(self, instruments_cache: InstrumentsCache):
+        index = instruments_cache.get_instrument_index()
+
+        assert index.find(uid()) is None
+        with pytest.raises(KeyError):
+            index.get(id_type=InstrumentIdType.INSTRUMENT_ID_TYPE_UID, id=uid())
+
+
+class TestInstrumentSearch:
+    @pytest.fixture()
+    def instrument_map(self):
+        return {
+            Share: SharesResponse(
+                instruments=[
+                    Share(
+                        name="Sberbank",
+                        isin="RU0009029540",
+                        **{**gen_meta_ids(), "ticker": "SBER"},
+                    ),
+                    Share(
+                        name="Sberbank-p",
+                        isin="RU0009029557",
+                        **{**gen_meta_ids(), "ticker": "SBERP"},
+                    ),
+                    Share(
+                        name="Gazprom",
+                        isin="RU0007661625",
+                        **{**gen_meta_ids(), "ticker": "GAZP"},
+                    ),
+                ]
+            ),
+            Bond: gen_instruments_response(BondsResponse, Bond),
+            Etf: gen_instruments_response(EtfsResponse, Etf),
+            Currency: gen_instruments_response(CurrenciesResponse, Currency),
+            Future: gen_instruments_response(FuturesResponse, Future),
+        }
+
+    def test_finds_by_name_substring_and_isin(
+        self,
+        mocked_services: Services,
+        instruments_cache: InstrumentsCache,
+    ):
+        mocked_services.instruments.find_instrument = Mock()
+
+        by_name = instruments_cache.find_instrument(query="sber")
+        by_isin = instruments_cache.find_instrument(query="RU00076")
+        by_name_substring = instruments_cache.find_instrument(query="bank-p")
+
+        assert [i.name for i in by_name.instruments] == ["Sberbank", "Sberbank-p"]
+        assert [i.name for i in by_isin.instruments] == ["Gazprom"]
+        assert [i.name for i in by_name_substring.instruments] == ["Sberbank-p"]
+        mocked_services.instruments.find_instrument.assert_not_called()
+
+    def test_ranks_exact_ticker_first(
+        self, instruments_cache: InstrumentsCache, instrument_map
+    ):
+        share = instrument_map[Share].instruments[2]
+
+        found = instruments_cache.find_instrument(
+            query=share.ticker.upper(),
+            instrument_kind=InstrumentType.INSTRUMENT_TYPE_SHARE,
+        )
+
+        (first, *_) = found.instruments
+        assert first.uid == share.uid
+        assert first.instrument_kind == InstrumentType.INSTRUMENT_TYPE_SHARE
+
+    def test_falls_back_to_server(
+        self,
+        mocked_services: Services,
+        instruments_cache: InstrumentsCache,
+    ):
+        expected = FindInstrumentResponse(instruments=[])
+        mocked_services.instruments.find_instrument = Mock(return_value=expected)
+
+        found = instruments_cache.find_instrument(query="unknown query")
+
+        assert found is expected
+        mocked_services.instruments.find_instrument.assert_called_once_with(
+            query="unknown query", instrument_kind=None, api_trade_available_flag=None
+        )
@@ -0,0 +1,154 @@
+import asyncio
+import copy
+import dataclasses
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+from pytest_freezegun import freeze_time
+
+from tinkoff.invest import AssetsRequest, InstrumentStatus, InstrumentType
+from tinkoff.invest.async_services import InstrumentsService as AsyncInstrumentsService
+from tinkoff.invest.caching.reference_data_cache.async_cache import (
+    AsyncReferenceDataCache,
+)
+from tinkoff.invest.caching.reference_data_cache.cache import ReferenceDataCache
+from tinkoff.invest.caching.reference_data_cache.settings import (
+    ReferenceDataCacheSettings,
+)
+from tinkoff.invest.schemas import (
+    CountryResponse,
+    GetBondEventsRequest,
+    GetCountriesResponse,
+)
+from tinkoff.invest.services import InstrumentsService
+
+
+@pytest.fixture()
+def frozen_datetime():
+    with freeze_time() as frozen_datetime:
+        yield frozen_datetime
+
+
+@pytest.fixture()
+def settings() -> ReferenceDataCacheSettings:
+    return ReferenceDataCacheSettings(
+        ttl_by_method={"get_futures_margin": timedelta(minutes=1)},
+        default_ttl=timedelta(hours=1),
+        maxsize_per_method=2,
+    )
+
+
+@pytest.fixture()
+def instruments_service(mocker):
+    service = mocker.Mock(spec=InstrumentsService)
+    service.get_dividends.side_effect = lambda **kwargs: mocker.Mock()
+    service.get_assets.side_effect = lambda request: mocker.Mock()
+    return service
+
+
+@pytest.fixture()
+def reference_data_cache(settings, instruments_service, frozen_datetime):
+    return ReferenceDataCache(settings, instruments_service)
+
+
+class TestReferenceDataCache:
+    def test_caches_by_arguments(self, reference_data_cache, instruments_service):
+        from_ = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+        first = reference_data_cache.get_dividends(figi="figi", from_=from_)
+        second = reference_data_cache.get_dividends(figi="figi", from_=from_)
+        other = reference_data_cache.get_dividends(figi="other", from_=from_)
+
+        assert first is second
+        assert other is not first
+        assert instruments_service.get_dividends.call_count == 2
+
+    def test_caches_requests_by_value(self, reference_data_cache, instruments_service):
+        def request():
+            return AssetsRequest(
+                instrument_type=InstrumentType.INSTRUMENT_TYPE_BOND,
+                instrument_status=InstrumentStatus.INSTRUMENT_STATUS_BASE,
+            )
+
+        first = reference_data_cache.get_assets(request())
+        second = reference_data_cache.get_assets(request())
+
+        assert first is second
+        instruments_service.get_assets.assert_called_once()
+
+    def test_uses_ttl_per_method(
+        self, reference_data_cache, instruments_service, frozen_datetime
+    ):
+        reference_data_cache.get_futures_margin(figi="figi")
+        reference_data_cache.get_countries()
+        frozen_datetime.tick(timedelta(minutes=5))
+        reference_data_cache.get_futures_margin(figi="figi")
+        reference_data_cache.get_countries()
+
+        assert instruments_service.get_futures_margin.call_count == 2
+        instruments_service.get_countries.assert_called_once()
+
+    def test_bounds_entries_per_method(self, reference_data_cache, instruments_service):
+        for figi in ("a", "b", "c", "a"):
+            reference_data_cache.get_dividends(figi=figi)
+
+        assert instruments_service.get_dividends.call_count == 4
+
+    def test_returns_read_only_responses(
+        self, reference_data_cache, instruments_service
+    ):
+        instruments_service.get_countries.return_value = GetCountriesResponse(
+            countries=[CountryResponse(alfa_two="RU")]
+        )
+
+        countries = reference_data_cache.get_countries()
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            countries.countries = []
+        with pytest.raises(AttributeError):
+            countries.countries.append(CountryResponse(alfa_two="US"))
+        mutable_countries = copy.copy(countries).countries
+        assert isinstance(mutable_countries, list)
+        assert [country.alfa_two for country in mutable_countries] == ["RU"]
+
+    def test_keys_unbounded_trading_schedules_by_day(
+        self, reference_data_cache, instruments_service, frozen_datetime
+    ):
+        frozen_datetime.move_to(datetime(2023, 1, 1, 23, 30, tzinfo=timezone.utc))
+        reference_data_cache.trading_schedules(exchange="MOEX")
+        frozen_datetime.tick(timedelta(minutes=20))
+        reference_data_cache.trading_schedules(exchange="MOEX")
+        frozen_datetime.tick(timedelta(minutes=20))
+        reference_data_cache.trading_schedules(exchange="MOEX")
+
+        assert instruments_service.trading_schedules.call_count == 2
+
+    def test_proxies_other_methods(self, reference_data_cache, instruments_service):
+        reference_data_cache.shares()
+        reference_data_cache.shares()
+
+        assert instruments_service.shares.call_count == 2
+
+
+class TestAsyncReferenceDataCache:
+    async def test_deduplicates_concurrent_calls(self, mocker, settings):
+        service = mocker.Mock(spec=AsyncInstrumentsService)
+
+        async def get_bond_events(request):
+            await asyncio.sleep(0)
+            return mocker.Mock()
+
+        service.get_bond_events = AsyncMock(side_effect=get_bond_events)
+        cache = AsyncReferenceDataCache(settings, service)
+
+        responses = await asyncio.gather(
+            *(
+                cache.get_bond_events(GetBondEventsRequest(instrument_id="bond"))
+                for _ in range(5)
+            )
+        )
+        cached = await cache.get_bond_events(GetBondEventsRequest(instrument_id="bond"))
+
+        service.get_bond_events.assert_awaited_once()
+        assert all(response is cached for response in responses)
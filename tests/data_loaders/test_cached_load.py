@@ -23,6 +23,7 @@ from tinkoff.invest.caching.market_data_cache.cache_settings import (
 from tinkoff.invest.caching.market_data_cache.instrument_market_data_storage import (
     InstrumentMarketDataStorage,
 )
+from tinkoff.invest.caching.market_data_cache.stats import MarketDataCacheStats
 from tinkoff.invest.schemas import CandleSource
 from tinkoff.invest.services import MarketDataService
 from tinkoff.invest.utils import (
@@ -553,3 +554,154 @@ class TestCachedLoad:
         assert any(
             str(file).endswith(f".{settings.meta_extension}") for file in cached_ls
         )
+
+    def test_collects_stats(
+        self,
+        market_data_service: MarketDataService,
+        settings: MarketDataCacheSettings,
+        client,
+        figi: str,
+        mocker,
+    ):
+        stats_callback = mocker.Mock()
+        market_data_cache = MarketDataCache(
+            settings=settings, services=client, stats_callback=stats_callback
+        )
+        interval = CandleInterval.CANDLE_INTERVAL_DAY
+        from_, to = self._get_date_point_by_index(0, 30, interval=interval)
+
+        from_net = list(
+            market_data_cache.get_all_candles(
+                figi=figi, from_=from_, to=to, interval=interval
+            )
+        )
+        net_stats = market_data_cache.get_last_call_stats()
+        from_cache = list(
+            market_data_cache.get_all_candles(
+                figi=figi, from_=from_, to=to, interval=interval
+            )
+        )
+        cache_stats = market_data_cache.get_last_call_stats()
+
+        assert net_stats.net_candles == len(from_net)
+        assert net_stats.cached_candles == 0
+        assert net_stats.rpc_count == len(market_data_service.get_candles.mock_calls)
+        assert cache_stats.net_candles == 0
+        assert cache_stats.rpc_count == 0
+        assert cache_stats.cached_candles == len(from_cache)
+        assert cache_stats.files_read == 1
+        cache_storage = InstrumentMarketDataStorage(
+            figi=figi, interval=interval, settings=settings
+        )
+        (cached_file,) = [
+            path
+            for path in cache_storage._meta_path.parent.glob("*")
+            if path != cache_storage._meta_path
+        ]
+        assert cache_stats.bytes_parsed == cached_file.stat().st_size
+        assert cache_stats.hit_ratio == 1
+        assert market_data_cache.get_stats() == net_stats + cache_stats
+        assert stats_callback.call_args_list == [
+            mocker.call(net_stats),
+            mocker.call(cache_stats),
+        ]
+
+    def test_counts_encoded_bytes_of_non_ascii_lines(
+        self, settings: MarketDataCacheSettings, figi: str
+    ):
+        cache_storage = InstrumentMarketDataStorage(
+            figi=figi, interval=CandleInterval.CANDLE_INTERVAL_DAY, settings=settings
+        )
+        lines = ["тикер,цена\r\n", "SBER,100\r\n"]
+
+        stats = MarketDataCacheStats()
+
+        assert list(cache_storage._with_counting_bytes(lines, "utf-8", stats)) == lines
+        assert stats.bytes_parsed == 31
+
+    def test_reports_stats_of_failed_call(
+        self,
+        market_data_service: MarketDataService,
+        market_data_cache: MarketDataCache,
+        figi: str,
+    ):
+        interval = CandleInterval.CANDLE_INTERVAL_DAY
+        from_, to = self._get_date_point_by_index(0, 800, interval=interval)
+        market_data_service.get_candles.side_effect = iter(
+            [
+                get_candles_response(from_, from_ + timedelta(days=1), interval),
+                RuntimeError("network"),
+            ]
+        )
+
+        with pytest.raises(RuntimeError):
+            list(
+                market_data_cache.get_all_candles(
+                    figi=figi, from_=from_, to=to, interval=interval
+                )
+            )
+
+        stats = market_data_cache.get_last_call_stats()
+        assert stats.rpc_count == 2
+        assert stats.rpc_count == len(market_data_service.get_candles.mock_calls)
+
+    def test_resamples_from_finer_cached_interval(
+        self,
+        market_data_service: MarketDataService,
+        settings: MarketDataCacheSettings,
+        client,
+        figi: str,
+    ):
+        settings.resample_source_intervals = (CandleInterval.CANDLE_INTERVAL_1_MIN,)
+        market_data_cache = MarketDataCache(settings=settings, services=client)
+        hour = CandleInterval.CANDLE_INTERVAL_HOUR
+        h0, h2, h3 = self._get_date_point_by_index(0, 2, 3, interval=hour)
+        list(
+            market_data_cache.get_all_candles(
+                figi=figi,
+                from_=h0,
+                to=h3,
+                interval=CandleInterval.CANDLE_INTERVAL_1_MIN,
+            )
+        )
+        market_data_service.get_candles.reset_mock()
+
+        resampled = list(
+            market_data_cache.get_all_candles(figi=figi, from_=h0, to=h2, interval=hour)
+        )
+
+        market_data_service.get_candles.assert_not_called()
+        self.assert_in_range(resampled, start=h0, end=h2, interval=hour)
+        assert all(candle.volume == 100 * 60 for candle in resampled)
+        assert market_data_cache.get_last_call_stats().cached_candles == 3 * 60
+
+    def test_resamples_partial_trailing_bucket(
+        self,
+        market_data_service: MarketDataService,
+        settings: MarketDataCacheSettings,
+        client,
+        figi: str,
+    ):
+        settings.resample_source_intervals = (CandleInterval.CANDLE_INTERVAL_1_MIN,)
+        market_data_cache = MarketDataCache(settings=settings, services=client)
+        hour = CandleInterval.CANDLE_INTERVAL_HOUR
+        h0, h1 = self._get_date_point_by_index(0, 1, interval=hour)
+        to = h1 + timedelta(minutes=30)
+        list(
+            market_data_cache.get_all_candles(
+                figi=figi,
+                from_=h0,
+                to=to,
+                interval=CandleInterval.CANDLE_INTERVAL_1_MIN,
+            )
+        )
+        market_data_service.get_candles.reset_mock()
+
+        resampled = list(
+            market_data_cache.get_all_candles(figi=figi, from_=h0, to=to, interval=hour)
+        )
+
+        market_data_service.get_candles.assert_not_called()
+        assert [candle.time for candle in resampled] == [h0, h1]
+        assert [candle.volume for candle in resampled] == [100 * 60, 100 * 31]
+        assert [candle.is_complete for candle in resampled] == [True, False]
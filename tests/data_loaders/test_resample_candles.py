@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from tinkoff.invest import CandleInterval, HistoricCandle, Quotation
+from tinkoff.invest.caching.market_data_cache.resampling import (
+    can_resample,
+    resample_candles,
+)
+from tinkoff.invest.schemas import CandleSource
+
+MINUTE = CandleInterval.CANDLE_INTERVAL_1_MIN
+FIVE_MINUTES = CandleInterval.CANDLE_INTERVAL_5_MIN
+HOUR = CandleInterval.CANDLE_INTERVAL_HOUR
+
+
+def get_candle(
+    time: datetime,
+    open_: int,
+    high: int,
+    low: int,
+    close: int,
+    volume: int = 1,
+    is_complete: bool = True,
+) -> HistoricCandle:
+    return HistoricCandle(
+        open=Quotation(units=open_, nano=500_000_000),
+        high=Quotation(units=high, nano=0),
+        low=Quotation(units=low, nano=0),
+        close=Quotation(units=close, nano=0),
+        volume=volume,
+        time=time,
+        is_complete=is_complete,
+        candle_source=CandleSource.CANDLE_SOURCE_EXCHANGE,
+    )
+
+
+@pytest.fixture()
+def start() -> datetime:
+    return datetime(2023, 9, 11, 10, 0, tzinfo=timezone.utc)
+
+
+class TestResampleCandles:
+    @pytest.mark.parametrize(
+        ("from_interval", "to_interval", "expected"),
+        [
+            (MINUTE, FIVE_MINUTES, True),
+            (MINUTE, CandleInterval.CANDLE_INTERVAL_DAY, True),
+            (CandleInterval.CANDLE_INTERVAL_2_MIN, FIVE_MINUTES, False),
+            (HOUR, HOUR, False),
+            (
+                CandleInterval.CANDLE_INTERVAL_DAY,
+                CandleInterval.CANDLE_INTERVAL_MONTH,
+                False,
+            ),
+        ],
+    )
+    def test_can_resample(self, from_interval, to_interval, expected):
+        assert can_resample(from_interval, to_interval) == expected
+
+    def test_aggregates_ohlcv(self, start: datetime):
+        minute = timedelta(minutes=1)
+        candles = [
+            get_candle(start + i * minute, open_=i, high=10 + i, low=i, close=i)
+            for i in range(10)
+        ]
+
+        resampled = resample_candles(
+            list(reversed(candles)),
+            from_interval=MINUTE,
+            to_interval=FIVE_MINUTES,
+        )
+
+        assert [candle.time for candle in resampled] == [start, start + 5 * minute]
+        first, second = resampled
+        assert first.open == Quotation(units=0, nano=500_000_000)
+        assert first.high == Quotation(units=14, nano=0)
+        assert first.low == Quotation(units=0, nano=0)
+        assert first.close == Quotation(units=4, nano=0)
+        assert first.volume == 5
+        assert second.open == Quotation(units=5, nano=500_000_000)
+        assert second.close == Quotation(units=9, nano=0)
+        assert first.is_complete and second.is_complete
+
+    def test_aligns_with_floor_datetime(self, start: datetime):
+        candles = [get_candle(start + timedelta(minutes=7), 1, 1, 1, 1)]
+
+        (resampled,) = resample_candles(
+            candles,
+            from_interval=MINUTE,
+            to_interval=HOUR,
+        )
+
+        assert resampled.time == start
+        assert not resampled.is_complete
+
+    def test_marks_incomplete_bucket(self, start: datetime):
+        minute = timedelta(minutes=1)
+        candles = [get_candle(start + i * minute, 1, 1, 1, 1) for i in range(5)]
+        candles[2] = get_candle(start + 2 * minute, 1, 1, 1, 1, is_complete=False)
+
+        (resampled,) = resample_candles(
+            candles,
+            from_interval=MINUTE,
+            to_interval=FIVE_MINUTES,
+        )
+
+        assert not resampled.is_complete
+
+    def test_raises_on_incompatible_intervals(self, start: datetime):
+        with pytest.raises(ValueError):
+            resample_candles(
+                [get_candle(start, 1, 1, 1, 1)],
+                from_interval=CandleInterval.CANDLE_INTERVAL_2_MIN,
+                to_interval=FIVE_MINUTES,
+            )
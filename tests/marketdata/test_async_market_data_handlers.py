@@ -0,0 +1,176 @@
+import asyncio
+from typing import List
+from unittest import mock
+
+import pytest
+
+from tinkoff.invest import Candle, LastPrice, MarketDataResponse, _grpc_helpers
+from tinkoff.invest.async_services import MarketDataStreamService
+from tinkoff.invest.grpc import common_pb2, marketdata_pb2
+from tinkoff.invest.market_data_stream.async_market_data_stream_manager import (
+    AsyncMarketDataStreamManager,
+)
+from tinkoff.invest.market_data_stream.payload import PayloadFilter
+from tinkoff.invest.schemas import Ping
+
+
+def raw_responses():
+    return [
+        marketdata_pb2.MarketDataResponse(ping=common_pb2.Ping()),
+        marketdata_pb2.MarketDataResponse(
+            subscribe_candles_response=marketdata_pb2.SubscribeCandlesResponse()
+        ),
+        marketdata_pb2.MarketDataResponse(
+            candle=marketdata_pb2.Candle(figi="a", instrument_uid="uid-a")
+        ),
+        marketdata_pb2.MarketDataResponse(
+            last_price=marketdata_pb2.LastPrice(figi="b", instrument_uid="uid-b")
+        ),
+        marketdata_pb2.MarketDataResponse(
+            candle=marketdata_pb2.Candle(figi="c", instrument_uid="uid-c")
+        ),
+    ]
+
+
+class FakeStub:
+    """Отдаёт сообщения и ждёт закрытия потока запросов, как сервер."""
+
+    def __init__(self, hang: bool = False):
+        self.hang = hang
+        self.closed = False
+        self.requests: List[marketdata_pb2.MarketDataRequest] = []
+
+    def MarketDataStream(self, request_iterator, metadata):  # noqa: N802
+        return self._stream(request_iterator)
+
+    async def _stream(self, request_iterator):
+        try:
+            for response in raw_responses():
+                yield response
+            if self.hang:
+                await asyncio.Event().wait()
+            async for request in request_iterator:
+                self.requests.append(request)
+        finally:
+            self.closed = True
+
+
+def make_manager(stub: FakeStub, **kwargs) -> AsyncMarketDataStreamManager:
+    service = MarketDataStreamService(mock.MagicMock(), metadata=[])
+    service.stub = stub
+    return AsyncMarketDataStreamManager(service, **kwargs)
+
+
+class TestAsyncMarketDataHandlers:
+    async def test_dispatches_payloads_to_typed_handlers(self):
+        stub = FakeStub()
+        manager = make_manager(stub)
+        candles: List[Candle] = []
+        last_prices: List[LastPrice] = []
+        pings: List[Ping] = []
+
+        async def on_candle(candle: Candle) -> None:
+            candles.append(candle)
+
+        async def on_last_price(last_price: LastPrice) -> None:
+            last_prices.append(last_price)
+            manager.stop()
+
+        async def on_ping(ping: Ping) -> None:
+            pings.append(ping)
+
+        manager.on_candle(on_candle)
+        manager.on_last_price(on_last_price)
+        manager.on_ping(on_ping)
+        await manager.run()
+
+        assert [candle.figi for candle in candles] == ["a", "c"]
+        assert [last_price.figi for last_price in last_prices] == ["b"]
+        assert len(pings) == 1
+        assert stub.closed
+
+    async def test_converts_only_messages_with_handlers(self):
+        stub = FakeStub()
+        manager = make_manager(stub)
+
+        async def on_candle(candle: Candle) -> None:
+            manager.stop()
+
+        manager.on_candle(on_candle)
+        with mock.patch.object(
+            _grpc_helpers,
+            "protobuf_to_dataclass",
+            wraps=_grpc_helpers.protobuf_to_dataclass,
+        ) as convert:
+            await manager.run()
+
+        converted = [
+            call
+            for call in convert.call_args_list
+            if call.args[1] is MarketDataResponse
+        ]
+        assert len(converted) == 2
+
+    async def test_applies_payload_filter(self):
+        manager = make_manager(
+            FakeStub(), payload_filter=PayloadFilter(instrument_ids=["uid-c"])
+        )
+        candles: List[Candle] = []
+
+        async def on_candle(candle: Candle) -> None:
+            candles.append(candle)
+            manager.stop()
+
+        manager.on_candle(on_candle)
+        await manager.run()
+
+        assert [candle.figi for candle in candles] == ["c"]
+
+    async def test_cancellation_closes_stream(self):
+        stub = FakeStub(hang=True)
+        manager = make_manager(stub)
+        received = asyncio.Event()
+
+        async def on_candle(candle: Candle) -> None:
+            received.set()
+
+        manager.on_candle(on_candle)
+        task = asyncio.create_task(manager.run())
+        await received.wait()
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert stub.closed
+
+    async def test_handler_error_stops_stream(self):
+        stub = FakeStub(hang=True)
+        manager = make_manager(stub)
+
+        async def on_candle(candle: Candle) -> None:
+            raise RuntimeError("boom")
+
+        manager.on_candle(on_candle)
+
+        with pytest.raises(RuntimeError):
+            await manager.run()
+        assert stub.closed
+
+    def test_rejects_unknown_payload_type(self):
+        manager = make_manager(FakeStub())
+
+        async def handler(payload) -> None:
+            pass
+
+        with pytest.raises(ValueError):
+            manager.on("unknown", handler)
+
+    async def test_iteration_still_yields_all_messages(self):
+        manager = make_manager(FakeStub())
+
+        responses = []
+        async for market_data in manager:
+            responses.append(market_data)
+            manager.stop()
+
+        assert len(responses) == 5
@@ -0,0 +1,78 @@
+import pytest
+
+from tinkoff.invest.market_data_stream.conflation import (
+    AsyncConflatingMarketDataStream,
+    ConflatingMarketDataStream,
+)
+from tinkoff.invest.market_data_stream.payload import (
+    get_payload,
+    get_payload_instrument_id,
+)
+
+from .test_multiplexer import FakeStreamManager, candle, last_price
+
+
+def updates():
+    return [
+        last_price("a", 1),
+        last_price("b", 1),
+        candle("a"),
+        last_price("a", 2),
+        last_price("a", 3),
+        last_price("b", 2),
+    ]
+
+
+def describe(responses):
+    result = []
+    for response in responses:
+        payload_type, payload = get_payload(response)
+        result.append(
+            (
+                payload_type,
+                get_payload_instrument_id(payload),
+                getattr(payload, "price", None),
+            )
+        )
+    return result
+
+
+class TestConflatingMarketDataStream:
+    def test_keeps_latest_value_per_type_and_instrument(self):
+        stream = ConflatingMarketDataStream(FakeStreamManager(updates()))
+
+        iter(stream)
+        stream.stop(timeout=5)
+
+        assert describe(stream) == [
+            ("last_price", "a", 3),
+            ("last_price", "b", 2),
+            ("candle", "a", None),
+        ]
+        assert stream.conflated == 3
+
+    def test_filters_payload_types(self):
+        stream = ConflatingMarketDataStream(
+            FakeStreamManager(updates()), payload_types=["candle"]
+        )
+
+        iter(stream)
+        stream.stop(timeout=5)
+
+        assert describe(stream) == [("candle", "a", None)]
+
+
+class TestAsyncConflatingMarketDataStream:
+    @pytest.mark.asyncio
+    async def test_keeps_latest_value_per_type_and_instrument(self):
+        stream = AsyncConflatingMarketDataStream(FakeStreamManager(updates()))
+
+        stream.__aiter__()
+        await stream.stop()
+
+        assert describe([r async for r in stream]) == [
+            ("last_price", "a", 3),
+            ("last_price", "b", 2),
+            ("candle", "a", None),
+        ]
+        assert stream.conflated == 3
@@ -0,0 +1,141 @@
+from datetime import timedelta
+from typing import List
+
+import pytest
+from grpc import StatusCode
+
+from tinkoff.invest import (
+    CandleInstrument,
+    LastPrice,
+    MarketDataRequest,
+    MarketDataResponse,
+    OrderBookInstrument,
+    SubscriptionAction,
+    SubscriptionInterval,
+)
+from tinkoff.invest.exceptions import RequestError
+from tinkoff.invest.market_data_stream.market_data_stream_manager import (
+    MarketDataStreamManager,
+)
+from tinkoff.invest.market_data_stream.reconnect import ReconnectSettings
+from tinkoff.invest.market_data_stream.subscriptions import SubscriptionState
+
+ONE_MINUTE = SubscriptionInterval.SUBSCRIPTION_INTERVAL_ONE_MINUTE
+
+
+def candle_instrument(figi: str) -> CandleInstrument:
+    return CandleInstrument(figi=figi, interval=ONE_MINUTE, instrument_id=figi)
+
+
+def subscribed_figis(requests: List[MarketDataRequest]) -> List[List[str]]:
+    return [
+        [i.figi for i in request.subscribe_candles_request.instruments]
+        for request in requests
+    ]
+
+
+def last_price(figi: str) -> MarketDataResponse:
+    return MarketDataResponse(last_price=LastPrice(figi=figi, instrument_uid=figi))
+
+
+class FakeMarketDataStreamService:
+    def __init__(self, failures: int, replay_count: int):
+        self.failures = failures
+        self.replay_count = replay_count
+        self.calls = 0
+        self.replayed: List[MarketDataRequest] = []
+
+    def market_data_stream(self, request_iterator):
+        self.calls += 1
+        if self.calls == 1:
+            yield last_price("before")
+            raise RequestError(StatusCode.UNAVAILABLE, "connection reset", None)
+        if self.calls <= 1 + self.failures:
+            raise RequestError(StatusCode.UNAVAILABLE, "still down", None)
+        self.replayed = [next(request_iterator) for _ in range(self.replay_count)]
+        yield last_price("after")
+
+
+class TestSubscriptionState:
+    def test_tracks_subscribe_and_unsubscribe(self):
+        manager = MarketDataStreamManager(None)
+        manager.candles.subscribe([candle_instrument(f) for f in ("a", "b", "c")])
+        manager.candles.unsubscribe([candle_instrument("b")])
+        manager.order_book.subscribe([OrderBookInstrument(figi="a", depth=10)])
+
+        requests = manager.subscriptions.get_replay_requests(
+            max_instruments_per_request=1
+        )
+
+        assert len(manager.subscriptions) == 3
+        assert subscribed_figis(requests[:2]) == [["a"], ["c"]]
+        order_book_request = requests[2].subscribe_order_book_request
+        assert [i.figi for i in order_book_request.instruments] == ["a"]
+        assert all(
+            request.subscribe_candles_request.subscription_action
+            == SubscriptionAction.SUBSCRIPTION_ACTION_SUBSCRIBE
+            for request in requests[:2]
+        )
+
+    def test_keeps_request_options_in_replay(self):
+        state = SubscriptionState()
+        manager = MarketDataStreamManager(None)
+        state.apply(
+            manager.candles.waiting_close()._get_request(
+                SubscriptionAction.SUBSCRIPTION_ACTION_SUBSCRIBE,
+                [candle_instrument("a")],
+            )
+        )
+
+        (request,) = state.get_replay_requests()
+
+        assert request.subscribe_candles_request.waiting_close is True
+
+
+class TestReconnect:
+    def test_reconnects_and_replays_subscriptions(self):
+        service = FakeMarketDataStreamService(failures=2, replay_count=1)
+        gaps = []
+        manager = MarketDataStreamManager(
+            service,
+            reconnect_settings=ReconnectSettings(initial_backoff=timedelta()),
+            on_gap=gaps.append,
+        )
+        manager.candles.subscribe([candle_instrument("a"), candle_instrument("b")])
+
+        stream = iter(manager)
+        before = next(stream)
+        after = next(stream)
+
+        assert before.last_price.figi == "before"
+        assert after.last_price.figi == "after"
+        assert subscribed_figis(service.replayed) == [["a", "b"]]
+        (gap,) = gaps
+        assert gap.reconnect_attempts == 3
+        assert gap.error.details == "still down"
+        assert manager.last_gap is gap
+
+    def test_raises_when_attempts_exhausted(self):
+        service = FakeMarketDataStreamService(failures=5, replay_count=0)
+        manager = MarketDataStreamManager(
+            service,
+            reconnect_settings=ReconnectSettings(
+                max_attempts=2, initial_backoff=timedelta()
+            ),
+        )
+
+        stream = iter(manager)
+        next(stream)
+        with pytest.raises(RequestError):
+            next(stream)
+        assert service.calls == 3
+
+    def test_does_not_reconnect_by_default(self):
+        manager = MarketDataStreamManager(
+            FakeMarketDataStreamService(failures=0, replay_count=0)
+        )
+
+        stream = iter(manager)
+        next(stream)
+        with pytest.raises(RequestError):
+            next(stream)
@@ -0,0 +1,139 @@
+import asyncio
+import threading
+from typing import List
+
+import pytest
+
+from tinkoff.invest import Candle, LastPrice, MarketDataResponse, Trade
+from tinkoff.invest.market_data_stream.async_multiplexer import (
+    AsyncMarketDataMultiplexer,
+)
+from tinkoff.invest.market_data_stream.multiplexer import (
+    MarketDataMultiplexer,
+    OverflowPolicy,
+)
+
+
+class FakeStreamManager:
+    def __init__(self, responses: List[MarketDataResponse]):
+        self._responses = responses
+
+    def __iter__(self):
+        return iter(self._responses)
+
+    async def _aiter(self):
+        for response in self._responses:
+            yield response
+
+    def __aiter__(self):
+        return self._aiter()
+
+    def stop(self):
+        pass
+
+
+def last_price(instrument_uid: str, units: int) -> MarketDataResponse:
+    return MarketDataResponse(
+        last_price=LastPrice(figi="", price=units, instrument_uid=instrument_uid)
+    )
+
+
+def candle(instrument_uid: str) -> MarketDataResponse:
+    return MarketDataResponse(candle=Candle(figi="", instrument_uid=instrument_uid))
+
+
+def trade(instrument_uid: str) -> MarketDataResponse:
+    return MarketDataResponse(trade=Trade(figi="", instrument_uid=instrument_uid))
+
+
+def prices(consumer) -> List[int]:
+    return [response.last_price.price for response in consumer]
+
+
+class TestMarketDataMultiplexer:
+    def test_routes_by_type_and_instrument(self):
+        responses = [candle("a"), trade("a"), candle("b"), last_price("a", 1)]
+        multiplexer = MarketDataMultiplexer(FakeStreamManager(responses))
+        candles = multiplexer.add_consumer(payload_types=["candle"])
+        instrument_a = multiplexer.add_consumer(instrument_ids=["a"])
+        everything = multiplexer.add_consumer()
+
+        multiplexer.run()
+
+        assert list(candles) == [responses[0], responses[2]]
+        assert list(instrument_a) == [responses[0], responses[1], responses[3]]
+        assert list(everything) == responses
+
+    @pytest.mark.parametrize(
+        ("overflow_policy", "expected_prices", "expected_dropped"),
+        [
+            (OverflowPolicy.DROP_OLDEST, [4, 5, 6], 3),
+            (OverflowPolicy.CONFLATE, [5, 3, 6], 3),
+        ],
+    )
+    def test_overflow_policies(
+        self, overflow_policy, expected_prices, expected_dropped
+    ):
+        responses = [
+            last_price("a", 1),
+            last_price("b", 2),
+            last_price("c", 3),
+            last_price("a", 4),
+            last_price("b", 5),
+            last_price("d", 6),
+        ]
+        multiplexer = MarketDataMultiplexer(FakeStreamManager(responses))
+        consumer = multiplexer.add_consumer(maxsize=3, overflow_policy=overflow_policy)
+
+        multiplexer.run()
+
+        assert prices(consumer) == expected_prices
+        assert consumer.dropped == expected_dropped
+
+    def test_blocks_until_consumer_reads(self):
+        responses = [last_price("a", price) for price in range(100)]
+        multiplexer = MarketDataMultiplexer(FakeStreamManager(responses))
+        consumer = multiplexer.add_consumer(maxsize=1)
+        thread = threading.Thread(target=multiplexer.run)
+
+        thread.start()
+        received = prices(consumer)
+        thread.join()
+
+        assert received == list(range(100))
+        assert consumer.dropped == 0
+
+    def test_passes_stream_error_to_consumers(self):
+        class BrokenStreamManager(FakeStreamManager):
+            def __iter__(self):
+                yield last_price("a", 1)
+                raise RuntimeError("stream broken")
+
+        multiplexer = MarketDataMultiplexer(BrokenStreamManager([]))
+        consumer = multiplexer.add_consumer()
+
+        multiplexer.run()
+
+        assert consumer.get().last_price.price == 1
+        with pytest.raises(RuntimeError, match="stream broken"):
+            consumer.get()
+
+
+class TestAsyncMarketDataMultiplexer:
+    async def test_routes_and_blocks(self):
+        responses = [last_price("a", price) for price in range(20)] + [candle("a")]
+        multiplexer = AsyncMarketDataMultiplexer(FakeStreamManager(responses))
+        last_prices = multiplexer.add_consumer(payload_types=["last_price"], maxsize=2)
+        conflated = multiplexer.add_consumer(
+            payload_types=["last_price"],
+            maxsize=2,
+            overflow_policy=OverflowPolicy.CONFLATE,
+        )
+
+        async def read_last_prices():
+            return [response.last_price.price async for response in last_prices]
+
+        received, _ = await asyncio.gather(read_last_prices(), multiplexer.run())
+
+        assert received == list(range(20))
+        assert [response.last_price.price async for response in conflated] == [19]
@@ -0,0 +1,139 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from tinkoff.invest import MarketDataResponse, Order, OrderBook, Quotation
+from tinkoff.invest.market_data_stream.order_book import OrderBookEngine, OrderBookSide
+
+TIME = datetime(2023, 6, 1, 10, 0, tzinfo=timezone.utc)
+
+
+def q(value: str) -> Quotation:
+    units, _, nano = value.partition(".")
+    return Quotation(units=int(units), nano=int(nano.ljust(9, "0")))
+
+
+def make_order_book(
+    instrument_uid: str, bids, asks, is_consistent: bool = True, figi: str = ""
+) -> OrderBook:
+    return OrderBook(
+        figi=figi,
+        depth=10,
+        is_consistent=is_consistent,
+        bids=[Order(price=q(price), quantity=quantity) for price, quantity in bids],
+        asks=[Order(price=q(price), quantity=quantity) for price, quantity in asks],
+        time=TIME,
+        limit_up=q("0"),
+        limit_down=q("0"),
+        instrument_uid=instrument_uid,
+        order_book_type=0,
+    )
+
+
+@pytest.fixture()
+def engine() -> OrderBookEngine:
+    engine = OrderBookEngine(max_depth=5, capacity=2)
+    engine.update(
+        make_order_book(
+            "sber",
+            bids=[("100.5", 10), ("100.4", 20), ("100.3", 30)],
+            asks=[("100.6", 5), ("100.7", 15), ("100.9", 50)],
+        )
+    )
+    return engine
+
+
+class TestOrderBookEngine:
+    def test_top_of_book(self, engine: OrderBookEngine):
+        top = engine.top_of_book("sber")
+
+        assert top.bid_price == q("100.5")
+        assert top.bid_quantity == 10
+        assert top.ask_price == q("100.6")
+        assert top.ask_quantity == 5
+        assert top.time == TIME
+        assert top.is_consistent
+        assert engine.spread("sber") == Decimal("0.1")
+        assert engine.mid_price("sber") == Decimal("100.55")
+
+    def test_depth_queries(self, engine: OrderBookEngine):
+        assert engine.depth_at_price("sber", OrderBookSide.BID, q("100.4")) == 20
+        assert engine.depth_at_price("sber", OrderBookSide.BID, q("99")) == 0
+        assert engine.depth_up_to_price("sber", OrderBookSide.BID, q("100.4")) == 30
+        assert engine.depth_up_to_price("sber", OrderBookSide.ASK, q("100.7")) == 20
+
+    def test_vwap(self, engine: OrderBookEngine):
+        assert engine.vwap("sber", OrderBookSide.ASK, 5) == Decimal("100.6")
+        assert engine.vwap("sber", OrderBookSide.ASK, 10) == Decimal("100.65")
+        assert engine.vwap("sber", OrderBookSide.ASK, 1000) is None
+
+    def test_vwap_with_large_notional(self, engine: OrderBookEngine):
+        engine.update(
+            make_order_book(
+                "lkoh", bids=[("7000", 1_000_000), ("6999", 1_000_000)], asks=[]
+            )
+        )
+
+        vwap = engine.vwap("lkoh", OrderBookSide.BID, 2_000_000)
+
+        assert vwap == Decimal("6999.5")
+
+    def test_spreads_are_nan_without_levels(self, engine: OrderBookEngine):
+        engine.update(make_order_book("gazp", bids=[("1", 1)], asks=[]))
+
+        instruments, spreads = engine.spreads()
+
+        assert instruments == ["sber", "gazp"]
+        assert spreads[0] == 100_000_000
+        assert np.isnan(spreads[1])
+
+    def test_skips_inconsistent_updates(self, engine: OrderBookEngine):
+        updated = engine.update(
+            make_order_book("sber", bids=[], asks=[], is_consistent=False)
+        )
+
+        assert not updated
+        assert not engine.is_consistent("sber")
+        assert engine.best_bid("sber") == q("100.5")
+
+    def test_grows_and_removes_books(self, engine: OrderBookEngine):
+        for instrument_uid in ("gazp", "lkoh", "ydex"):
+            engine.update_from_market_data(
+                MarketDataResponse(
+                    orderbook=make_order_book(
+                        instrument_uid, bids=[("1", 1)], asks=[("2", 1)]
+                    )
+                )
+            )
+        engine.remove("gazp")
+
+        instruments, spreads = engine.spreads()
+        assert len(engine) == 3
+        assert "gazp" not in engine
+        assert dict(zip(instruments, spreads.tolist())) == {
+            "sber": 100_000_000,
+            "ydex": 1_000_000_000,
+            "lkoh": 1_000_000_000,
+        }
+        assert engine.best_prices(OrderBookSide.ASK)["ydex"] == q("2")
+
+    def test_books_are_available_by_figi_and_uid(self, engine: OrderBookEngine):
+        for instrument_uid, figi in (("gazp-uid", "GAZP"), ("lkoh-uid", "LKOH")):
+            engine.update(
+                make_order_book(
+                    instrument_uid, bids=[("1", 1)], asks=[("2", 1)], figi=figi
+                )
+            )
+
+        assert engine.spread("GAZP") == engine.spread("gazp-uid") == Decimal("1")
+        assert len(engine) == 3
+        assert engine.instruments == ("sber", "gazp-uid", "lkoh-uid")
+
+        engine.remove("GAZP")
+
+        assert "gazp-uid" not in engine
+        assert "GAZP" not in engine
+        assert engine.best_ask("LKOH") == engine.best_ask("lkoh-uid") == q("2")
+        assert engine.instruments == ("sber", "lkoh-uid")
@@ -0,0 +1,78 @@
+from unittest import mock
+
+from tinkoff.invest import MarketDataResponse, _grpc_helpers
+from tinkoff.invest.grpc import common_pb2, marketdata_pb2
+from tinkoff.invest.market_data_stream.payload import PayloadFilter, get_raw_payload_key
+from tinkoff.invest.services import MarketDataStreamService
+
+
+def raw_responses():
+    return [
+        marketdata_pb2.MarketDataResponse(ping=common_pb2.Ping()),
+        marketdata_pb2.MarketDataResponse(
+            subscribe_candles_response=marketdata_pb2.SubscribeCandlesResponse()
+        ),
+        marketdata_pb2.MarketDataResponse(
+            candle=marketdata_pb2.Candle(figi="a", instrument_uid="uid-a")
+        ),
+        marketdata_pb2.MarketDataResponse(
+            candle=marketdata_pb2.Candle(figi="b", instrument_uid="uid-b")
+        ),
+        marketdata_pb2.MarketDataResponse(
+            last_price=marketdata_pb2.LastPrice(figi="a", instrument_uid="uid-a")
+        ),
+    ]
+
+
+def market_data_stream_service() -> MarketDataStreamService:
+    service = MarketDataStreamService(mock.MagicMock(), metadata=[])
+    service.stub = mock.Mock()
+    service.stub.MarketDataStream.return_value = iter(raw_responses())
+    return service
+
+
+class TestPayloadFilter:
+    def test_get_raw_payload_key(self):
+        ping, ack, candle, *_ = raw_responses()
+
+        assert get_raw_payload_key(ping) == ("ping", "")
+        assert get_raw_payload_key(ack) == ("subscribe_candles_response", "")
+        assert get_raw_payload_key(candle) == ("candle", "uid-a")
+        assert get_raw_payload_key(marketdata_pb2.MarketDataResponse()) == (None, "")
+
+    def test_filters_by_payload_type_and_instrument(self):
+        payload_filter = PayloadFilter(
+            payload_types=["candle", "ping"], instrument_ids=["uid-a"]
+        )
+
+        assert payload_filter("candle", "uid-a")
+        assert payload_filter("ping", "")
+        assert not payload_filter("candle", "uid-b")
+        assert not payload_filter("last_price", "uid-a")
+
+    def test_service_converts_only_matching_messages(self):
+        service = market_data_stream_service()
+
+        with mock.patch.object(
+            _grpc_helpers,
+            "protobuf_to_dataclass",
+            wraps=_grpc_helpers.protobuf_to_dataclass,
+        ) as convert:
+            responses = list(
+                service.market_data_stream(
+                    iter([]), payload_filter=PayloadFilter(payload_types=["candle"])
+                )
+            )
+
+        assert [r.candle.figi for r in responses] == ["a", "b"]
+        converted = [
+            call
+            for call in convert.call_args_list
+            if call.args[1] is MarketDataResponse
+        ]
+        assert len(converted) == 2
+
+    def test_service_without_filter_converts_everything(self):
+        responses = list(market_data_stream_service().market_data_stream(iter([])))
+
+        assert len(responses) == 5
@@ -0,0 +1,137 @@
+from typing import List
+
+import pytest
+
+from tinkoff.invest import (
+    CandleInstrument,
+    MarketDataRequest,
+    OrderBookInstrument,
+    SubscriptionAction,
+    SubscriptionInterval,
+)
+from tinkoff.invest.market_data_stream.async_market_data_stream_manager import (
+    AsyncMarketDataStreamManager,
+)
+from tinkoff.invest.market_data_stream.market_data_stream_manager import (
+    MarketDataStreamManager,
+)
+from tinkoff.invest.market_data_stream.subscriptions import (
+    coalesce_requests,
+    get_subscription_request,
+)
+from tinkoff.invest.schemas import PingDelaySettings
+
+ONE_MINUTE = SubscriptionInterval.SUBSCRIPTION_INTERVAL_ONE_MINUTE
+SUBSCRIBE = SubscriptionAction.SUBSCRIPTION_ACTION_SUBSCRIBE
+UNSUBSCRIBE = SubscriptionAction.SUBSCRIPTION_ACTION_UNSUBSCRIBE
+
+
+def candle_instrument(figi: str) -> CandleInstrument:
+    return CandleInstrument(figi=figi, interval=ONE_MINUTE)
+
+
+def candles(action: SubscriptionAction, *figis: str) -> MarketDataRequest:
+    return MarketDataStreamManager(None).candles._get_request(
+        action, [candle_instrument(figi) for figi in figis]
+    )
+
+
+def describe(requests: List[MarketDataRequest]):
+    result = []
+    for request in requests:
+        field_name, subscription = get_subscription_request(request)
+        if field_name is not None:
+            result.append(
+                (
+                    field_name,
+                    subscription.subscription_action,
+                    [i.figi for i in subscription.instruments],
+                )
+            )
+    return result
+
+
+class TestCoalesceRequests:
+    def test_merges_requests_of_same_kind_and_action(self):
+        order_book = MarketDataStreamManager(None).order_book._get_request(
+            SUBSCRIBE, [OrderBookInstrument(figi="x", depth=10)]
+        )
+
+        requests = coalesce_requests(
+            [candles(SUBSCRIBE, "a"), order_book, candles(SUBSCRIBE, "b", "a")]
+        )
+
+        assert describe(requests) == [
+            ("subscribe_candles_request", SUBSCRIBE, ["a", "b"]),
+            ("subscribe_order_book_request", SUBSCRIBE, ["x"]),
+        ]
+
+    def test_keeps_order_of_actions(self):
+        requests = coalesce_requests(
+            [
+                candles(SUBSCRIBE, "a"),
+                candles(UNSUBSCRIBE, "a"),
+                candles(UNSUBSCRIBE, "b"),
+                candles(SUBSCRIBE, "a"),
+            ]
+        )
+
+        assert describe(requests) == [
+            ("subscribe_candles_request", SUBSCRIBE, ["a"]),
+            ("subscribe_candles_request", UNSUBSCRIBE, ["a", "b"]),
+            ("subscribe_candles_request", SUBSCRIBE, ["a"]),
+        ]
+
+    def test_does_not_merge_different_options(self):
+        waiting_close = (
+            MarketDataStreamManager(None)
+            .candles.waiting_close()
+            ._get_request(SUBSCRIBE, [candle_instrument("b")])
+        )
+
+        requests = coalesce_requests([candles(SUBSCRIBE, "a"), waiting_close])
+
+        assert len(requests) == 2
+
+    def test_splits_by_instruments_limit(self):
+        requests = coalesce_requests(
+            [candles(SUBSCRIBE, str(i)) for i in range(5)],
+            max_instruments_per_request=2,
+        )
+
+        assert [figis for _, _, figis in describe(requests)] == [
+            ["0", "1"],
+            ["2", "3"],
+            ["4"],
+        ]
+
+    def test_passes_other_requests_through(self):
+        ping = MarketDataRequest(ping_settings=PingDelaySettings(ping_delay_ms=1000))
+
+        requests = coalesce_requests([candles(SUBSCRIBE, "a"), ping])
+
+        assert requests[0] is ping
+        assert len(requests) == 2
+
+
+class TestRequestGenerator:
+    def test_drains_and_coalesces_queued_requests(self):
+        manager = MarketDataStreamManager(None)
+        for i in range(250):
+            manager.candles.subscribe([candle_instrument(str(i))])
+        manager.stop()
+
+        requests = list(manager._get_request_generator())
+
+        assert [len(figis) for _, _, figis in describe(requests)] == [100, 100, 50]
+
+    @pytest.mark.asyncio
+    async def test_async_drains_and_coalesces_queued_requests(self):
+        manager = AsyncMarketDataStreamManager(None)
+        for i in range(150):
+            manager.candles.subscribe([candle_instrument(str(i))])
+        manager.stop()
+
+        requests = [r async for r in manager._get_request_generator()]
+
+        assert [len(figis) for _, _, figis in describe(requests)] == [100, 50]
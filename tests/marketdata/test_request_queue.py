@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from tinkoff.invest import CandleInstrument, SubscriptionInterval
+from tinkoff.invest.market_data_stream.async_market_data_stream_manager import (
+    AsyncMarketDataStreamManager,
+)
+from tinkoff.invest.market_data_stream.market_data_stream_manager import (
+    MarketDataStreamManager,
+)
+from tinkoff.invest.market_data_stream.request_queue import (
+    AsyncRequestQueue,
+    RequestQueue,
+)
+
+ONE_MINUTE = SubscriptionInterval.SUBSCRIPTION_INTERVAL_ONE_MINUTE
+
+
+def candle_instrument(figi: str) -> CandleInstrument:
+    return CandleInstrument(figi=figi, interval=ONE_MINUTE)
+
+
+class TestRequestQueue:
+    def test_returns_remaining_requests_after_close(self):
+        requests = RequestQueue()
+        requests.put("first")
+        requests.close()
+
+        assert requests.get_all() == ["first"]
+        assert requests.get_all() == []
+
+    def test_wakes_up_generator_on_subscribe_and_stop(self):
+        manager = MarketDataStreamManager(None)
+        received = []
+        generator = manager._get_request_generator()
+        thread = threading.Thread(target=lambda: received.extend(generator))
+        thread.start()
+
+        manager.candles.subscribe([candle_instrument("a")])
+        started = time.monotonic()
+        manager.stop()
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert time.monotonic() - started < 0.5
+        assert len(received) == 1
+
+
+class TestAsyncRequestQueue:
+    @pytest.mark.asyncio
+    async def test_wakes_up_generator_on_subscribe_and_stop(self):
+        manager = AsyncMarketDataStreamManager(None)
+        received = []
+
+        async def consume():
+            async for request in manager._get_request_generator():
+                received.append(request)
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        manager.candles.subscribe([candle_instrument("a")])
+        await asyncio.sleep(0)
+        assert len(received) == 1
+
+        manager.stop()
+        await asyncio.sleep(0)
+        assert task.done()
+
+    @pytest.mark.asyncio
+    async def test_get_all_waits_for_requests(self):
+        requests = AsyncRequestQueue()
+        waiter = asyncio.create_task(requests.get_all())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        requests.put("first")
+        requests.put("second")
+
+        assert await waiter == ["first", "second"]
+
+    @pytest.mark.asyncio
+    async def test_wakes_up_on_close_from_another_thread(self):
+        requests = AsyncRequestQueue()
+        waiter = asyncio.create_task(requests.get_all())
+        await asyncio.sleep(0)
+
+        def close_later():
+            time.sleep(0.05)
+            requests.close()
+
+        started_at = time.monotonic()
+        threading.Thread(target=close_later).start()
+
+        assert await asyncio.wait_for(waiter, timeout=3) == []
+        assert time.monotonic() - started_at < 1
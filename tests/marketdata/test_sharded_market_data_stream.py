@@ -0,0 +1,199 @@
+from typing import List
+
+import pytest
+
+from tinkoff.invest import (
+    CandleInstrument,
+    LastPrice,
+    MarketDataRequest,
+    MarketDataResponse,
+    SubscribeCandlesRequest,
+    SubscriptionAction,
+    SubscriptionInterval,
+)
+from tinkoff.invest.exceptions import MarketDataStreamError
+from tinkoff.invest.market_data_stream.async_sharded_market_data_stream_manager import (
+    AsyncShardedMarketDataStreamManager,
+)
+from tinkoff.invest.market_data_stream.reconnect import ReconnectSettings
+from tinkoff.invest.market_data_stream.sharded_market_data_stream_manager import (
+    ShardedMarketDataStreamManager,
+)
+from tinkoff.invest.market_data_stream.sharding import ShardAllocator, ShardingSettings
+
+ONE_MINUTE = SubscriptionInterval.SUBSCRIPTION_INTERVAL_ONE_MINUTE
+SUBSCRIBE = SubscriptionAction.SUBSCRIPTION_ACTION_SUBSCRIBE
+UNSUBSCRIBE = SubscriptionAction.SUBSCRIPTION_ACTION_UNSUBSCRIBE
+
+
+def candles_request(action: SubscriptionAction, *figis: str) -> MarketDataRequest:
+    return MarketDataRequest(
+        subscribe_candles_request=SubscribeCandlesRequest(
+            subscription_action=action,
+            instruments=[CandleInstrument(figi=f, interval=ONE_MINUTE) for f in figis],
+        )
+    )
+
+
+def figis(request: MarketDataRequest) -> List[str]:
+    return [i.figi for i in request.subscribe_candles_request.instruments]
+
+
+def action(request: MarketDataRequest) -> SubscriptionAction:
+    return request.subscribe_candles_request.subscription_action
+
+
+class FakeMarketDataStreamService:
+    def __init__(self):
+        self.request_sizes: List[int] = []
+
+    def market_data_stream(self, request_iterator):
+        for request in request_iterator:
+            self.request_sizes.append(len(figis(request)))
+            for figi in figis(request):
+                yield MarketDataResponse(last_price=LastPrice(figi=figi))
+
+
+class FakeAsyncMarketDataStreamService(FakeMarketDataStreamService):
+    async def market_data_stream(self, request_iterator):
+        async for request in request_iterator:
+            self.request_sizes.append(len(figis(request)))
+            for figi in figis(request):
+                yield MarketDataResponse(last_price=LastPrice(figi=figi))
+
+
+class TestShardAllocator:
+    def test_places_subscriptions_within_stream_limit(self):
+        allocator = ShardAllocator(ShardingSettings(max_subscriptions_per_stream=2))
+
+        requests = allocator.allocate(candles_request(SUBSCRIBE, "a", "b", "c"))
+
+        assert [(shard_id, figis(r)) for shard_id, r in requests] == [
+            (0, ["a", "b"]),
+            (1, ["c"]),
+        ]
+        assert allocator.get_load(0) == 2
+        assert allocator.get_load(1) == 1
+
+    def test_resubscribe_stays_on_same_shard(self):
+        allocator = ShardAllocator(ShardingSettings(max_subscriptions_per_stream=2))
+        allocator.allocate(candles_request(SUBSCRIBE, "a", "b", "c"))
+
+        ((shard_id, _),) = allocator.allocate(candles_request(SUBSCRIBE, "c"))
+
+        assert shard_id == 1
+        assert allocator.get_load(1) == 1
+
+    def test_raises_when_streams_limit_reached(self):
+        allocator = ShardAllocator(
+            ShardingSettings(max_subscriptions_per_stream=1, max_streams=2)
+        )
+        allocator.allocate(candles_request(SUBSCRIBE, "a", "b"))
+
+        with pytest.raises(MarketDataStreamError):
+            allocator.allocate(candles_request(SUBSCRIBE, "c"))
+
+    def test_routes_unsubscribe_and_closes_empty_shards(self):
+        allocator = ShardAllocator(ShardingSettings(max_subscriptions_per_stream=2))
+        allocator.allocate(candles_request(SUBSCRIBE, "a", "b", "c"))
+
+        requests = allocator.allocate(candles_request(UNSUBSCRIBE, "c", "unknown"))
+
+        assert [(shard_id, figis(r)) for shard_id, r in requests] == [(1, ["c"])]
+        assert action(requests[0][1]) == UNSUBSCRIBE
+        assert allocator.pop_empty_shards() == [1]
+        assert allocator.shard_ids == [0]
+
+    def test_keeps_last_empty_shard(self):
+        allocator = ShardAllocator(ShardingSettings())
+        allocator.allocate(candles_request(SUBSCRIBE, "a"))
+        allocator.allocate(candles_request(UNSUBSCRIBE, "a"))
+
+        assert allocator.pop_empty_shards() == []
+        assert allocator.shard_ids == [0]
+
+    def test_rebalance_moves_least_loaded_shard(self):
+        allocator = ShardAllocator(ShardingSettings(max_subscriptions_per_stream=2))
+        allocator.allocate(candles_request(SUBSCRIBE, "a", "b", "c", "d"))
+        allocator.allocate(candles_request(UNSUBSCRIBE, "a", "d"))
+
+        requests = allocator.rebalance()
+
+        assert [(shard_id, action(r), figis(r)) for shard_id, r in requests] == [
+            (1, SUBSCRIBE, ["b"]),
+            (0, UNSUBSCRIBE, ["b"]),
+        ]
+        assert allocator.pop_empty_shards() == [0]
+        assert allocator.get_load(1) == 2
+
+    def test_broadcasts_non_subscription_requests(self):
+        allocator = ShardAllocator(ShardingSettings(max_subscriptions_per_stream=1))
+        allocator.allocate(candles_request(SUBSCRIBE, "a", "b"))
+        request = MarketDataRequest()
+
+        assert allocator.allocate(request) == [(0, request), (1, request)]
+
+
+class TestShardedMarketDataStreamManager:
+    def test_merges_shard_streams(self):
+        manager = ShardedMarketDataStreamManager(
+            FakeMarketDataStreamService(),
+            ShardingSettings(max_subscriptions_per_stream=2),
+        )
+        manager.candles.subscribe(
+            [CandleInstrument(figi=f, interval=ONE_MINUTE) for f in "abc"]
+        )
+
+        stream = iter(manager)
+        received = {next(stream).last_price.figi for _ in range(3)}
+        manager.candles.subscribe([CandleInstrument(figi="d", interval=ONE_MINUTE)])
+        received.add(next(stream).last_price.figi)
+        manager.stop()
+
+        assert received == {"a", "b", "c", "d"}
+        assert manager.get_shard_loads() == {0: 2, 1: 2}
+        with pytest.raises(StopIteration):
+            next(stream)
+
+    def test_shards_respect_max_instruments_per_request(self):
+        service = FakeMarketDataStreamService()
+        manager = ShardedMarketDataStreamManager(
+            service, ShardingSettings(max_instruments_per_request=2)
+        )
+        manager.candles.subscribe(
+            [CandleInstrument(figi=f, interval=ONE_MINUTE) for f in "abcde"]
+        )
+
+        stream = iter(manager)
+        received = {next(stream).last_price.figi for _ in range(5)}
+        manager.stop()
+
+        assert received == set("abcde")
+        assert service.request_sizes == [2, 2, 1]
+
+
+class TestAsyncShardedMarketDataStreamManager:
+    async def test_shards_respect_max_instruments_per_request(self):
+        service = FakeAsyncMarketDataStreamService()
+        manager = AsyncShardedMarketDataStreamManager(
+            service, ShardingSettings(max_instruments_per_request=2)
+        )
+        manager.candles.subscribe(
+            [CandleInstrument(figi=f, interval=ONE_MINUTE) for f in "abcde"]
+        )
+
+        received = set()
+        async for market_data in manager:
+            received.add(market_data.last_price.figi)
+            if len(received) == 5:
+                manager.stop()
+
+        assert received == set("abcde")
+        assert service.request_sizes == [2, 2, 1]
+
+    def test_rejects_reconnect_settings(self):
+        with pytest.raises(ValueError):
+            AsyncShardedMarketDataStreamManager(
+                FakeAsyncMarketDataStreamService(),
+                ShardingSettings(reconnect_settings=ReconnectSettings()),
+            )
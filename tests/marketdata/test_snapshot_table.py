@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import pytest
+
+from tinkoff.invest import (
+    GetLastPricesResponse,
+    GetTradingStatusResponse,
+    LastPrice,
+    MarketDataResponse,
+    Quotation,
+    SecurityTradingStatus,
+    TradingStatus,
+)
+from tinkoff.invest.market_data_stream.snapshot_table import MarketSnapshotTable
+from tinkoff.invest.schemas import GetTradingStatusesResponse
+from tinkoff.invest.services import MarketDataService
+
+TIME = datetime(2023, 1, 2, 10, tzinfo=timezone.utc)
+NORMAL_TRADING = SecurityTradingStatus.SECURITY_TRADING_STATUS_NORMAL_TRADING
+
+
+def last_price(uid: str, units: int, time: datetime = TIME) -> LastPrice:
+    return LastPrice(
+        figi="", price=Quotation(units=units, nano=0), time=time, instrument_uid=uid
+    )
+
+
+@pytest.fixture()
+def market_data_service():
+    service = mock.create_autospec(MarketDataService, instance=True)
+    service.get_last_prices.side_effect = lambda instrument_id: GetLastPricesResponse(
+        last_prices=[last_price(uid, 100) for uid in instrument_id]
+    )
+    service.get_trading_statuses.side_effect = (
+        lambda instrument_ids: GetTradingStatusesResponse(
+            trading_statuses=[
+                GetTradingStatusResponse(
+                    figi="",
+                    trading_status=NORMAL_TRADING,
+                    limit_order_available_flag=True,
+                    market_order_available_flag=False,
+                    api_trade_available_flag=True,
+                    instrument_uid=uid,
+                    bestprice_order_available_flag=False,
+                    only_best_price=False,
+                )
+                for uid in instrument_ids
+            ]
+        )
+    )
+    return service
+
+
+class TestMarketSnapshotTable:
+    def test_updates_from_stream(self):
+        table = MarketSnapshotTable(capacity=1)
+
+        table.update_from_market_data(
+            MarketDataResponse(last_price=last_price("a", 10))
+        )
+        table.update_from_market_data(
+            MarketDataResponse(last_price=last_price("b", 20))
+        )
+        table.update_from_market_data(
+            MarketDataResponse(
+                trading_status=TradingStatus(
+                    figi="",
+                    trading_status=NORMAL_TRADING,
+                    time=TIME,
+                    limit_order_available_flag=True,
+                    market_order_available_flag=True,
+                    instrument_uid="a",
+                )
+            )
+        )
+
+        snapshot = table.get_last_price("b")
+        assert snapshot.price == Quotation(units=20, nano=0)
+        assert snapshot.time == TIME
+        assert table.get_trading_status("a").trading_status == NORMAL_TRADING
+        assert table.get_trading_status("b") is None
+        uids, prices = table.last_prices_array()
+        assert uids == ["a", "b"]
+        assert prices.tolist() == [10_000_000_000, 20_000_000_000]
+
+    def test_ignores_older_prices(self):
+        table = MarketSnapshotTable()
+        table.update_last_price(last_price("a", 10))
+
+        table.update_last_price(last_price("a", 5, TIME - timedelta(seconds=1)))
+
+        assert table.get_last_price("a").price.units == 10
+
+    def test_loads_only_cold_instruments_in_one_request(self, market_data_service):
+        table = MarketSnapshotTable(market_data_service)
+        table.update_last_price(last_price("a", 10))
+
+        prices = table.get_last_prices(["a", "b", "c"])
+
+        market_data_service.get_last_prices.assert_called_once_with(
+            instrument_id=["b", "c"]
+        )
+        assert {uid: p.price.units for uid, p in prices.items()} == {
+            "a": 10,
+            "b": 100,
+            "c": 100,
+        }
+        table.get_last_prices(["a", "b", "c"])
+        assert market_data_service.get_last_prices.call_count == 1
+
+    def test_reloads_stale_values(self, market_data_service):
+        table = MarketSnapshotTable(market_data_service, max_age=timedelta(minutes=1))
+        table.update_last_price(
+            last_price("a", 10),
+            received_at=datetime.now(timezone.utc) - timedelta(hours=1),
+        )
+
+        prices = table.get_last_prices(["a"])
+
+        assert prices["a"].price.units == 100
+
+    def test_loads_trading_statuses(self, market_data_service):
+        table = MarketSnapshotTable(market_data_service)
+
+        statuses = table.get_trading_statuses(["a"])
+
+        market_data_service.get_trading_statuses.assert_called_once_with(
+            instrument_ids=["a"]
+        )
+        assert statuses["a"].limit_order_available_flag is True
+        assert statuses["a"].market_order_available_flag is False
+
+    def test_requires_service_for_cold_instruments(self):
+        with pytest.raises(ValueError):
+            MarketSnapshotTable().get_last_prices(["a"])
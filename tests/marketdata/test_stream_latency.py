@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import pytest
+from google.protobuf.timestamp_pb2 import Timestamp
+
+from tinkoff.invest.grpc import common_pb2, marketdata_pb2
+from tinkoff.invest.market_data_stream.latency import (
+    LatencyHistogram,
+    StreamLatencyStats,
+)
+from tinkoff.invest.market_data_stream.market_data_stream_manager import (
+    MarketDataStreamManager,
+)
+from tinkoff.invest.services import MarketDataStreamService
+
+
+def timestamp(value: datetime) -> Timestamp:
+    result = Timestamp()
+    result.FromDatetime(value)
+    return result
+
+
+def candle(server_time: datetime) -> marketdata_pb2.MarketDataResponse:
+    return marketdata_pb2.MarketDataResponse(
+        candle=marketdata_pb2.Candle(figi="a", time=timestamp(server_time))
+    )
+
+
+class TestLatencyHistogram:
+    def test_snapshot(self):
+        histogram = LatencyHistogram(bucket_bounds=[0.001, 0.01, 0.1])
+        for value in [0.0005] * 50 + [0.005] * 45 + [0.05] * 4 + [1.0]:
+            histogram.record(value)
+
+        snapshot = histogram.snapshot()
+
+        assert snapshot.count == 100
+        assert snapshot.min == 0.0005
+        assert snapshot.max == 1.0
+        assert snapshot.mean == pytest.approx(0.0145)
+        assert snapshot.p50 == 0.001
+        assert snapshot.p90 == 0.01
+        assert snapshot.p99 == 0.1
+        assert histogram.percentile(100) == 1.0
+        assert histogram.bucket_counts == [50, 45, 4, 1]
+
+    def test_empty_snapshot(self):
+        assert LatencyHistogram().snapshot().count == 0
+
+
+class TestStreamLatencyStats:
+    def test_records_latencies_per_payload_type(self):
+        stats = StreamLatencyStats()
+        server_time = datetime.now(timezone.utc) - timedelta(seconds=2)
+
+        with stats.measure(candle(server_time)):
+            pass
+        with stats.measure(marketdata_pb2.MarketDataResponse(ping=common_pb2.Ping())):
+            pass
+
+        assert stats.payload_types == ["candle", "ping"]
+        network = stats.get("candle").server_to_receive.snapshot()
+        assert network.count == 1
+        assert network.min == pytest.approx(2, abs=0.5)
+        assert stats.get("candle").receive_to_yield.count == 1
+        assert stats.get("ping").server_to_receive.count == 0
+        assert stats.snapshot()["ping"]["receive_to_yield"].count == 1
+
+    def test_stream_manager_collects_latencies(self):
+        service = MarketDataStreamService(mock.MagicMock(), metadata=[])
+        service.stub = mock.Mock()
+        service.stub.MarketDataStream.return_value = iter(
+            [candle(datetime.now(timezone.utc))] * 3
+        )
+        stats = StreamLatencyStats()
+
+        responses = list(MarketDataStreamManager(service, latency_stats=stats))
+
+        assert len(responses) == 3
+        assert stats.get("candle").receive_to_yield.count == 3
+        assert stats.get("candle").server_to_receive.count == 3
@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import pytest
+
+from tinkoff.invest import MarketDataResponse, Quotation, Trade, TradeDirection
+from tinkoff.invest.market_data_stream.trade_aggregator import (
+    BarType,
+    TradeAggregator,
+    candle_to_historic_candle,
+)
+
+START = datetime(2023, 1, 2, 10, tzinfo=timezone.utc)
+
+
+def trade(uid: str, seconds: float, price: int, quantity: int = 1) -> Trade:
+    return Trade(
+        figi=f"figi-{uid}",
+        direction=TradeDirection.TRADE_DIRECTION_BUY,
+        price=Quotation(units=price, nano=0),
+        quantity=quantity,
+        time=START + timedelta(seconds=seconds),
+        instrument_uid=uid,
+    )
+
+
+def ohlcv(candles) -> List[tuple]:
+    return [
+        (
+            candle.instrument_uid,
+            candle.open.units,
+            candle.high.units,
+            candle.low.units,
+            candle.close.units,
+            candle.volume,
+        )
+        for candle in candles
+    ]
+
+
+class TestTimeBars:
+    def test_builds_bars_across_batches(self):
+        aggregator = TradeAggregator(BarType.TIME, timedelta(seconds=10))
+
+        first = aggregator.update(
+            [trade("a", 1, 10), trade("b", 2, 50), trade("a", 3, 12, 2)]
+        )
+        second = aggregator.update(
+            [trade("a", 5, 8), trade("a", 11, 9), trade("a", 25, 7), trade("b", 9, 51)]
+        )
+
+        assert first == []
+        assert ohlcv(second) == [("a", 10, 12, 8, 8, 4), ("a", 9, 9, 9, 9, 1)]
+        assert second[0].time == START
+        assert second[0].last_trade_ts == START + timedelta(seconds=5)
+        assert second[0].figi == "figi-a"
+        assert ohlcv([aggregator.in_progress("a")]) == [("a", 7, 7, 7, 7, 1)]
+        assert aggregator.in_progress("a").time == START + timedelta(seconds=20)
+        assert ohlcv(aggregator.in_progress_bars()) == [
+            ("a", 7, 7, 7, 7, 1),
+            ("b", 50, 51, 50, 51, 2),
+        ]
+
+    def test_late_trade_goes_to_current_bar(self):
+        aggregator = TradeAggregator(BarType.TIME, timedelta(seconds=10))
+        aggregator.update([trade("a", 12, 10)])
+
+        assert aggregator.update([trade("a", 3, 20)]) == []
+        assert aggregator.in_progress("a").high.units == 20
+
+    def test_close_expired_and_flush(self):
+        aggregator = TradeAggregator(BarType.TIME, timedelta(seconds=10))
+        aggregator.update([trade("a", 1, 10), trade("b", 15, 20)])
+
+        expired = aggregator.close_expired(START + timedelta(seconds=10))
+
+        assert ohlcv(expired) == [("a", 10, 10, 10, 10, 1)]
+        assert aggregator.in_progress("a") is None
+        assert ohlcv(aggregator.flush()) == [("b", 20, 20, 20, 20, 1)]
+        assert aggregator.in_progress_bars() == []
+
+
+class TestTickBars:
+    def test_splits_by_trade_count(self):
+        aggregator = TradeAggregator(BarType.TICK, 3, capacity=1)
+
+        first = aggregator.update([trade("a", i, 10 + i) for i in range(4)])
+        second = aggregator.update(
+            [trade("b", 0, 1)] + [trade("a", i, 10 + i) for i in range(4, 7)]
+        )
+
+        assert ohlcv(first) == [("a", 10, 12, 10, 12, 3)]
+        assert ohlcv(second) == [("a", 13, 15, 13, 15, 3)]
+        assert ohlcv([aggregator.in_progress("a")]) == [("a", 16, 16, 16, 16, 1)]
+        assert second[0].time == START + timedelta(seconds=3)
+
+
+class TestVolumeBars:
+    def test_splits_by_cumulative_volume(self):
+        aggregator = TradeAggregator(BarType.VOLUME, 10)
+
+        first = aggregator.update([trade("a", 0, 1, 8), trade("a", 1, 2, 5)])
+        second = aggregator.update([trade("a", 2, 3, 5), trade("a", 3, 4, 1)])
+        third = aggregator.update([trade("a", 4, 5, 1), trade("a", 5, 6, 2)])
+
+        assert ohlcv(first) == [("a", 1, 2, 1, 2, 13)]
+        assert second == []
+        assert ohlcv(third) == [("a", 3, 5, 3, 5, 7)]
+        assert ohlcv([aggregator.in_progress("a")]) == [("a", 6, 6, 6, 6, 2)]
+
+    def test_matches_one_by_one_updates(self):
+        trades = [
+            trade(uid, i, i % 7 + 1, i % 5 + 1) for i in range(60) for uid in "ab"
+        ]
+        batched = TradeAggregator(BarType.VOLUME, 9)
+        single = TradeAggregator(BarType.VOLUME, 9)
+
+        batched_candles = batched.update(trades)
+        single_candles = [c for t in trades for c in single.update([t])]
+
+        key = lambda candle: (candle.instrument_uid, candle.time)  # noqa: E731
+        assert ohlcv(sorted(batched_candles, key=key)) == ohlcv(
+            sorted(single_candles, key=key)
+        )
+
+
+def test_update_from_market_data_and_historic_candle():
+    aggregator = TradeAggregator(BarType.TICK, 1)
+
+    (candle,) = aggregator.update_from_market_data(
+        MarketDataResponse(trade=trade("a", 0, 10))
+    )
+    historic = candle_to_historic_candle(candle, is_complete=True)
+
+    assert historic.close == Quotation(units=10, nano=0)
+    assert historic.is_complete is True
+    assert aggregator.update_from_market_data(MarketDataResponse()) == []
+
+
+def test_validates_size():
+    with pytest.raises(ValueError):
+        TradeAggregator(BarType.TIME, 10)
+    with pytest.raises(ValueError):
+        TradeAggregator(BarType.TICK, 0)
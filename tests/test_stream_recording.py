@@ -0,0 +1,172 @@
+from unittest import mock
+
+import pytest
+
+from tinkoff.invest import MarketDataResponse
+from tinkoff.invest.async_services import (
+    MarketDataStreamService as AsyncMarketDataStreamService,
+)
+from tinkoff.invest.exceptions import StreamRecordingError
+from tinkoff.invest.grpc import marketdata_pb2, operations_pb2
+from tinkoff.invest.market_data_stream.async_market_data_stream_manager import (
+    AsyncMarketDataStreamManager,
+)
+from tinkoff.invest.market_data_stream.market_data_stream_manager import (
+    MarketDataStreamManager,
+)
+from tinkoff.invest.services import MarketDataStreamService
+from tinkoff.invest.stream_recording.format import (
+    MAGIC,
+    RecordType,
+    RecordWriter,
+    read_records,
+)
+from tinkoff.invest.stream_recording.recorder import (
+    record_async_service,
+    record_service,
+)
+from tinkoff.invest.stream_recording.replayer import (
+    StreamReplayer,
+    replay_async_service,
+    replay_service,
+)
+
+
+def last_price(figi: str) -> marketdata_pb2.MarketDataResponse:
+    return marketdata_pb2.MarketDataResponse(
+        last_price=marketdata_pb2.LastPrice(figi=figi)
+    )
+
+
+@pytest.fixture()
+def recording(tmp_path):
+    path = tmp_path / "stream.rec"
+    with RecordWriter(path) as writer:
+        for i, figi in enumerate(("a", "b", "c")):
+            writer.write(
+                RecordType.MARKET_DATA,
+                last_price(figi).SerializeToString(),
+                received_at_ns=i * 1_000_000_000,
+            )
+        writer.write_message(
+            RecordType.PORTFOLIO, operations_pb2.PortfolioStreamResponse()
+        )
+    return path
+
+
+def market_data_stream_service(cls=MarketDataStreamService):
+    return cls(mock.MagicMock(), metadata=[])
+
+
+class TestRecordFormat:
+    def test_reads_written_records(self, recording):
+        records = list(read_records(recording))
+
+        assert [r.record_type for r in records] == [RecordType.MARKET_DATA] * 3 + [
+            RecordType.PORTFOLIO
+        ]
+        assert records[1].received_at_ns == 1_000_000_000
+        assert records[1].parse().last_price.figi == "b"
+
+    def test_filters_record_types(self, recording):
+        records = list(read_records(recording, [RecordType.PORTFOLIO]))
+
+        assert len(records) == 1
+
+    def test_skips_truncated_record(self, recording):
+        with open(recording, "ab") as file:
+            file.write(b"\x01\x00\x00")
+
+        assert len(list(read_records(recording))) == 4
+
+    def test_appends_to_existing_recording(self, recording):
+        with RecordWriter(recording) as writer:
+            writer.write_message(RecordType.MARKET_DATA, last_price("d"))
+
+        assert len(list(read_records(recording))) == 5
+        assert recording.read_bytes().count(MAGIC) == 1
+
+    def test_skips_unknown_record_type(self, recording):
+        with RecordWriter(recording) as writer:
+            writer.write(99, b"future")  # type: ignore[arg-type]
+            writer.write_message(RecordType.MARKET_DATA, last_price("d"))
+
+        records = list(read_records(recording))
+
+        assert len(records) == 5
+        assert records[-1].parse().last_price.figi == "d"
+
+    def test_raises_on_unknown_file(self, tmp_path):
+        path = tmp_path / "other.bin"
+        path.write_bytes(b"garbage")
+
+        with pytest.raises(StreamRecordingError):
+            list(read_records(path))
+
+
+class TestRecordAndReplay:
+    def test_records_service_stream(self, tmp_path):
+        path = tmp_path / "recorded.rec"
+        service = market_data_stream_service()
+        stream_call = service.channel.stream_stream.return_value
+        stream_call.return_value = iter(
+            [last_price("a").SerializeToString(), last_price("b").SerializeToString()]
+        )
+
+        with RecordWriter(path) as writer:
+            record_service(service, writer)
+            responses = list(service.market_data_stream(iter([])))
+
+        assert [r.last_price.figi for r in responses] == ["a", "b"]
+        assert [r.parse() for r in read_records(path)] == [
+            last_price("a"),
+            last_price("b"),
+        ]
+        stream_stream = service.channel.stream_stream
+        assert stream_stream.call_args.kwargs["response_deserializer"] is None
+
+    async def test_records_async_service_stream(self, tmp_path):
+        async def responses_bytes():
+            yield last_price("a").SerializeToString()
+
+        path = tmp_path / "recorded.rec"
+        service = market_data_stream_service(AsyncMarketDataStreamService)
+        stream_call = service.channel.stream_stream.return_value
+        stream_call.return_value = responses_bytes()
+
+        with RecordWriter(path) as writer:
+            record_async_service(service, writer)
+            responses = [r async for r in service.market_data_stream(iter([]))]
+
+        assert [r.last_price.figi for r in responses] == ["a"]
+        assert [r.parse() for r in read_records(path)] == [last_price("a")]
+
+    def test_replays_through_stream_manager(self, recording):
+        service = market_data_stream_service()
+        replay_service(service, StreamReplayer(recording, speed=None))
+
+        responses = list(MarketDataStreamManager(service))
+
+        assert all(isinstance(r, MarketDataResponse) for r in responses)
+        assert [r.last_price.figi for r in responses] == ["a", "b", "c"]
+
+    def test_keeps_recorded_intervals(self, recording):
+        sleep = mock.Mock()
+        replayer = StreamReplayer(recording, speed=2.0, sleep=sleep)
+
+        list(replayer.iter_messages(RecordType.MARKET_DATA))
+
+        delays = [call.args[0] for call in sleep.call_args_list]
+        assert delays == [
+            pytest.approx(0.5, abs=0.1),
+            pytest.approx(1.0, abs=0.1),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_replays_through_async_stream_manager(self, recording):
+        service = market_data_stream_service(AsyncMarketDataStreamService)
+        replay_async_service(service, StreamReplayer(recording, speed=None))
+
+        responses = [r async for r in AsyncMarketDataStreamManager(service)]
+
+        assert [r.last_price.figi for r in responses] == ["a", "b", "c"]
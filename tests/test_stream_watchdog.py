@@ -0,0 +1,251 @@
+import asyncio
+import threading
+from datetime import timedelta
+from typing import List
+
+import pytest
+
+from tests.marketdata.test_market_data_stream_reconnect import (
+    candle_instrument,
+    last_price,
+    subscribed_figis,
+)
+from tinkoff.invest import MarketDataRequest, MarketDataResponse
+from tinkoff.invest.exceptions import StreamStalledError
+from tinkoff.invest.market_data_stream.market_data_stream_manager import (
+    MarketDataStreamManager,
+)
+from tinkoff.invest.schemas import Ping
+from tinkoff.invest.stream_watchdog import (
+    StallAction,
+    StallKind,
+    StreamStall,
+    StreamWatchdog,
+    WatchdogSettings,
+)
+
+STALL_TIMEOUT = timedelta(milliseconds=50)
+CHECK_INTERVAL = timedelta(milliseconds=5)
+
+
+def make_watchdog(action: StallAction, **kwargs) -> StreamWatchdog:
+    return StreamWatchdog(
+        WatchdogSettings(
+            stall_timeout=STALL_TIMEOUT,
+            check_interval=CHECK_INTERVAL,
+            action=action,
+            **kwargs,
+        )
+    )
+
+
+def ping() -> MarketDataResponse:
+    return MarketDataResponse(ping=Ping())
+
+
+def hanging_stream(messages: List[MarketDataResponse], release: threading.Event):
+    yield from messages
+    release.wait(5)
+
+
+async def hanging_async_stream(messages: List[MarketDataResponse]):
+    for message in messages:
+        yield message
+    await asyncio.sleep(5)
+
+
+async def async_stream(messages: List[MarketDataResponse]):
+    for message in messages:
+        yield message
+
+
+class TestStreamWatchdog:
+    def test_passes_messages_and_counts_pings(self):
+        watchdog = make_watchdog(StallAction.RAISE)
+        messages = [last_price("a"), ping(), last_price("b")]
+
+        received = list(watchdog.watch(iter(messages), "market_data"))
+
+        assert received == messages
+        stats = watchdog.get_stats("market_data")
+        assert (stats.messages, stats.pings, stats.stalls) == (3, 1, 0)
+        assert stats.last_data_at is not None
+
+    def test_raises_on_stall(self):
+        watchdog = make_watchdog(StallAction.RAISE)
+        release = threading.Event()
+        stream = watchdog.watch(hanging_stream([last_price("a")], release), "s")
+
+        assert next(stream).last_price.figi == "a"
+        with pytest.raises(StreamStalledError) as exc_info:
+            next(stream)
+        release.set()
+
+        stall = exc_info.value.stall
+        assert stall.stream_name == "s"
+        assert stall.kind == StallKind.MESSAGES
+        assert stall.stalled_for >= STALL_TIMEOUT
+        assert watchdog.get_stats("s").stalls == 1
+
+    def test_calls_callback_once_per_stall(self):
+        stalls: List[StreamStall] = []
+        release = threading.Event()
+
+        def stream():
+            yield from hanging_stream([], release)
+            yield last_price("late")
+
+        def on_stall(stall: StreamStall):
+            stalls.append(stall)
+            release.set()
+
+        watchdog = make_watchdog(StallAction.CALLBACK, on_stall=on_stall)
+        received = list(watchdog.watch(stream(), "s"))
+
+        assert [m.last_price.figi for m in received] == ["late"]
+        assert len(stalls) == 1
+        assert watchdog.get_stats("s").stalls == 1
+
+    def test_detects_data_stall_when_only_pings_arrive(self):
+        watchdog = make_watchdog(
+            StallAction.RAISE, data_stall_timeout=timedelta(milliseconds=20)
+        )
+
+        def pings():
+            yield last_price("a")
+            while True:
+                yield ping()
+
+        with pytest.raises(StreamStalledError) as exc_info:
+            for _ in watchdog.watch(pings(), "s"):
+                pass
+
+        assert exc_info.value.stall.kind == StallKind.DATA
+
+    def test_reconnects_on_stall(self):
+        watchdog = make_watchdog(StallAction.RECONNECT)
+        release = threading.Event()
+
+        received = list(
+            watchdog.watch(
+                hanging_stream([last_price("a")], release),
+                "s",
+                reconnect=lambda: iter([last_price("b")]),
+            )
+        )
+        release.set()
+
+        assert [m.last_price.figi for m in received] == ["a", "b"]
+        stats = watchdog.get_stats("s")
+        assert (stats.stalls, stats.reconnects) == (1, 1)
+
+    def test_reconnect_action_requires_reconnect(self):
+        watchdog = make_watchdog(StallAction.RECONNECT)
+
+        with pytest.raises(ValueError):
+            next(watchdog.watch(iter([]), "s"))
+
+    def test_reraises_stream_errors(self):
+        def failing():
+            yield last_price("a")
+            raise RuntimeError("boom")
+
+        watchdog = make_watchdog(StallAction.RAISE)
+
+        with pytest.raises(RuntimeError):
+            list(watchdog.watch(failing(), "s"))
+
+    def test_reconnects_market_data_stream_manager(self):
+        release = threading.Event()
+        replayed: List[MarketDataRequest] = []
+
+        class Service:
+            calls = 0
+
+            def market_data_stream(self, request_iterator):
+                self.calls += 1
+                if self.calls == 1:
+                    yield from hanging_stream([last_price("a")], release)
+                    return
+                replayed.append(next(request_iterator))
+                yield last_price("b")
+
+        manager = MarketDataStreamManager(Service())
+        manager.candles.subscribe([candle_instrument("x")])
+        watchdog = make_watchdog(StallAction.RECONNECT)
+
+        received = []
+        for market_data in watchdog.watch(manager, "s", reconnect=manager.reconnect):
+            received.append(market_data.last_price.figi)
+            if len(received) == 2:
+                manager.stop()
+                break
+        release.set()
+
+        assert received == ["a", "b"]
+        assert subscribed_figis(replayed) == [["x"]]
+
+    def test_reconnect_keeps_messages_and_stops_old_reader(self):
+        release = threading.Event()
+        figis = [f"n{i}" for i in range(1000)]
+
+        def old_stream():
+            yield from hanging_stream([last_price("a")], release)
+            # мёртвый стрим «оживает», пока читается новый
+            yield last_price("late")
+
+        class Service:
+            calls = 0
+
+            def market_data_stream(self, request_iterator):
+                self.calls += 1
+                if self.calls == 1:
+                    return old_stream()
+                release.set()
+                return iter([last_price(figi) for figi in figis])
+
+        manager = MarketDataStreamManager(Service())
+        watchdog = make_watchdog(StallAction.RECONNECT, buffer_size=5)
+
+        received = [
+            market_data.last_price.figi
+            for market_data in watchdog.watch(
+                manager, "lossless", reconnect=manager.reconnect
+            )
+        ]
+
+        assert received == ["a", *figis]
+        for thread in threading.enumerate():
+            if thread.name == "StreamWatchdog-lossless":
+                thread.join(timeout=1)
+                assert not thread.is_alive()
+
+
+class TestAsyncStreamWatchdog:
+    async def test_raises_on_stall(self):
+        watchdog = make_watchdog(StallAction.RAISE)
+        received = []
+
+        with pytest.raises(StreamStalledError):
+            async for message in watchdog.watch_async(
+                hanging_async_stream([last_price("a")]), "s"
+            ):
+                received.append(message)
+
+        assert [m.last_price.figi for m in received] == ["a"]
+        assert watchdog.get_stats("s").stalls == 1
+
+    async def test_reconnects_on_stall(self):
+        watchdog = make_watchdog(StallAction.RECONNECT)
+
+        received = [
+            message
+            async for message in watchdog.watch_async(
+                hanging_async_stream([last_price("a")]),
+                "s",
+                reconnect=lambda: async_stream([last_price("b")]),
+            )
+        ]
+
+        assert [m.last_price.figi for m in received] == ["a", "b"]
+        assert watchdog.get_stats("s").reconnects == 1
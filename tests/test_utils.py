@@ -1,10 +1,19 @@
 # pylint:disable=protected-access
-from datetime import datetime
+from datetime import datetime, timezone
 
 import pytest
 
-from tinkoff.invest.schemas import CandleInterval
-from tinkoff.invest.utils import empty_or_uuid, get_intervals
+from tinkoff.invest.schemas import CandleInterval, Quotation
+from tinkoff.invest.utils import (
+    datetime_to_microseconds,
+    empty_or_uuid,
+    get_intervals,
+    microseconds_to_datetime,
+    nano_to_decimal,
+    nano_to_money,
+    nano_to_quotation,
+    quotation_to_nano,
+)
 
 
 @pytest.mark.parametrize(
@@ -69,3 +78,34 @@ def test_get_intervals(candle_interval, interval, intervals):
 )
 def test_is_empty_or_uuid(s: str, expected: bool):
     assert expected == empty_or_uuid(s)
+
+
+@pytest.mark.parametrize(
+    ("quotation", "nano"),
+    [
+        (Quotation(units=100, nano=500_000_000), 100_500_000_000),
+        (Quotation(units=-1, nano=-250_000_000), -1_250_000_000),
+        (Quotation(units=0, nano=-1), -1),
+    ],
+)
+def test_quotation_nano_round_trip(quotation: Quotation, nano: int):
+    assert quotation_to_nano(quotation) == nano
+    restored = nano_to_quotation(nano)
+    assert (restored.units, restored.nano) == (quotation.units, quotation.nano)
+
+
+def test_nano_to_money_keeps_sign_of_units_and_nano():
+    money = nano_to_money(-1_250_000_000, "rub")
+
+    assert (money.currency, money.units, money.nano) == ("rub", -1, -250_000_000)
+
+
+def test_nano_to_decimal():
+    assert str(nano_to_decimal(-1_250_000_000)) == "-1.250000000"
+
+
+def test_datetime_microseconds_round_trip():
+    value = datetime(2023, 6, 1, 10, 0, 0, 123456, tzinfo=timezone.utc)
+
+    assert datetime_to_microseconds(value) == 1_685_613_600_123_456
+    assert microseconds_to_datetime(1_685_613_600_123_456) == value
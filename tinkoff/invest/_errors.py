@@ -108,8 +108,9 @@ def handle_aio_request_error_gen(name: str) -> Callable[[TFunc], TFunc]:
     def decorator(func: TFunc) -> TFunc:
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            stream = func(*args, **kwargs)
             try:
-                async for result in func(*args, **kwargs):
+                async for result in stream:
                     yield result
             except AioRpcError as e:
                 metadata = get_metadata_from_aio_error(e)
@@ -126,6 +127,9 @@ def handle_aio_request_error_gen(name: str) -> Callable[[TFunc], TFunc]:
                     raise AioUnauthenticatedError(status_code, details, metadata) from e
 
                 raise AioRequestError(status_code, details, metadata) from e
+            finally:
+                # закрываем стрим сразу, а не при сборке мусора
+                await stream.aclose()
 
         return cast(TFunc, wrapper)
 
@@ -234,6 +234,7 @@ class Service(ABC):
     _stub_factory: Any
 
     def __init__(self, channel, metadata):
+        self.channel = channel
         self.stub = self._stub_factory(channel)
         self.metadata = metadata
 
@@ -1,7 +1,7 @@
 # pylint:disable=redefined-builtin,too-many-lines
 import asyncio
 from datetime import datetime
-from typing import AsyncGenerator, AsyncIterable, List, Optional
+from typing import Any, AsyncGenerator, AsyncIterable, List, Optional
 
 import grpc
 from deprecation import deprecated
@@ -31,6 +31,12 @@ from .logging import get_tracking_id_from_coro, log_request
 from .market_data_stream.async_market_data_stream_manager import (
     AsyncMarketDataStreamManager,
 )
+from .market_data_stream.async_sharded_market_data_stream_manager import (
+    AsyncShardedMarketDataStreamManager,
+)
+from .market_data_stream.latency import StreamLatencyStats
+from .market_data_stream.payload import RawPayloadFilter, get_raw_payload_key
+from .market_data_stream.sharding import ShardingSettings
 from .metadata import get_metadata
 from .schemas import (
     AssetRequest,
@@ -254,8 +260,23 @@ class AsyncServices:
         self.stop_orders = StopOrdersService(channel, metadata)
         self.signals = SignalsService(channel, metadata)
 
-    def create_market_data_stream(self) -> AsyncMarketDataStreamManager:
-        return AsyncMarketDataStreamManager(market_data_stream=self.market_data_stream)
+    def create_market_data_stream(
+        self,
+        payload_filter: Optional[RawPayloadFilter] = None,
+        latency_stats: Optional[StreamLatencyStats] = None,
+    ) -> AsyncMarketDataStreamManager:
+        return AsyncMarketDataStreamManager(
+            market_data_stream=self.market_data_stream,
+            payload_filter=payload_filter,
+            latency_stats=latency_stats,
+        )
+
+    def create_sharded_market_data_stream(
+        self, settings: Optional[ShardingSettings] = None
+    ) -> AsyncShardedMarketDataStreamManager:
+        return AsyncShardedMarketDataStreamManager(
+            market_data_stream=self.market_data_stream, settings=settings
+        )
 
     async def cancel_all_orders(self, account_id: AccountId) -> None:
         orders_service: OrdersService = self.orders
@@ -1249,6 +1270,17 @@ class MarketDataService(_grpc_helpers.Service):
         return _grpc_helpers.protobuf_to_dataclass(response, GetMarketValuesResponse)
 
 
+async def _close_stream_call(call: Any) -> None:
+    """Отменить вызов grpc или закрыть асинхронный генератор стаба."""
+    cancel = getattr(call, "cancel", None)
+    if cancel is not None:
+        cancel()
+        return
+    aclose = getattr(call, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
 class MarketDataStreamService(_grpc_helpers.Service):
     _stub_factory = marketdata_pb2_grpc.MarketDataStreamServiceStub
 
@@ -1265,12 +1297,31 @@ class MarketDataStreamService(_grpc_helpers.Service):
     async def market_data_stream(
         self,
         request_iterator: AsyncIterable[MarketDataRequest],
+        payload_filter: Optional[RawPayloadFilter] = None,
+        latency_stats: Optional[StreamLatencyStats] = None,
     ) -> AsyncIterable[MarketDataResponse]:
-        async for response in self.stub.MarketDataStream(
+        call = self.stub.MarketDataStream(
             request_iterator=self._convert_market_data_stream_request(request_iterator),
             metadata=self.metadata,
-        ):
-            yield _grpc_helpers.protobuf_to_dataclass(response, MarketDataResponse)
+        )
+        try:
+            async for response in call:
+                if payload_filter is not None and not payload_filter(
+                    *get_raw_payload_key(response)
+                ):
+                    continue
+                if latency_stats is None:
+                    yield _grpc_helpers.protobuf_to_dataclass(
+                        response, MarketDataResponse
+                    )
+                    continue
+                with latency_stats.measure(response):
+                    market_data = _grpc_helpers.protobuf_to_dataclass(
+                        response, MarketDataResponse
+                    )
+                yield market_data
+        finally:
+            await _close_stream_call(call)
 
 
 class OperationsService(_grpc_helpers.Service):
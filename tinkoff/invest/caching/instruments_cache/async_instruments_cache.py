@@ -0,0 +1,242 @@
+import asyncio
+import logging
+from typing import Dict, List, cast
+
+from tinkoff.invest import (
+    Bond,
+    BondResponse,
+    BondsResponse,
+    CurrenciesResponse,
+    Currency,
+    CurrencyResponse,
+    Etf,
+    EtfResponse,
+    EtfsResponse,
+    Future,
+    FutureResponse,
+    FuturesResponse,
+    InstrumentIdType,
+    InstrumentStatus,
+    Share,
+    ShareResponse,
+    SharesResponse,
+)
+from tinkoff.invest.async_services import InstrumentsService
+from tinkoff.invest.caching.instruments_cache.instrument_storage import (
+    InstrumentStorage,
+)
+from tinkoff.invest.caching.instruments_cache.interface import IAsyncInstrumentsGetter
+from tinkoff.invest.caching.instruments_cache.models import (
+    InstrumentResponse,
+    InstrumentsResponse,
+)
+from tinkoff.invest.caching.instruments_cache.protocol import (
+    AsyncInstrumentsResponseCallable,
+)
+from tinkoff.invest.caching.instruments_cache.settings import InstrumentsCacheSettings
+from tinkoff.invest.caching.overrides import TTLCache
+
+logger = logging.getLogger(__name__)
+
+AnyInstrumentStorage = InstrumentStorage[InstrumentResponse, InstrumentsResponse]
+
+
+class AsyncInstrumentsCache(IAsyncInstrumentsGetter):
+    """Кэш инструментов для AsyncServices.
+
+    Типы инструментов загружаются при первом обращении или вызовом refresh().
+    Одновременные промахи по одному типу ждут один и тот же запрос.
+    """
+
+    def __init__(
+        self,
+        settings: InstrumentsCacheSettings,
+        instruments_service: InstrumentsService,
+    ):
+        self._settings = settings
+        self._instruments_service = instruments_service
+
+        logger.debug("Initialising async instruments cache")
+        self._cache: TTLCache = TTLCache(
+            maxsize=len(self._get_service_instruments_methods()),
+            ttl=self._settings.ttl.total_seconds(),
+        )
+        self._pending_refreshes: Dict[str, "asyncio.Future[AnyInstrumentStorage]"] = {}
+
+    def _get_service_instruments_methods(
+        self,
+    ) -> List[AsyncInstrumentsResponseCallable]:
+        return [
+            self._instruments_service.shares,
+            self._instruments_service.futures,
+            self._instruments_service.etfs,
+            self._instruments_service.bonds,
+            self._instruments_service.currencies,
+        ]
+
+    async def refresh(self) -> None:
+        logger.debug("Refreshing async instruments cache")
+        await asyncio.gather(
+            *(
+                self._refresh_storage(method)
+                for method in self._get_service_instruments_methods()
+            )
+        )
+
+    async def _get_instrument_storage(
+        self, get_instruments_method: AsyncInstrumentsResponseCallable
+    ) -> AnyInstrumentStorage:
+        storage_key = get_instruments_method.__name__
+        storage = self._cache.get(storage_key)
+        if storage is not None:
+            logger.debug("Got storage for key %s from cache", storage_key)
+            return storage
+        logger.debug(
+            "Storage for key %s not found, creating new storage with ttl=%s",
+            storage_key,
+            self._cache.ttl,
+        )
+        return await self._refresh_storage(get_instruments_method)
+
+    async def _refresh_storage(
+        self, get_instruments_method: AsyncInstrumentsResponseCallable
+    ) -> AnyInstrumentStorage:
+        storage_key = get_instruments_method.__name__
+        pending = self._pending_refreshes.get(storage_key)
+        if pending is None:
+            pending = asyncio.ensure_future(
+                self._create_instrument_storage(get_instruments_method)
+            )
+            self._pending_refreshes[storage_key] = pending
+            pending.add_done_callback(
+                lambda _: self._pending_refreshes.pop(storage_key, None)
+            )
+        else:
+            logger.debug("Waiting for pending refresh of key %s", storage_key)
+        # shield keeps the shared request alive if one of the waiters is cancelled
+        return await asyncio.shield(pending)
+
+    async def _create_instrument_storage(
+        self, get_instruments_method: AsyncInstrumentsResponseCallable
+    ) -> AnyInstrumentStorage:
+        instruments_response = await get_instruments_method(
+            instrument_status=InstrumentStatus.INSTRUMENT_STATUS_ALL
+        )
+        storage = InstrumentStorage(instruments_response=instruments_response)
+        self._cache[get_instruments_method.__name__] = storage
+        return storage
+
+    async def shares(
+        self, *, instrument_status: InstrumentStatus = InstrumentStatus(0)
+    ) -> SharesResponse:
+        storage = cast(
+            InstrumentStorage[ShareResponse, SharesResponse],  # type: ignore
+            await self._get_instrument_storage(self._instruments_service.shares),
+        )
+        return storage.get_instruments_response()
+
+    async def share_by(
+        self,
+        *,
+        id_type: InstrumentIdType = InstrumentIdType(0),
+        class_code: str = "",
+        id: str = "",
+    ) -> ShareResponse:
+        storage = cast(
+            InstrumentStorage[Share, SharesResponse],  # type: ignore
+            await self._get_instrument_storage(self._instruments_service.shares),
+        )
+        share = storage.get(id_type=id_type, class_code=class_code, id=id)
+        return ShareResponse(instrument=share)
+
+    async def futures(
+        self, *, instrument_status: InstrumentStatus = InstrumentStatus(0)
+    ) -> FuturesResponse:
+        storage = cast(
+            InstrumentStorage[FutureResponse, FuturesResponse],  # type: ignore
+            await self._get_instrument_storage(self._instruments_service.futures),
+        )
+        return storage.get_instruments_response()
+
+    async def future_by(
+        self,
+        *,
+        id_type: InstrumentIdType = InstrumentIdType(0),
+        class_code: str = "",
+        id: str = "",
+    ) -> FutureResponse:
+        storage = cast(
+            InstrumentStorage[Future, FuturesResponse],  # type: ignore
+            await self._get_instrument_storage(self._instruments_service.futures),
+        )
+        future = storage.get(id_type=id_type, class_code=class_code, id=id)
+        return FutureResponse(instrument=future)
+
+    async def etfs(
+        self, *, instrument_status: InstrumentStatus = InstrumentStatus(0)
+    ) -> EtfsResponse:
+        storage = cast(
+            InstrumentStorage[EtfResponse, EtfsResponse],  # type: ignore
+            await self._get_instrument_storage(self._instruments_service.etfs),
+        )
+        return storage.get_instruments_response()
+
+    async def etf_by(
+        self,
+        *,
+        id_type: InstrumentIdType = InstrumentIdType(0),
+        class_code: str = "",
+        id: str = "",
+    ) -> EtfResponse:
+        storage = cast(
+            InstrumentStorage[Etf, EtfsResponse],  # type: ignore
+            await self._get_instrument_storage(self._instruments_service.etfs),
+        )
+        etf = storage.get(id_type=id_type, class_code=class_code, id=id)
+        return EtfResponse(instrument=etf)
+
+    async def bonds(
+        self, *, instrument_status: InstrumentStatus = InstrumentStatus(0)
+    ) -> BondsResponse:
+        storage = cast(
+            InstrumentStorage[BondResponse, BondsResponse],  # type: ignore
+            await self._get_instrument_storage(self._instruments_service.bonds),
+        )
+        return storage.get_instruments_response()
+
+    async def bond_by(
+        self,
+        *,
+        id_type: InstrumentIdType = InstrumentIdType(0),
+        class_code: str = "",
+        id: str = "",
+    ) -> BondResponse:
+        storage = cast(
+            InstrumentStorage[Bond, BondsResponse],  # type: ignore
+            await self._get_instrument_storage(self._instruments_service.bonds),
+        )
+        bond = storage.get(id_type=id_type, class_code=class_code, id=id)
+        return BondResponse(instrument=bond)
+
+    async def currencies(
+        self, *, instrument_status: InstrumentStatus = InstrumentStatus(0)
+    ) -> CurrenciesResponse:
+        storage = cast(
+            InstrumentStorage[CurrencyResponse, CurrenciesResponse],  # type: ignore
+            await self._get_instrument_storage(self._instruments_service.currencies),
+        )
+        return storage.get_instruments_response()
+
+    async def currency_by(
+        self,
+        *,
+        id_type: InstrumentIdType = InstrumentIdType(0),
+        class_code: str = "",
+        id: str = "",
+    ) -> CurrencyResponse:
+        storage = cast(
+            InstrumentStorage[Currency, CurrenciesResponse],  # type: ignore
+            await self._get_instrument_storage(self._instruments_service.currencies),
+        )
+        currency = storage.get(id_type=id_type, class_code=class_code, id=id)
+        return CurrencyResponse(instrument=currency)
@@ -0,0 +1,317 @@
+import abc
+import enum
+import logging
+import typing
+from datetime import datetime
+from decimal import Decimal
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+import numpy as np
+
+from tinkoff.invest.caching.instruments_cache.models import (
+    InstrumentResponse,
+    InstrumentsResponse,
+)
+from tinkoff.invest.schemas import MoneyValue, Quotation
+from tinkoff.invest.utils import (
+    datetime_to_microseconds,
+    decimal_to_quotation,
+    microseconds_to_datetime,
+    nano_to_money,
+    nano_to_quotation,
+    quotation_to_nano,
+)
+
+__all__ = ("ColumnarInstrumentStore",)
+
+logger = logging.getLogger(__name__)
+
+TInstrumentResponse = TypeVar("TInstrumentResponse", bound=InstrumentResponse)
+
+
+def _to_nano(value: Union[Quotation, MoneyValue, Decimal, int, float]) -> int:
+    if not isinstance(value, (Quotation, MoneyValue)):
+        value = decimal_to_quotation(Decimal(value))
+    return quotation_to_nano(value)
+
+
+def _is_collection(value: Any) -> bool:
+    return isinstance(value, Collection) and not isinstance(value, (str, bytes))
+
+
+class _Column(abc.ABC):
+    @abc.abstractmethod
+    def get(self, row: int) -> Any:
+        pass
+
+    @abc.abstractmethod
+    def values(self) -> np.ndarray:
+        pass
+
+    @abc.abstractmethod
+    def isin(self, values: Iterable[Any]) -> np.ndarray:
+        pass
+
+    @property
+    @abc.abstractmethod
+    def nbytes(self) -> int:
+        pass
+
+
+class _StringColumn(_Column):
+    """Строки хранятся один раз в словаре, строки таблицы - коды в словаре."""
+
+    def __init__(self, strings: Sequence[str]):
+        self._code_by_string: Dict[str, int] = {}
+        codes = np.empty(len(strings), dtype=np.int32)
+        for row, string in enumerate(strings):
+            codes[row] = self._code_by_string.setdefault(
+                string, len(self._code_by_string)
+            )
+        self._codes = codes
+        self._strings = list(self._code_by_string)
+
+    def get(self, row: int) -> str:
+        return self._strings[self._codes[row]]
+
+    def values(self) -> np.ndarray:
+        return np.asarray(self._strings, dtype=object)[self._codes]
+
+    def isin(self, values: Iterable[Any]) -> np.ndarray:
+        codes = [
+            self._code_by_string[value]
+            for value in values
+            if value in self._code_by_string
+        ]
+        return np.isin(self._codes, codes)
+
+    @property
+    def nbytes(self) -> int:
+        return self._codes.nbytes + sum(
+            len(string.encode("utf-8")) for string in self._strings
+        )
+
+
+class _ArrayColumn(_Column):
+    def __init__(
+        self,
+        values: Sequence[Any],
+        dtype: Any,
+        to_array: Callable[[Any], Any],
+        from_array: Callable[[Any], Any],
+    ):
+        self._values = np.fromiter(
+            (to_array(value) for value in values), dtype=dtype, count=len(values)
+        )
+        self._to_array = to_array
+        self._from_array = from_array
+
+    def get(self, row: int) -> Any:
+        return self._from_array(self._values[row].item())
+
+    def values(self) -> np.ndarray:
+        return self._values
+
+    def isin(self, values: Iterable[Any]) -> np.ndarray:
+        return np.isin(self._values, [self._to_array(value) for value in values])
+
+    @property
+    def nbytes(self) -> int:
+        return self._values.nbytes
+
+
+class _MoneyColumn(_Column):
+    def __init__(self, values: Sequence[MoneyValue]):
+        self._amounts = _ArrayColumn(values, np.int64, _to_nano, int)
+        self._currencies = _StringColumn([value.currency for value in values])
+
+    def get(self, row: int) -> MoneyValue:
+        return nano_to_money(self._amounts.get(row), self._currencies.get(row))
+
+    def values(self) -> np.ndarray:
+        return self._amounts.values()
+
+    def isin(self, values: Iterable[Any]) -> np.ndarray:
+        mask = np.zeros(len(self._amounts.values()), dtype=bool)
+        for value in values:
+            value_mask = self._amounts.isin([value])
+            if isinstance(value, MoneyValue):
+                value_mask &= self._currencies.isin([value.currency])
+            mask |= value_mask
+        return mask
+
+    @property
+    def nbytes(self) -> int:
+        return self._amounts.nbytes + self._currencies.nbytes
+
+
+class _ObjectColumn(_Column):
+    def __init__(self, values: Sequence[Any]):
+        self._values = list(values)
+
+    def get(self, row: int) -> Any:
+        return self._values[row]
+
+    def values(self) -> np.ndarray:
+        array = np.empty(len(self._values), dtype=object)
+        array[:] = self._values
+        return array
+
+    def isin(self, values: Iterable[Any]) -> np.ndarray:
+        values = list(values)
+        return np.fromiter(
+            (value in values for value in self._values),
+            dtype=bool,
+            count=len(self._values),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return 0
+
+
+def _create_column(field_type: Any, values: Sequence[Any]) -> _Column:
+    # значения неожиданного типа (например, незаполненные поля) храним как есть
+    if isinstance(field_type, type) and not all(
+        isinstance(value, field_type) for value in values
+    ):
+        return _ObjectColumn(values)
+    if field_type is str:
+        return _StringColumn(values)
+    if field_type is bool:
+        return _ArrayColumn(values, np.bool_, bool, bool)
+    if isinstance(field_type, type) and issubclass(field_type, enum.IntEnum):
+        return _ArrayColumn(values, np.int32, int, field_type)
+    if field_type is int:
+        return _ArrayColumn(values, np.int64, int, int)
+    if field_type is float:
+        return _ArrayColumn(values, np.float64, float, float)
+    if field_type is Quotation:
+        return _ArrayColumn(values, np.int64, _to_nano, nano_to_quotation)
+    if field_type is MoneyValue:
+        return _MoneyColumn(values)
+    if field_type is datetime and all(value.tzinfo is not None for value in values):
+        return _ArrayColumn(
+            values,
+            np.int64,
+            datetime_to_microseconds,
+            microseconds_to_datetime,
+        )
+    return _ObjectColumn(values)
+
+
+class ColumnarInstrumentStore(Generic[TInstrumentResponse]):
+    """Компактное поколоночное хранилище инструментов одного типа.
+
+    Строки хранятся в словарях, числа, Quotation, MoneyValue и даты - в массивах
+    numpy. Инструменты собираются только при обращении к ним, а фильтрация
+    выполняется векторно:
+
+        store.filter(currency="rub", exchange=["MOEX", "SPB"])
+        store.filter(store.column("lot") > 10)
+
+    Значения Quotation и MoneyValue в column() - целые числа в нано-единицах.
+
+    Хранилище не подключено к InstrumentsCache: методы кэша возвращают ответы
+    целиком, и собирать их из колонок при каждом вызове дороже, чем держать
+    готовые ответы. Хранилище строится отдельно из ответа кэша для выборок
+    по большому числу инструментов:
+
+        store = ColumnarInstrumentStore.from_instruments_response(cache.shares())
+    """
+
+    def __init__(
+        self,
+        instrument_type: Type[TInstrumentResponse],
+        instruments: Sequence[TInstrumentResponse],
+    ):
+        self._instrument_type = instrument_type
+        self._length = len(instruments)
+        self._columns: Dict[str, _Column] = {
+            field_name: _create_column(
+                field_type,
+                [getattr(instrument, field_name) for instrument in instruments],
+            )
+            for field_name, field_type in typing.get_type_hints(instrument_type).items()
+        }
+        logger.debug(
+            "Columnar store for %s %s built, %s bytes in arrays",
+            self._length,
+            instrument_type.__name__,
+            self.nbytes,
+        )
+
+    @classmethod
+    def from_instruments_response(
+        cls, instruments_response: InstrumentsResponse
+    ) -> "ColumnarInstrumentStore":
+        (instrument_type,) = typing.get_args(
+            typing.get_type_hints(type(instruments_response))["instruments"]
+        )
+        return cls(instrument_type, instruments_response.instruments)
+
+    @property
+    def instrument_type(self) -> Type[TInstrumentResponse]:
+        return self._instrument_type
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return tuple(self._columns)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self._columns.values())
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, row: int) -> TInstrumentResponse:
+        if not -self._length <= row < self._length:
+            raise IndexError(row)
+        row %= self._length
+        return self._instrument_type(
+            **{
+                field_name: column.get(row)
+                for field_name, column in self._columns.items()
+            }
+        )
+
+    def __iter__(self) -> Iterator[TInstrumentResponse]:
+        return (self[row] for row in range(self._length))
+
+    def column(self, field_name: str) -> np.ndarray:
+        return self._columns[field_name].values()
+
+    def mask(self, **conditions: Any) -> np.ndarray:
+        """Маска строк, где каждое поле равно значению или входит в коллекцию."""
+        mask = np.ones(self._length, dtype=bool)
+        for field_name, value in conditions.items():
+            values = value if _is_collection(value) else (value,)
+            mask &= self._columns[field_name].isin(values)
+        return mask
+
+    def rows(self, indices: Iterable[int]) -> List[TInstrumentResponse]:
+        return [self[row] for row in indices]
+
+    def filter(
+        self, mask: Optional[np.ndarray] = None, **conditions: Any
+    ) -> List[TInstrumentResponse]:
+        combined_mask = self.mask(**conditions)
+        if mask is not None:
+            combined_mask &= mask
+        return self.rows(np.flatnonzero(combined_mask).tolist())
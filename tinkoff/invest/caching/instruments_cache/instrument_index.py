@@ -0,0 +1,129 @@
+import dataclasses
+import logging
+from typing import Dict, Hashable, Iterable, Mapping, Optional, Tuple
+
+from tinkoff.invest.caching.instruments_cache.models import InstrumentResponse
+from tinkoff.invest.schemas import InstrumentIdType, InstrumentType
+
+logger = logging.getLogger(__name__)
+
+INSTRUMENT_TYPE_BY_STORAGE_KEY: Mapping[str, InstrumentType] = {
+    "shares": InstrumentType.INSTRUMENT_TYPE_SHARE,
+    "futures": InstrumentType.INSTRUMENT_TYPE_FUTURES,
+    "etfs": InstrumentType.INSTRUMENT_TYPE_ETF,
+    "bonds": InstrumentType.INSTRUMENT_TYPE_BOND,
+    "currencies": InstrumentType.INSTRUMENT_TYPE_CURRENCY,
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class IndexedInstrument:
+    instrument: InstrumentResponse
+    instrument_type: InstrumentType
+
+
+def get_instrument_field(instrument: InstrumentResponse, field_name: str) -> str:
+    value = getattr(instrument, field_name, "")
+    return value if isinstance(value, str) else ""
+
+
+class _TypeIndex:
+    def __init__(
+        self, instrument_type: InstrumentType, instruments: Iterable[InstrumentResponse]
+    ):
+        self.by_figi: Dict[str, IndexedInstrument] = {}
+        self.by_uid: Dict[str, IndexedInstrument] = {}
+        self.by_position_uid: Dict[str, IndexedInstrument] = {}
+        self.by_isin: Dict[str, IndexedInstrument] = {}
+        self.by_class_code_ticker: Dict[Tuple[str, str], IndexedInstrument] = {}
+
+        for instrument in instruments:
+            self._add(IndexedInstrument(instrument, instrument_type))
+
+    def _add(self, indexed: IndexedInstrument) -> None:
+        instrument = indexed.instrument
+        for index, field_name in (
+            (self.by_figi, "figi"),
+            (self.by_uid, "uid"),
+            (self.by_position_uid, "position_uid"),
+            (self.by_isin, "isin"),
+        ):
+            key = get_instrument_field(instrument, field_name)
+            if key:
+                index.setdefault(key, indexed)
+        ticker = get_instrument_field(instrument, "ticker")
+        if ticker:
+            self.by_class_code_ticker.setdefault(
+                (get_instrument_field(instrument, "class_code"), ticker), indexed
+            )
+
+
+class InstrumentIndex:
+    """Общий индекс инструментов всех типов из кэша.
+
+    Индекс неизменяем: replace() возвращает новый индекс, в котором перестроены
+    только инструменты одного типа, а индексы остальных типов общие.
+    """
+
+    def __init__(
+        self,
+        instruments_by_type: Mapping[InstrumentType, Iterable[InstrumentResponse]],
+    ):
+        self._type_indexes: Dict[InstrumentType, _TypeIndex] = {
+            instrument_type: _TypeIndex(instrument_type, instruments)
+            for instrument_type, instruments in instruments_by_type.items()
+        }
+
+    def replace(
+        self,
+        instrument_type: InstrumentType,
+        instruments: Iterable[InstrumentResponse],
+    ) -> "InstrumentIndex":
+        index = InstrumentIndex({})
+        index._type_indexes = {  # pylint:disable=protected-access
+            **self._type_indexes,
+            instrument_type: _TypeIndex(instrument_type, instruments),
+        }
+        return index
+
+    def _lookup(self, index_name: str, key: Hashable) -> Optional[IndexedInstrument]:
+        for type_index in self._type_indexes.values():
+            indexed = getattr(type_index, index_name).get(key)
+            if indexed is not None:
+                return indexed
+        return None
+
+    def _get(self, index_name: str, key: Hashable) -> IndexedInstrument:
+        indexed = self._lookup(index_name, key)
+        if indexed is None:
+            raise KeyError(key)
+        return indexed
+
+    def __len__(self) -> int:
+        return sum(len(type_index.by_uid) for type_index in self._type_indexes.values())
+
+    def get(
+        self,
+        *,
+        id_type: InstrumentIdType = InstrumentIdType(0),
+        class_code: str = "",
+        id: str = "",
+    ) -> IndexedInstrument:
+        if id_type == InstrumentIdType.INSTRUMENT_ID_TYPE_TICKER:
+            return self._get("by_class_code_ticker", (class_code, id))
+        if id_type == InstrumentIdType.INSTRUMENT_ID_TYPE_UID:
+            return self._get("by_uid", id)
+        if id_type == InstrumentIdType.INSTRUMENT_ID_TYPE_POSITION_UID:
+            return self._get("by_position_uid", id)
+        return self._get("by_figi", id)
+
+    def get_by_isin(self, isin: str) -> IndexedInstrument:
+        return self._get("by_isin", isin)
+
+    def find(self, id: str) -> Optional[IndexedInstrument]:
+        """Найти инструмент по figi, uid, position_uid или isin."""
+        for index_name in ("by_figi", "by_uid", "by_position_uid", "by_isin"):
+            indexed = self._lookup(index_name, id)
+            if indexed is not None:
+                return indexed
+        return None
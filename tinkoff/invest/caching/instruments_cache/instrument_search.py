@@ -0,0 +1,201 @@
+import bisect
+import dataclasses
+import logging
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+from tinkoff.invest.caching.instruments_cache.instrument_index import (
+    get_instrument_field,
+)
+from tinkoff.invest.caching.instruments_cache.models import InstrumentResponse
+from tinkoff.invest.schemas import InstrumentShort, InstrumentType
+
+logger = logging.getLogger(__name__)
+
+NGRAM_SIZE = 3
+
+_INSTRUMENT_TYPE_NAMES = {
+    InstrumentType.INSTRUMENT_TYPE_SHARE: "share",
+    InstrumentType.INSTRUMENT_TYPE_FUTURES: "futures",
+    InstrumentType.INSTRUMENT_TYPE_ETF: "etf",
+    InstrumentType.INSTRUMENT_TYPE_BOND: "bond",
+    InstrumentType.INSTRUMENT_TYPE_CURRENCY: "currency",
+}
+_INSTRUMENT_SHORT_FIELDS = tuple(
+    field.name
+    for field in dataclasses.fields(InstrumentShort)
+    if field.name not in ("instrument_type", "instrument_kind")
+)
+_EXACT_ID_FIELDS = ("ticker", "isin", "figi", "uid", "position_uid")
+
+# чем меньше ранг, тем выше инструмент в выдаче
+_RANK_EXACT_TICKER = 0
+_RANK_EXACT_ID = 1
+_RANK_TICKER_PREFIX = 2
+_RANK_NAME_PREFIX = 3
+_RANK_TICKER_SUBSTRING = 4
+_RANK_ISIN_SUBSTRING = 5
+_RANK_NAME_SUBSTRING = 6
+
+
+class _Document(NamedTuple):
+    instrument: InstrumentResponse
+    instrument_type: InstrumentType
+    ticker: str
+    name: str
+    isin: str
+    exact_ids: Tuple[str, ...]
+    api_trade_available: bool
+
+
+def _normalize(text: str) -> str:
+    return text.strip().casefold()
+
+
+def _ngrams(text: str) -> Set[str]:
+    return {text[i : i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class InstrumentSearchIndex:
+    """Локальный поиск инструментов по тикеру, названию и ISIN.
+
+    Подстроки ищутся по индексу триграмм, короткие запросы - по префиксам.
+    """
+
+    def __init__(
+        self,
+        instruments_by_type: Mapping[InstrumentType, Iterable[InstrumentResponse]],
+    ):
+        self._documents: List[_Document] = []
+        self._by_exact_id: Dict[str, List[int]] = {}
+        self._by_ngram: Dict[str, Set[int]] = {}
+        prefix_keys: List[Tuple[str, int]] = []
+
+        for instrument_type, instruments in instruments_by_type.items():
+            for instrument in instruments:
+                document = self._create_document(instrument, instrument_type)
+                doc_id = len(self._documents)
+                self._documents.append(document)
+                for exact_id in set(document.exact_ids):
+                    self._by_exact_id.setdefault(exact_id, []).append(doc_id)
+                for text in (document.ticker, document.name, document.isin):
+                    for ngram in _ngrams(text):
+                        self._by_ngram.setdefault(ngram, set()).add(doc_id)
+                for key in {document.ticker, document.isin, *document.name.split()}:
+                    if key:
+                        prefix_keys.append((key, doc_id))
+
+        prefix_keys.sort()
+        self._prefix_keys = [key for key, _ in prefix_keys]
+        self._prefix_doc_ids = [doc_id for _, doc_id in prefix_keys]
+        logger.debug("Instrument search index built for %s", len(self._documents))
+
+    @staticmethod
+    def _create_document(
+        instrument: InstrumentResponse, instrument_type: InstrumentType
+    ) -> _Document:
+        return _Document(
+            instrument=instrument,
+            instrument_type=instrument_type,
+            ticker=_normalize(get_instrument_field(instrument, "ticker")),
+            name=_normalize(get_instrument_field(instrument, "name")),
+            isin=_normalize(get_instrument_field(instrument, "isin")),
+            exact_ids=tuple(
+                _normalize(get_instrument_field(instrument, field_name))
+                for field_name in _EXACT_ID_FIELDS
+                if get_instrument_field(instrument, field_name)
+            ),
+            api_trade_available=(
+                getattr(instrument, "api_trade_available_flag", False) is True
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _get_candidates(self, query: str) -> Set[int]:
+        candidates = set(self._by_exact_id.get(query, ()))
+        if len(query) >= NGRAM_SIZE:
+            postings = sorted(
+                (self._by_ngram.get(ngram, set()) for ngram in _ngrams(query)),
+                key=len,
+            )
+            candidates.update(set.intersection(*postings))
+        else:
+            start = bisect.bisect_left(self._prefix_keys, query)
+            end = bisect.bisect_left(self._prefix_keys, query + "\uffff")
+            candidates.update(self._prefix_doc_ids[start:end])
+        return candidates
+
+    @staticmethod
+    def _rank(document: _Document, query: str) -> Optional[int]:
+        if document.ticker == query:
+            return _RANK_EXACT_TICKER
+        if query in document.exact_ids:
+            return _RANK_EXACT_ID
+        if document.ticker.startswith(query):
+            return _RANK_TICKER_PREFIX
+        if document.name.startswith(query) or any(
+            word.startswith(query) for word in document.name.split()
+        ):
+            return _RANK_NAME_PREFIX
+        if query in document.ticker:
+            return _RANK_TICKER_SUBSTRING
+        if query in document.isin:
+            return _RANK_ISIN_SUBSTRING
+        if query in document.name:
+            return _RANK_NAME_SUBSTRING
+        return None
+
+    def search(
+        self,
+        query: str,
+        *,
+        instrument_kind: Optional[InstrumentType] = None,
+        api_trade_available_flag: Optional[bool] = None,
+        limit: Optional[int] = None,
+    ) -> List[InstrumentShort]:
+        query = _normalize(query)
+        if not query:
+            return []
+
+        ranked = []
+        for doc_id in self._get_candidates(query):
+            document = self._documents[doc_id]
+            if (
+                instrument_kind is not None
+                and document.instrument_type != instrument_kind
+            ):
+                continue
+            if (
+                api_trade_available_flag is not None
+                and document.api_trade_available != api_trade_available_flag
+            ):
+                continue
+            rank = self._rank(document, query)
+            if rank is not None:
+                ranked.append(
+                    (
+                        rank,
+                        not document.api_trade_available,
+                        len(document.ticker),
+                        document.ticker,
+                        doc_id,
+                    )
+                )
+        ranked.sort()
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self._to_instrument_short(self._documents[r[-1]]) for r in ranked]
+
+    @staticmethod
+    def _to_instrument_short(document: _Document) -> InstrumentShort:
+        instrument = document.instrument
+        return InstrumentShort(
+            instrument_type=_INSTRUMENT_TYPE_NAMES.get(document.instrument_type, ""),
+            instrument_kind=document.instrument_type,
+            **{
+                field_name: getattr(instrument, field_name)
+                for field_name in _INSTRUMENT_SHORT_FIELDS
+                if hasattr(instrument, field_name)
+            },
+        )
@@ -1,5 +1,4 @@
 import logging
-from dataclasses import replace
 from typing import Dict, Generic, Tuple, TypeVar, cast
 
 from tinkoff.invest import InstrumentIdType
@@ -7,6 +6,7 @@ from tinkoff.invest.caching.instruments_cache.models import (
     InstrumentResponse,
     InstrumentsResponse,
 )
+from tinkoff.invest.caching.read_only import make_read_only
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +17,7 @@ TInstrumentsResponse = TypeVar("TInstrumentsResponse", bound=InstrumentsResponse
 
 class InstrumentStorage(Generic[TInstrumentResponse, TInstrumentsResponse]):
     def __init__(self, instruments_response: TInstrumentsResponse):
-        self._instruments_response = instruments_response
+        self._instruments_response = make_read_only(instruments_response)
 
         self._instrument_by_class_code_figi: Dict[
             Tuple[str, str], InstrumentResponse
@@ -67,4 +67,4 @@ class InstrumentStorage(Generic[TInstrumentResponse, TInstrumentsResponse]):
         return cast(TInstrumentResponse, instrument_by_class_code_id[key])
 
     def get_instruments_response(self) -> TInstrumentsResponse:
-        return replace(self._instruments_response, **{})
+        return self._instruments_response
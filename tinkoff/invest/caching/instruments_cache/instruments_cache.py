@@ -1,5 +1,9 @@
+import dataclasses
 import logging
-from typing import cast
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from typing import Dict, List, Optional, Set, cast
 
 from tinkoff.invest import (
     Bond,
@@ -11,15 +15,24 @@ from tinkoff.invest import (
     Etf,
     EtfResponse,
     EtfsResponse,
+    FindInstrumentResponse,
     Future,
     FutureResponse,
     FuturesResponse,
     InstrumentIdType,
     InstrumentStatus,
+    InstrumentType,
     Share,
     ShareResponse,
     SharesResponse,
 )
+from tinkoff.invest.caching.instruments_cache.instrument_index import (
+    INSTRUMENT_TYPE_BY_STORAGE_KEY,
+    InstrumentIndex,
+)
+from tinkoff.invest.caching.instruments_cache.instrument_search import (
+    InstrumentSearchIndex,
+)
 from tinkoff.invest.caching.instruments_cache.instrument_storage import (
     InstrumentStorage,
 )
@@ -27,13 +40,20 @@ from tinkoff.invest.caching.instruments_cache.interface import IInstrumentsGette
 from tinkoff.invest.caching.instruments_cache.models import (
     InstrumentResponse,
     InstrumentsResponse,
+    InstrumentStorageRefreshStats,
 )
 from tinkoff.invest.caching.instruments_cache.protocol import (
     InstrumentsResponseCallable,
 )
 from tinkoff.invest.caching.instruments_cache.settings import InstrumentsCacheSettings
+from tinkoff.invest.caching.instruments_cache.snapshot import (
+    InstrumentsCacheSnapshot,
+    load_snapshot,
+    save_snapshot,
+)
 from tinkoff.invest.caching.overrides import TTLCache
 from tinkoff.invest.services import InstrumentsService
+from tinkoff.invest.utils import now
 
 logger = logging.getLogger(__name__)
 
@@ -59,14 +79,221 @@ class InstrumentsCache(IInstrumentsGetter):
             maxsize=len(self._instruments_methods),
             ttl=self._settings.ttl.total_seconds(),
         )
-        self._refresh_cache()
+        self._cache_lock = threading.RLock()
+        self._latest_storages: Dict[
+            str, InstrumentStorage[InstrumentResponse, InstrumentsResponse]
+        ] = {}
+        self._refresh_stats: Dict[str, InstrumentStorageRefreshStats] = {
+            f.__name__: InstrumentStorageRefreshStats()
+            for f in self._instruments_methods
+        }
+        self._instrument_index = InstrumentIndex({})
+        self._search_index: Optional[InstrumentSearchIndex] = None
+        self._revalidating: Set[str] = set()
+        self._revalidate_executor: Optional[ThreadPoolExecutor] = None
+        self._refresh_timer: Optional[threading.Timer] = None
+        self._closed = False
+        if not self._load_snapshot():
+            self._refresh_cache()
+            self._save_snapshot()
+
+    def _get_service_instruments_methods(self) -> List[InstrumentsResponseCallable]:
+        return [
+            self._instruments_service.shares,
+            self._instruments_service.futures,
+            self._instruments_service.etfs,
+            self._instruments_service.bonds,
+            self._instruments_service.currencies,
+        ]
+
+    def _load_snapshot(self) -> bool:
+        snapshot_path = self._settings.snapshot_path
+        if snapshot_path is None:
+            return False
+        snapshot = load_snapshot(snapshot_path)
+        if snapshot is None:
+            return False
+        expected_keys = {f.__name__ for f in self._instruments_methods}
+        if snapshot.instruments_responses.keys() != expected_keys:
+            logger.warning("Snapshot %s misses instrument types", snapshot_path)
+            return False
+
+        logger.debug("Loading instruments cache from snapshot %s", snapshot_path)
+        self._store_storages(
+            {
+                storage_key: InstrumentStorage(instruments_response=response)
+                for storage_key, response in snapshot.instruments_responses.items()
+            }
+        )
+        self._schedule_snapshot_refresh(delay=snapshot.time_to_live())
+        return True
+
+    def _save_snapshot(self) -> None:
+        snapshot_path = self._settings.snapshot_path
+        if snapshot_path is None:
+            return
+        with self._cache_lock:
+            instruments_responses: Dict[str, InstrumentsResponse] = {
+                storage_key: storage.get_instruments_response()
+                for storage_key, storage in self._cache.items()
+            }
+        save_snapshot(
+            snapshot_path,
+            InstrumentsCacheSnapshot(
+                created_at=now(),
+                ttl=self._settings.ttl,
+                instruments_responses=instruments_responses,
+            ),
+        )
+        self._schedule_snapshot_refresh(delay=self._settings.ttl)
+
+    def _schedule_snapshot_refresh(self, delay: timedelta) -> None:
+        with self._cache_lock:
+            # фоновое обновление могло закончиться уже после close()
+            if self._closed:
+                return
+            if self._refresh_timer is not None:
+                self._refresh_timer.cancel()
+            logger.debug("Instruments cache snapshot refresh scheduled in %s", delay)
+            self._refresh_timer = threading.Timer(
+                delay.total_seconds(), self._refresh_snapshot
+            )
+            self._refresh_timer.daemon = True
+            self._refresh_timer.start()
+
+    def _refresh_snapshot(self) -> None:
+        with self._cache_lock:
+            if self._closed:
+                return
+        logger.debug("Refreshing instruments cache snapshot in background")
+        try:
+            storages = self._create_instrument_storages(
+                self._get_service_instruments_methods()
+            )
+        except Exception:  # pylint:disable=broad-except
+            logger.exception("Background instruments cache refresh failed")
+            return
+        self._store_storages(storages)
+        self._save_snapshot()
+
+    def close(self) -> None:
+        with self._cache_lock:
+            self._closed = True
+            if self._refresh_timer is not None:
+                self._refresh_timer.cancel()
+                self._refresh_timer = None
+            if self._revalidate_executor is not None:
+                self._revalidate_executor.shutdown(wait=False)
+                self._revalidate_executor = None
+
+    def get_refresh_stats(self) -> Dict[str, InstrumentStorageRefreshStats]:
+        with self._cache_lock:
+            return {
+                storage_key: dataclasses.replace(stats)
+                for storage_key, stats in self._refresh_stats.items()
+            }
+
+    def _store_storages(
+        self,
+        storages: Dict[str, InstrumentStorage[InstrumentResponse, InstrumentsResponse]],
+    ) -> None:
+        refreshed_at = now()
+        with self._cache_lock:
+            self._cache.update(storages)
+            self._latest_storages.update(storages)
+            for storage_key in storages:
+                stats = self._refresh_stats[storage_key]
+                stats.refreshed_at = refreshed_at
+                stats.refresh_count += 1
+            instrument_index = self._instrument_index
+            for storage_key, storage in storages.items():
+                instrument_index = instrument_index.replace(
+                    INSTRUMENT_TYPE_BY_STORAGE_KEY[storage_key],
+                    storage.get_instruments_response().instruments,
+                )
+            self._instrument_index = instrument_index
+            self._search_index = None
+
+    def _get_instruments_by_type(
+        self,
+    ) -> Dict[InstrumentType, List[InstrumentResponse]]:
+        return {
+            INSTRUMENT_TYPE_BY_STORAGE_KEY[storage_key]: (
+                storage.get_instruments_response().instruments
+            )
+            for storage_key, storage in self._latest_storages.items()
+        }
+
+    def get_instrument_index(self) -> InstrumentIndex:
+        for instruments_method in self._get_service_instruments_methods():
+            self._get_instrument_storage(instruments_method)
+        return self._instrument_index
+
+    def get_search_index(self) -> InstrumentSearchIndex:
+        for instruments_method in self._get_service_instruments_methods():
+            self._get_instrument_storage(instruments_method)
+        with self._cache_lock:
+            if self._search_index is None:
+                self._search_index = InstrumentSearchIndex(
+                    self._get_instruments_by_type()
+                )
+            return self._search_index
+
+    def find_instrument(
+        self,
+        *,
+        query: str = "",
+        instrument_kind: Optional[InstrumentType] = None,
+        api_trade_available_flag: Optional[bool] = None,
+    ) -> FindInstrumentResponse:
+        instruments = self.get_search_index().search(
+            query,
+            instrument_kind=instrument_kind,
+            api_trade_available_flag=api_trade_available_flag,
+        )
+        if instruments:
+            return FindInstrumentResponse(instruments=instruments)
+        logger.debug("Instrument %s not found in cache, requesting server", query)
+        return self._instruments_service.find_instrument(
+            query=query,
+            instrument_kind=instrument_kind,
+            api_trade_available_flag=api_trade_available_flag,
+        )
+
+    def _record_refresh_failure(self, storage_key: str, error: Exception) -> None:
+        with self._cache_lock:
+            stats = self._refresh_stats[storage_key]
+            stats.failed_at = now()
+            stats.failure_count += 1
+            stats.last_error = repr(error)
 
     def _refresh_cache(self):
         logger.debug("Refreshing instruments cache")
-        for instruments_method in self._instruments_methods:
-            instruments_method()
+        self._store_storages(
+            self._create_instrument_storages(self._get_service_instruments_methods())
+        )
         self._assert_cache()
 
+    def _create_instrument_storages(
+        self, get_instruments_methods: List[InstrumentsResponseCallable]
+    ) -> Dict[str, InstrumentStorage[InstrumentResponse, InstrumentsResponse]]:
+        with ThreadPoolExecutor(
+            max_workers=self._settings.max_refresh_workers,
+            thread_name_prefix="InstrumentsCache",
+        ) as executor:
+            storage_key_by_future = {
+                executor.submit(self._create_instrument_storage, method): (
+                    method.__name__
+                )
+                for method in get_instruments_methods
+            }
+            storages = {}
+            for future in as_completed(storage_key_by_future):
+                storage_key = storage_key_by_future[future]
+                storages[storage_key] = future.result()
+                logger.debug("Storage for key %s loaded", storage_key)
+        return storages
+
     def _assert_cache(self):
         if self._cache.keys() != {f.__name__ for f in self._instruments_methods}:
             raise KeyError(f"Cache does not have all instrument types {self._cache}")
@@ -75,21 +302,70 @@ class InstrumentsCache(IInstrumentsGetter):
         self, get_instruments_method: InstrumentsResponseCallable
     ) -> InstrumentStorage[InstrumentResponse, InstrumentsResponse]:
         storage_key = get_instruments_method.__name__
-        storage = self._cache.get(storage_key)
+        with self._cache_lock:
+            storage = self._cache.get(storage_key)
+            stale_storage = self._latest_storages.get(storage_key)
         if storage is not None:
             logger.debug("Got storage for key %s from cache", storage_key)
             return storage
+        if self._settings.stale_while_revalidate and stale_storage is not None:
+            logger.debug("Serving stale storage for key %s", storage_key)
+            self._revalidate_in_background(get_instruments_method)
+            return stale_storage
         logger.debug(
             "Storage for key %s not found, creating new storage with ttl=%s",
             storage_key,
             self._cache.ttl,
         )
-        instruments_response = get_instruments_method(
-            instrument_status=InstrumentStatus.INSTRUMENT_STATUS_ALL
-        )
-        storage = InstrumentStorage(instruments_response=instruments_response)
-        self._cache[storage_key] = storage
-        return storage  # noqa:R504
+        storage = self._create_instrument_storage(get_instruments_method)
+        self._store_storages({storage_key: storage})
+        return storage
+
+    def _revalidate_in_background(
+        self, get_instruments_method: InstrumentsResponseCallable
+    ) -> None:
+        storage_key = get_instruments_method.__name__
+        with self._cache_lock:
+            if self._closed or storage_key in self._revalidating:
+                return
+            failed_at = self._refresh_stats[storage_key].failed_at
+            if (
+                failed_at is not None
+                and now() - failed_at < self._settings.revalidate_retry_delay
+            ):
+                return
+            self._revalidating.add(storage_key)
+            if self._revalidate_executor is None:
+                self._revalidate_executor = ThreadPoolExecutor(
+                    max_workers=self._settings.max_refresh_workers,
+                    thread_name_prefix="InstrumentsCacheRevalidate",
+                )
+            self._revalidate_executor.submit(self._revalidate, get_instruments_method)
+
+    def _revalidate(self, get_instruments_method: InstrumentsResponseCallable) -> None:
+        storage_key = get_instruments_method.__name__
+        logger.debug("Revalidating storage for key %s", storage_key)
+        try:
+            storage = self._create_instrument_storage(get_instruments_method)
+        except Exception:  # pylint:disable=broad-except
+            logger.exception("Background refresh of %s failed", storage_key)
+        else:
+            self._store_storages({storage_key: storage})
+        finally:
+            with self._cache_lock:
+                self._revalidating.discard(storage_key)
+
+    def _create_instrument_storage(
+        self, get_instruments_method: InstrumentsResponseCallable
+    ) -> InstrumentStorage[InstrumentResponse, InstrumentsResponse]:
+        try:
+            instruments_response = get_instruments_method(
+                instrument_status=InstrumentStatus.INSTRUMENT_STATUS_ALL
+            )
+        except Exception as e:
+            self._record_refresh_failure(get_instruments_method.__name__, e)
+            raise
+        return InstrumentStorage(instruments_response=instruments_response)
 
     def shares(
         self, *, instrument_status: InstrumentStatus = InstrumentStatus(0)
@@ -96,3 +96,85 @@ class IInstrumentsGetter(abc.ABC):
         id: str = "",
     ) -> CurrencyResponse:
         pass
+
+
+class IAsyncInstrumentsGetter(abc.ABC):
+    @abc.abstractmethod
+    async def shares(
+        self, *, instrument_status: InstrumentStatus = InstrumentStatus(0)
+    ) -> SharesResponse:
+        pass
+
+    @abc.abstractmethod
+    async def share_by(
+        self,
+        *,
+        id_type: InstrumentIdType = InstrumentIdType(0),
+        class_code: str = "",
+        id: str = "",
+    ) -> ShareResponse:
+        pass
+
+    @abc.abstractmethod
+    async def futures(
+        self, *, instrument_status: InstrumentStatus = InstrumentStatus(0)
+    ) -> FuturesResponse:
+        pass
+
+    @abc.abstractmethod
+    async def future_by(
+        self,
+        *,
+        id_type: InstrumentIdType = InstrumentIdType(0),
+        class_code: str = "",
+        id: str = "",
+    ) -> FutureResponse:
+        pass
+
+    @abc.abstractmethod
+    async def etfs(
+        self, *, instrument_status: InstrumentStatus = InstrumentStatus(0)
+    ) -> EtfsResponse:
+        pass
+
+    @abc.abstractmethod
+    async def etf_by(
+        self,
+        *,
+        id_type: InstrumentIdType = InstrumentIdType(0),
+        class_code: str = "",
+        id: str = "",
+    ) -> EtfResponse:
+        pass
+
+    @abc.abstractmethod
+    async def bonds(
+        self, *, instrument_status: InstrumentStatus = InstrumentStatus(0)
+    ) -> BondsResponse:
+        pass
+
+    @abc.abstractmethod
+    async def bond_by(
+        self,
+        *,
+        id_type: InstrumentIdType = InstrumentIdType(0),
+        class_code: str = "",
+        id: str = "",
+    ) -> BondResponse:
+        pass
+
+    @abc.abstractmethod
+    async def currencies(
+        self, *, instrument_status: InstrumentStatus = InstrumentStatus(0)
+    ) -> CurrenciesResponse:
+        pass
+
+    @abc.abstractmethod
+    async def currency_by(
+        self,
+        *,
+        id_type: InstrumentIdType = InstrumentIdType(0),
+        class_code: str = "",
+        id: str = "",
+    ) -> CurrencyResponse:
+        pass
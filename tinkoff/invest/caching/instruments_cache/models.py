@@ -1,4 +1,6 @@
-from typing import List
+import dataclasses
+from datetime import datetime
+from typing import List, Optional
 
 
 class InstrumentResponse:
@@ -11,3 +13,12 @@ class InstrumentResponse:
 
 class InstrumentsResponse:
     instruments: List[InstrumentResponse]
+
+
+@dataclasses.dataclass()
+class InstrumentStorageRefreshStats:
+    refreshed_at: Optional[datetime] = None
+    refresh_count: int = 0
+    failed_at: Optional[datetime] = None
+    failure_count: int = 0
+    last_error: Optional[str] = None
@@ -12,3 +12,13 @@ class InstrumentsResponseCallable(Protocol):
 
     def __name__(self) -> str:
         ...
+
+
+class AsyncInstrumentsResponseCallable(Protocol):
+    async def __call__(
+        self, *, instrument_status: InstrumentStatus = InstrumentStatus(0)
+    ) -> InstrumentsResponse:
+        ...
+
+    def __name__(self) -> str:
+        ...
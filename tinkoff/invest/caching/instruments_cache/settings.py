@@ -1,7 +1,13 @@
 import dataclasses
 from datetime import timedelta
+from pathlib import Path
+from typing import Optional
 
 
 @dataclasses.dataclass()
 class InstrumentsCacheSettings:
     ttl: timedelta = timedelta(days=1)
+    snapshot_path: Optional[Path] = None
+    max_refresh_workers: int = 5
+    stale_while_revalidate: bool = False
+    revalidate_retry_delay: timedelta = timedelta(seconds=10)
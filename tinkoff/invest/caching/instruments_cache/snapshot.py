@@ -0,0 +1,61 @@
+import dataclasses
+import logging
+import os
+import pickle  # noqa:S403 # nosec
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+from tinkoff.invest.caching.instruments_cache.models import InstrumentsResponse
+from tinkoff.invest.utils import now
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+@dataclasses.dataclass()
+class InstrumentsCacheSnapshot:
+    created_at: datetime
+    ttl: timedelta
+    instruments_responses: Dict[str, InstrumentsResponse]
+    version: int = SNAPSHOT_VERSION
+
+    @property
+    def expires_at(self) -> datetime:
+        return self.created_at + self.ttl
+
+    def time_to_live(self) -> timedelta:
+        return max(self.expires_at - now(), timedelta())
+
+    def is_expired(self) -> bool:
+        return self.time_to_live() == timedelta()
+
+
+def load_snapshot(path: Path) -> Optional[InstrumentsCacheSnapshot]:
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)  # noqa:S301 # nosec
+    except FileNotFoundError:
+        logger.debug("Instruments cache snapshot %s was not found", path)
+        return None
+    except Exception:  # pylint:disable=broad-except
+        logger.warning("Cannot read instruments cache snapshot %s", path, exc_info=True)
+        return None
+
+    if (
+        not isinstance(snapshot, InstrumentsCacheSnapshot)
+        or snapshot.version != SNAPSHOT_VERSION
+    ):
+        logger.warning("Ignoring incompatible instruments cache snapshot %s", path)
+        return None
+    return snapshot
+
+
+def save_snapshot(path: Path, snapshot: InstrumentsCacheSnapshot) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    logger.debug("Instruments cache snapshot saved to %s", path)
@@ -1,6 +1,7 @@
+import dataclasses
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Generator, Iterable, Optional, Tuple
+from typing import Dict, Generator, Iterable, List, Optional, Tuple
 
 from tinkoff.invest import CandleInterval, HistoricCandle
 from tinkoff.invest.caching.market_data_cache.cache_settings import (
@@ -13,11 +14,17 @@ from tinkoff.invest.caching.market_data_cache.instrument_date_range_market_data
 from tinkoff.invest.caching.market_data_cache.instrument_market_data_storage import (
     InstrumentMarketDataStorage,
 )
+from tinkoff.invest.caching.market_data_cache.stats import (
+    MarketDataCacheStats,
+    StatsCallback,
+)
 from tinkoff.invest.schemas import CandleSource
 from tinkoff.invest.services import Services
 from tinkoff.invest.utils import (
     candle_interval_to_timedelta,
+    ceil_datetime,
     floor_datetime,
+    get_intervals,
     now,
     round_datetime_range,
     with_filtering_distinct_candles,
@@ -27,14 +34,38 @@ logger = logging.getLogger(__name__)
 
 
 class MarketDataCache:
-    def __init__(self, settings: MarketDataCacheSettings, services: Services):
+    def __init__(
+        self,
+        settings: MarketDataCacheSettings,
+        services: Services,
+        stats_callback: Optional[StatsCallback] = None,
+    ):
         self._settings = settings
         self._settings.base_cache_dir.mkdir(parents=True, exist_ok=True)
         self._services = services
+        self._stats_callback = stats_callback
+        self._stats = MarketDataCacheStats()
+        self._last_call_stats = MarketDataCacheStats()
         self._figi_cache_storages: Dict[
             Tuple[str, CandleInterval], InstrumentMarketDataStorage
         ] = {}
 
+    def get_stats(self) -> MarketDataCacheStats:
+        """Накопленная статистика по всем вызовам get_all_candles."""
+        return dataclasses.replace(self._stats)
+
+    def get_last_call_stats(self) -> MarketDataCacheStats:
+        """Статистика последнего завершённого вызова get_all_candles."""
+        return dataclasses.replace(self._last_call_stats)
+
+    def _report_stats(self, call_stats: MarketDataCacheStats) -> None:
+        self._last_call_stats = call_stats
+        self._stats = self._stats + call_stats
+        if self._settings.log_stats:
+            logger.info("Market data cache call stats: %s", call_stats)
+        if self._stats_callback is not None:
+            self._stats_callback(dataclasses.replace(call_stats))
+
     def _get_candles_from_net(
         self,
         figi: str,
@@ -43,22 +74,37 @@ class MarketDataCache:
         to: datetime,
         instrument_id: str = "",
         candle_source_type: Optional[CandleSource] = None,
+        stats: Optional[MarketDataCacheStats] = None,
     ) -> Iterable[HistoricCandle]:
-        yield from self._services.get_all_candles(
-            figi=figi,
-            interval=interval,
-            from_=from_,
-            to=to,
-            instrument_id=instrument_id,
-            candle_source_type=candle_source_type,
-        )
+        previous_candles = set()
+        for current_from, current_to in get_intervals(interval, from_, to):
+            if stats is not None:
+                stats.rpc_count += 1
+            candles_response = self._services.market_data.get_candles(
+                figi=figi,
+                interval=interval,
+                from_=current_from,
+                to=current_to,
+                instrument_id=instrument_id,
+                candle_source_type=candle_source_type,
+            )
+
+            for candle in candles_response.candles:
+                if candle not in previous_candles:
+                    yield candle
+                    previous_candles.add(candle)
+
+            previous_candles = set(candles_response.candles)
 
     def _with_saving_into_cache(
         self,
         storage: InstrumentMarketDataStorage,
         from_net: Iterable[HistoricCandle],
+        stats: Optional[MarketDataCacheStats] = None,
     ) -> Iterable[HistoricCandle]:
         candles = list(from_net)
+        if stats is not None:
+            stats.net_candles += len(candles)
         if candles:
             complete_candles = list(self._filter_complete_candles(candles))
             complete_candle_times = [candle.time for candle in complete_candles]
@@ -82,6 +128,60 @@ class MarketDataCache:
     ) -> Iterable[HistoricCandle]:
         return filter(lambda candle: candle.is_complete, candles)
 
+    def _get_resampled_from_cache(
+        self,
+        figi: str,
+        interval: CandleInterval,
+        from_: datetime,
+        to: datetime,
+    ) -> Optional[List[HistoricCandle]]:
+        if not self._settings.resample_source_intervals:
+            return None
+        # numpy is an optional dependency, so resampling is imported on demand
+        from tinkoff.invest.caching.market_data_cache.resampling import (
+            can_resample,
+            resample_candles,
+        )
+
+        interval_delta = candle_interval_to_timedelta(interval)
+        first_bucket = ceil_datetime(from_, interval_delta)
+        last_bucket = floor_datetime(to, interval_delta)
+        if first_bucket > last_bucket:
+            return None
+
+        for source_interval in self._settings.resample_source_intervals:
+            if not can_resample(source_interval, interval):
+                continue
+            source_delta = candle_interval_to_timedelta(source_interval)
+            request_range = (first_bucket, last_bucket + interval_delta - source_delta)
+            # последняя итоговая свеча может быть неполной: достаточно мелких
+            # свечей до последней завершённой к моменту to
+            required_end = min(
+                request_range[1], floor_datetime(to, source_delta) - source_delta
+            )
+            storage = self._get_figi_cache_storage(figi=figi, interval=source_interval)
+            call_stats = MarketDataCacheStats()
+            for cached in storage.get(request_range=request_range, stats=call_stats):
+                cached_start, cached_end = cached.date_range
+                if cached_start != first_bucket or cached_end < required_end:
+                    continue
+                logger.debug(
+                    "Resampling %s candles of %s from cached %s",
+                    interval,
+                    figi,
+                    source_interval,
+                )
+                source_candles = list(cached.historic_candles)
+                candles = resample_candles(
+                    source_candles,
+                    from_interval=source_interval,
+                    to_interval=interval,
+                )
+                call_stats.cached_candles += len(source_candles)
+                self._report_stats(call_stats)
+                return candles
+        return None
+
     @with_filtering_distinct_candles  # type: ignore
     def get_all_candles(
         self,
@@ -96,38 +196,57 @@ class MarketDataCache:
         interval_delta = candle_interval_to_timedelta(interval)
         to = to or now()
 
+        resampled = self._get_resampled_from_cache(
+            figi=figi, interval=interval, from_=from_, to=to
+        )
+        if resampled is not None:
+            yield from resampled
+            return
+
         processed_time = from_
         figi_cache_storage = self._get_figi_cache_storage(figi=figi, interval=interval)
-        for cached in figi_cache_storage.get(
-            request_range=round_datetime_range(
-                date_range=(from_, to), interval=interval
-            )
-        ):
-            cached_start, cached_end = cached.date_range
-            cached_candles = list(cached.historic_candles)
-            if cached_start > processed_time:
+        call_stats = MarketDataCacheStats()
+        try:
+            for cached in figi_cache_storage.get(
+                request_range=round_datetime_range(
+                    date_range=(from_, to), interval=interval
+                ),
+                stats=call_stats,
+            ):
+                cached_start, cached_end = cached.date_range
+                cached_candles = list(cached.historic_candles)
+                call_stats.cached_candles += len(cached_candles)
+                if cached_start > processed_time:
+                    yield from self._with_saving_into_cache(
+                        storage=figi_cache_storage,
+                        from_net=self._get_candles_from_net(
+                            figi=figi,
+                            interval=interval,
+                            from_=processed_time,
+                            to=cached_start,
+                            instrument_id=instrument_id,
+                            candle_source_type=candle_source_type,
+                            stats=call_stats,
+                        ),
+                        stats=call_stats,
+                    )
+
+                yield from cached_candles
+                processed_time = cached_end
+
+            if processed_time + interval_delta <= to:
                 yield from self._with_saving_into_cache(
                     storage=figi_cache_storage,
                     from_net=self._get_candles_from_net(
-                        figi=figi,
-                        interval=interval,
-                        from_=processed_time,
-                        to=cached_start,
-                        instrument_id=instrument_id,
-                        candle_source_type=candle_source_type,
+                        figi, interval, processed_time, to, stats=call_stats
                     ),
+                    stats=call_stats,
                 )
 
-            yield from cached_candles
-            processed_time = cached_end
-
-        if processed_time + interval_delta <= to:
-            yield from self._with_saving_into_cache(
-                storage=figi_cache_storage,
-                from_net=self._get_candles_from_net(figi, interval, processed_time, to),
-            )
-
-        figi_cache_storage.merge()
+            figi_cache_storage.merge(stats=call_stats)
+        finally:
+            # статистика нужна и для прерванных вызовов
+            self._report_stats(call_stats)
 
     def _get_figi_cache_storage(
         self, figi: str, interval: CandleInterval
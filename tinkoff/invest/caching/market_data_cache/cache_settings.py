@@ -8,6 +8,7 @@ from pathlib import Path
 from typing import Dict, Generator, Sequence
 
 from tinkoff.invest.caching.market_data_cache.datetime_range import DatetimeRange
+from tinkoff.invest.schemas import CandleInterval
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +32,8 @@ class MarketDataCacheSettings:
         "candle_source",
     )
     meta_extension: str = "meta"
+    log_stats: bool = False
+    resample_source_intervals: Sequence[CandleInterval] = ()
 
 
 @dataclasses.dataclass()
@@ -2,6 +2,7 @@ import csv
 import dataclasses
 import itertools
 import logging
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Generator, Iterable, Iterator, Optional, Tuple
@@ -20,6 +21,7 @@ from tinkoff.invest.caching.market_data_cache.interface import (
     IInstrumentMarketDataStorage,
 )
 from tinkoff.invest.caching.market_data_cache.serialization import custom_asdict_factory
+from tinkoff.invest.caching.market_data_cache.stats import MarketDataCacheStats
 from tinkoff.invest.schemas import CandleInterval, HistoricCandle
 from tinkoff.invest.utils import dataclass_from_dict
 
@@ -85,9 +87,15 @@ class InstrumentMarketDataStorage(
         self,
         file: Path,
         request_range: DatetimeRange,
+        stats: Optional[MarketDataCacheStats] = None,
     ) -> Generator[HistoricCandle, None, None]:
-        with open(file, "r") as infile:  # pylint: disable=W1514
-            reader = csv.DictReader(infile, fieldnames=self._settings.field_names)
+        # newline="" сохраняет окончания строк, чтобы считать байты как на диске
+        with open(file, "r", newline="") as infile:  # pylint: disable=W1514
+            lines: Iterable[str] = infile
+            if stats is not None:
+                stats.files_read += 1
+                lines = self._with_counting_bytes(infile, infile.encoding, stats)
+            reader = csv.DictReader(lines, fieldnames=self._settings.field_names)
             reader_iter = iter(reader)
             next(reader_iter)  # pylint: disable=R1708
             for row in self._get_range_from_file(
@@ -95,6 +103,13 @@ class InstrumentMarketDataStorage(
             ):
                 yield self._candle_from_row(row)
 
+    def _with_counting_bytes(
+        self, lines: Iterable[str], encoding: str, stats: MarketDataCacheStats
+    ) -> Iterable[str]:
+        for line in lines:
+            stats.bytes_parsed += len(line.encode(encoding))
+            yield line
+
     def _order_rows(
         self, dict_reader1: Iterator[Dict], dict_reader2: Iterator[Dict]
     ) -> Iterable[Dict]:
@@ -254,7 +269,11 @@ class InstrumentMarketDataStorage(
                 return self._try_merge_files(new_cached_range_in_file)
         return new_cached_range_in_file
 
-    def get(self, request_range: DatetimeRange) -> Iterable[InstrumentDateRangeData]:
+    def get(
+        self,
+        request_range: DatetimeRange,
+        stats: Optional[MarketDataCacheStats] = None,
+    ) -> Iterable[InstrumentDateRangeData]:
         with meta_file_context(meta_file_path=self._meta_path) as meta_file:
             cached_range_in_file = meta_file.cached_range_in_file
 
@@ -266,7 +285,7 @@ class InstrumentMarketDataStorage(
             )
             if intersection is not None:
                 candles = self._get_candles_from_cache(
-                    cached_file, request_range=request_range
+                    cached_file, request_range=request_range, stats=stats
                 )
                 yield InstrumentDateRangeData(
                     date_range=intersection, historic_candles=candles
@@ -278,12 +297,15 @@ class InstrumentMarketDataStorage(
                 new_file = self._write_candles_file(data)
                 meta_file.cached_range_in_file[data.date_range] = new_file
 
-    def merge(self):
+    def merge(self, stats: Optional[MarketDataCacheStats] = None):
+        started_at = time.perf_counter()
         with meta_file_context(meta_file_path=self._meta_path) as meta_file:
             new_cached_range_in_file = self._try_merge_files(
                 meta_file.cached_range_in_file
             )
             meta_file.cached_range_in_file = new_cached_range_in_file
+        if stats is not None:
+            stats.merge_time_seconds += time.perf_counter() - started_at
 
     def _get_cached_items_sorted_by_start(
         self, cached_range_in_file: Dict[DatetimeRange, Path]
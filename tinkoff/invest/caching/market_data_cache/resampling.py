@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Sequence
+
+import numpy as np
+
+from tinkoff.invest.schemas import CandleInterval, HistoricCandle, Quotation
+from tinkoff.invest.utils import (
+    candle_interval_to_timedelta,
+    datetime_to_microseconds,
+    microseconds_to_datetime,
+    nano_to_quotation,
+    quotation_to_nano,
+)
+
+__all__ = (
+    "can_resample",
+    "resample_candles",
+)
+
+# floor_datetime aligns buckets to datetime.min, keep the same origin here
+_DATETIME_MIN_OFFSET = -datetime_to_microseconds(
+    datetime.min.replace(tzinfo=timezone.utc)
+)
+_NOT_RESAMPLABLE = frozenset(
+    (CandleInterval.CANDLE_INTERVAL_UNSPECIFIED, CandleInterval.CANDLE_INTERVAL_MONTH)
+)
+
+
+def can_resample(from_interval: CandleInterval, to_interval: CandleInterval) -> bool:
+    if from_interval in _NOT_RESAMPLABLE or to_interval in _NOT_RESAMPLABLE:
+        return False
+    from_delta = candle_interval_to_timedelta(from_interval)
+    to_delta = candle_interval_to_timedelta(to_interval)
+    return to_delta > from_delta and to_delta % from_delta == timedelta()
+
+
+def _quotations_to_array(quotations: Sequence[Quotation]) -> np.ndarray:
+    return np.fromiter(
+        (quotation_to_nano(quotation) for quotation in quotations),
+        dtype=np.int64,
+        count=len(quotations),
+    )
+
+
+def _array_to_quotations(values: np.ndarray) -> List[Quotation]:
+    return [nano_to_quotation(value) for value in values.tolist()]
+
+
+def resample_candles(
+    candles: Sequence[HistoricCandle],
+    from_interval: CandleInterval,
+    to_interval: CandleInterval,
+) -> List[HistoricCandle]:
+    """Собрать свечи интервала to_interval из более мелких свечей from_interval.
+
+    Свечи группируются по floor_datetime(candle.time, to_interval).
+    Итоговая свеча считается завершённой, если завершены все входящие в неё
+    свечи и покрыт весь её интервал.
+    """
+    if not can_resample(from_interval, to_interval):
+        raise ValueError(f"Cannot resample {from_interval} to {to_interval}")
+    if not candles:
+        return []
+
+    candles = sorted(candles, key=lambda candle: candle.time)
+    microsecond = timedelta(microseconds=1)
+    from_microseconds = candle_interval_to_timedelta(from_interval) // microsecond
+    to_microseconds = candle_interval_to_timedelta(to_interval) // microsecond
+
+    times = np.fromiter(
+        (datetime_to_microseconds(candle.time) for candle in candles),
+        dtype=np.int64,
+        count=len(candles),
+    )
+    buckets = times - (times + _DATETIME_MIN_OFFSET) % to_microseconds
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(candles)] - 1
+
+    opens = _quotations_to_array([candle.open for candle in candles])[starts]
+    closes = _quotations_to_array([candle.close for candle in candles])[ends]
+    highs = np.maximum.reduceat(
+        _quotations_to_array([candle.high for candle in candles]), starts
+    )
+    lows = np.minimum.reduceat(
+        _quotations_to_array([candle.low for candle in candles]), starts
+    )
+    volumes = np.add.reduceat(
+        np.fromiter((candle.volume for candle in candles), dtype=np.int64), starts
+    )
+    incomplete = np.fromiter(
+        (not candle.is_complete for candle in candles), dtype=np.int64
+    )
+    is_complete = np.add.reduceat(incomplete, starts) == 0
+    # the last bucket may still be waiting for its trailing fine candles
+    is_complete[-1] &= times[-1] + from_microseconds >= buckets[-1] + to_microseconds
+
+    return [
+        HistoricCandle(
+            open=open_,
+            high=high,
+            low=low,
+            close=close,
+            volume=volume,
+            time=microseconds_to_datetime(bucket),
+            is_complete=complete,
+            candle_source=candles[end].candle_source,
+        )
+        for open_, high, low, close, volume, bucket, complete, end in zip(
+            _array_to_quotations(opens),
+            _array_to_quotations(highs),
+            _array_to_quotations(lows),
+            _array_to_quotations(closes),
+            volumes.tolist(),
+            buckets[starts].tolist(),
+            is_complete.tolist(),
+            ends.tolist(),
+        )
+    ]
@@ -0,0 +1,40 @@
+import dataclasses
+from typing import Callable
+
+
+@dataclasses.dataclass()
+class MarketDataCacheStats:
+    cached_candles: int = 0
+    net_candles: int = 0
+    rpc_count: int = 0
+    files_read: int = 0
+    bytes_parsed: int = 0
+    merge_time_seconds: float = 0.0
+
+    def __add__(self, other: "MarketDataCacheStats") -> "MarketDataCacheStats":
+        return self._combine(other, lambda a, b: a + b)
+
+    def __sub__(self, other: "MarketDataCacheStats") -> "MarketDataCacheStats":
+        return self._combine(other, lambda a, b: a - b)
+
+    def _combine(
+        self, other: "MarketDataCacheStats", operation: Callable
+    ) -> "MarketDataCacheStats":
+        return MarketDataCacheStats(
+            **{
+                field.name: operation(
+                    getattr(self, field.name), getattr(other, field.name)
+                )
+                for field in dataclasses.fields(self)
+            }
+        )
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.cached_candles + self.net_candles
+        if total == 0:
+            return 0.0
+        return self.cached_candles / total
+
+
+StatsCallback = Callable[[MarketDataCacheStats], None]
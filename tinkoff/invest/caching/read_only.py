@@ -0,0 +1,60 @@
+import dataclasses
+from typing import Any, Dict, TypeVar, cast
+
+T = TypeVar("T")
+
+
+class _ReadOnlyResponse:
+    """Неизменяемое представление ответа, которое можно отдавать без копирования.
+
+    Списки хранятся в кортежах. copy.copy и pickle возвращают обычный
+    изменяемый ответ исходного типа.
+    """
+
+    _mutable_type: type
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        response = self._mutable_type(*args, **kwargs)
+        for name, value in vars(response).items():
+            if isinstance(value, list):
+                value = tuple(value)
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise dataclasses.FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise dataclasses.FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def __reduce__(self):
+        state = {
+            name: list(value) if isinstance(value, tuple) else value
+            for name, value in vars(self).items()
+        }
+        return self._mutable_type, (), state
+
+
+_READ_ONLY_TYPES: Dict[type, type] = {}
+
+
+def _get_read_only_type(response_type: type) -> type:
+    read_only_type = _READ_ONLY_TYPES.get(response_type)
+    if read_only_type is None:
+        read_only_type = _READ_ONLY_TYPES.setdefault(
+            response_type,
+            type(
+                f"ReadOnly{response_type.__name__}",
+                (_ReadOnlyResponse, response_type),
+                {"_mutable_type": response_type},
+            ),
+        )
+    return read_only_type
+
+
+def make_read_only(response: T) -> T:
+    if isinstance(response, _ReadOnlyResponse) or not dataclasses.is_dataclass(
+        response
+    ):
+        return response
+    read_only_type = _get_read_only_type(type(response))
+    return cast(T, read_only_type(**vars(response)))
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from tinkoff.invest.async_services import InstrumentsService
+from tinkoff.invest.caching.read_only import make_read_only
+from tinkoff.invest.caching.reference_data_cache.settings import (
+    ReferenceDataCacheSettings,
+)
+from tinkoff.invest.caching.reference_data_cache.storage import (
+    ReferenceDataStorage,
+    make_key,
+    make_trading_schedules_key,
+)
+from tinkoff.invest.schemas import (
+    AssetResponse,
+    AssetsRequest,
+    AssetsResponse,
+    GetBondCouponsResponse,
+    GetBondEventsRequest,
+    GetBondEventsResponse,
+    GetBrandsResponse,
+    GetCountriesResponse,
+    GetDividendsResponse,
+    GetFuturesMarginResponse,
+    Page,
+    TradingSchedulesResponse,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncReferenceDataCache:
+    """Кэш справочных данных для AsyncServices.
+
+    Одновременные промахи по одному ключу ждут один и тот же запрос.
+    """
+
+    def __init__(
+        self,
+        settings: ReferenceDataCacheSettings,
+        instruments_service: InstrumentsService,
+    ):
+        self._settings = settings
+        self._instruments_service = instruments_service
+        self._storage = ReferenceDataStorage(settings)
+        self._pending_calls: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._instruments_service, name)
+
+    def clear(self) -> None:
+        self._storage.clear()
+
+    async def _call(self, method_name: str, *args: Any, **kwargs: Any) -> Any:
+        return await self._call_with_key(
+            method_name, make_key(*args, **kwargs), *args, **kwargs
+        )
+
+    async def _call_with_key(
+        self, method_name: str, key: Hashable, *args: Any, **kwargs: Any
+    ) -> Any:
+        found, response = self._storage.get(method_name, key)
+        if found:
+            return response
+        pending_key = (method_name, key)
+        pending_call = self._pending_calls.get(pending_key)
+        if pending_call is None:
+            pending_call = asyncio.ensure_future(
+                self._request(method_name, key, *args, **kwargs)
+            )
+            self._pending_calls[pending_key] = pending_call
+            pending_call.add_done_callback(
+                lambda _: self._pending_calls.pop(pending_key, None)
+            )
+        return await asyncio.shield(pending_call)
+
+    async def _request(
+        self, method_name: str, key: Hashable, *args: Any, **kwargs: Any
+    ) -> Any:
+        method = getattr(self._instruments_service, method_name)
+        response = make_read_only(await method(*args, **kwargs))
+        self._storage.set(method_name, key, response)
+        return response
+
+    async def trading_schedules(
+        self,
+        *,
+        exchange: str = "",
+        from_: Optional[datetime] = None,
+        to: Optional[datetime] = None,
+    ) -> TradingSchedulesResponse:
+        return await self._call_with_key(
+            "trading_schedules",
+            make_trading_schedules_key(exchange=exchange, from_=from_, to=to),
+            exchange=exchange,
+            from_=from_,
+            to=to,
+        )
+
+    async def get_dividends(
+        self,
+        *,
+        figi: str = "",
+        from_: Optional[datetime] = None,
+        to: Optional[datetime] = None,
+        instrument_id: str = "",
+    ) -> GetDividendsResponse:
+        return await self._call(
+            "get_dividends",
+            figi=figi,
+            from_=from_,
+            to=to,
+            instrument_id=instrument_id,
+        )
+
+    async def get_bond_coupons(
+        self,
+        *,
+        figi: str = "",
+        from_: Optional[datetime] = None,
+        to: Optional[datetime] = None,
+        instrument_id: str = "",
+    ) -> GetBondCouponsResponse:
+        return await self._call(
+            "get_bond_coupons",
+            figi=figi,
+            from_=from_,
+            to=to,
+            instrument_id=instrument_id,
+        )
+
+    async def get_bond_events(
+        self, request: GetBondEventsRequest
+    ) -> GetBondEventsResponse:
+        return await self._call("get_bond_events", request)
+
+    async def get_asset_by(
+        self,
+        *,
+        id: str = "",
+    ) -> AssetResponse:
+        return await self._call("get_asset_by", id=id)
+
+    async def get_assets(
+        self,
+        request: AssetsRequest,
+    ) -> AssetsResponse:
+        return await self._call("get_assets", request)
+
+    async def get_brands(
+        self,
+        paging: Optional[Page] = None,
+    ) -> GetBrandsResponse:
+        return await self._call("get_brands", paging)
+
+    async def get_countries(
+        self,
+    ) -> GetCountriesResponse:
+        return await self._call("get_countries")
+
+    async def get_futures_margin(
+        self, *, figi: str = "", instrument_id: str = ""
+    ) -> GetFuturesMarginResponse:
+        return await self._call(
+            "get_futures_margin", figi=figi, instrument_id=instrument_id
+        )
@@ -0,0 +1,149 @@
+import logging
+from datetime import datetime
+from typing import Any, Hashable, Optional
+
+from tinkoff.invest.caching.read_only import make_read_only
+from tinkoff.invest.caching.reference_data_cache.settings import (
+    ReferenceDataCacheSettings,
+)
+from tinkoff.invest.caching.reference_data_cache.storage import (
+    ReferenceDataStorage,
+    make_key,
+    make_trading_schedules_key,
+)
+from tinkoff.invest.schemas import (
+    AssetResponse,
+    AssetsRequest,
+    AssetsResponse,
+    GetBondCouponsResponse,
+    GetBondEventsRequest,
+    GetBondEventsResponse,
+    GetBrandsResponse,
+    GetCountriesResponse,
+    GetDividendsResponse,
+    GetFuturesMarginResponse,
+    Page,
+    TradingSchedulesResponse,
+)
+from tinkoff.invest.services import InstrumentsService
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceDataCache:
+    """Кэш редко меняющихся справочных данных InstrumentsService.
+
+    Повторяет сигнатуры методов сервиса, остальные методы проксирует как есть,
+    поэтому может использоваться вместо client.instruments.
+    """
+
+    def __init__(
+        self,
+        settings: ReferenceDataCacheSettings,
+        instruments_service: InstrumentsService,
+    ):
+        self._settings = settings
+        self._instruments_service = instruments_service
+        self._storage = ReferenceDataStorage(settings)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._instruments_service, name)
+
+    def clear(self) -> None:
+        self._storage.clear()
+
+    def _call(self, method_name: str, *args: Any, **kwargs: Any) -> Any:
+        return self._call_with_key(
+            method_name, make_key(*args, **kwargs), *args, **kwargs
+        )
+
+    def _call_with_key(
+        self, method_name: str, key: Hashable, *args: Any, **kwargs: Any
+    ) -> Any:
+        found, response = self._storage.get(method_name, key)
+        if found:
+            return response
+        response = make_read_only(
+            getattr(self._instruments_service, method_name)(*args, **kwargs)
+        )
+        self._storage.set(method_name, key, response)
+        return response
+
+    def trading_schedules(
+        self,
+        *,
+        exchange: str = "",
+        from_: Optional[datetime] = None,
+        to: Optional[datetime] = None,
+    ) -> TradingSchedulesResponse:
+        return self._call_with_key(
+            "trading_schedules",
+            make_trading_schedules_key(exchange=exchange, from_=from_, to=to),
+            exchange=exchange,
+            from_=from_,
+            to=to,
+        )
+
+    def get_dividends(
+        self,
+        *,
+        figi: str = "",
+        from_: Optional[datetime] = None,
+        to: Optional[datetime] = None,
+        instrument_id: str = "",
+    ) -> GetDividendsResponse:
+        return self._call(
+            "get_dividends",
+            figi=figi,
+            from_=from_,
+            to=to,
+            instrument_id=instrument_id,
+        )
+
+    def get_bond_coupons(
+        self,
+        *,
+        figi: str = "",
+        from_: Optional[datetime] = None,
+        to: Optional[datetime] = None,
+        instrument_id: str = "",
+    ) -> GetBondCouponsResponse:
+        return self._call(
+            "get_bond_coupons",
+            figi=figi,
+            from_=from_,
+            to=to,
+            instrument_id=instrument_id,
+        )
+
+    def get_bond_events(self, request: GetBondEventsRequest) -> GetBondEventsResponse:
+        return self._call("get_bond_events", request)
+
+    def get_asset_by(
+        self,
+        *,
+        id: str = "",
+    ) -> AssetResponse:
+        return self._call("get_asset_by", id=id)
+
+    def get_assets(
+        self,
+        request: AssetsRequest,
+    ) -> AssetsResponse:
+        return self._call("get_assets", request)
+
+    def get_brands(
+        self,
+        paging: Optional[Page] = None,
+    ) -> GetBrandsResponse:
+        return self._call("get_brands", paging)
+
+    def get_countries(
+        self,
+    ) -> GetCountriesResponse:
+        return self._call("get_countries")
+
+    def get_futures_margin(
+        self, *, figi: str = "", instrument_id: str = ""
+    ) -> GetFuturesMarginResponse:
+        return self._call("get_futures_margin", figi=figi, instrument_id=instrument_id)
@@ -0,0 +1,27 @@
+import dataclasses
+from datetime import timedelta
+from typing import Dict
+
+DEFAULT_TTL_BY_METHOD: Dict[str, timedelta] = {
+    "trading_schedules": timedelta(hours=1),
+    "get_dividends": timedelta(hours=12),
+    "get_bond_coupons": timedelta(hours=12),
+    "get_bond_events": timedelta(hours=12),
+    "get_assets": timedelta(days=1),
+    "get_asset_by": timedelta(days=1),
+    "get_brands": timedelta(days=1),
+    "get_countries": timedelta(days=7),
+    "get_futures_margin": timedelta(minutes=5),
+}
+
+
+@dataclasses.dataclass()
+class ReferenceDataCacheSettings:
+    ttl_by_method: Dict[str, timedelta] = dataclasses.field(
+        default_factory=lambda: dict(DEFAULT_TTL_BY_METHOD)
+    )
+    default_ttl: timedelta = timedelta(hours=1)
+    maxsize_per_method: int = 256
+
+    def get_ttl(self, method_name: str) -> timedelta:
+        return self.ttl_by_method.get(method_name, self.default_ttl)
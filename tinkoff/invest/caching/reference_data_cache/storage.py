@@ -0,0 +1,88 @@
+import dataclasses
+import enum
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Hashable, Mapping, Optional, Tuple
+
+from tinkoff.invest.caching.overrides import TTLCache
+from tinkoff.invest.caching.reference_data_cache.settings import (
+    ReferenceDataCacheSettings,
+)
+from tinkoff.invest.utils import now
+
+logger = logging.getLogger(__name__)
+
+CACHED_METHODS = (
+    "trading_schedules",
+    "get_dividends",
+    "get_bond_coupons",
+    "get_bond_events",
+    "get_assets",
+    "get_asset_by",
+    "get_brands",
+    "get_countries",
+    "get_futures_margin",
+)
+
+_MISSING = object()
+
+
+def make_key(*args: Any, **kwargs: Any) -> Hashable:
+    return _freeze(args), _freeze(kwargs)
+
+
+def make_trading_schedules_key(
+    exchange: str, from_: Optional[datetime], to: Optional[datetime]
+) -> Hashable:
+    # без границ сервер отдаёт расписание от текущего дня, поэтому день входит в ключ
+    today = now().date() if from_ is None or to is None else None
+    return make_key(exchange=exchange, from_=from_, to=to, today=today)
+
+
+def _freeze(value: Any) -> Hashable:
+    # dataclass-запросы сравниваются по идентичности, поэтому ключ строим по полям
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return type(value).__name__, tuple(
+            (field.name, _freeze(getattr(value, field.name)))
+            for field in dataclasses.fields(value)
+        )
+    if isinstance(value, Mapping):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, enum.Enum):
+        return type(value).__name__, value.value
+    return value
+
+
+class ReferenceDataStorage:
+    """Ответы методов с отдельными TTL и ограничением размера на каждый метод."""
+
+    def __init__(self, settings: ReferenceDataCacheSettings):
+        self._settings = settings
+        self._lock = threading.Lock()
+        self._caches: Dict[str, TTLCache] = {
+            method_name: TTLCache(
+                maxsize=settings.maxsize_per_method,
+                ttl=settings.get_ttl(method_name).total_seconds(),
+            )
+            for method_name in CACHED_METHODS
+        }
+
+    def get(self, method_name: str, key: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            value = self._caches[method_name].get(key, _MISSING)
+        if value is _MISSING:
+            logger.debug("Reference data cache miss for %s", method_name)
+            return False, None
+        return True, value
+
+    def set(self, method_name: str, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._caches[method_name][key] = value
+
+    def clear(self) -> None:
+        with self._lock:
+            for cache in self._caches.values():
+                cache.clear()
@@ -45,3 +45,13 @@ class MarketDataStreamError(InvestError):
 
 class IsNotSubscribedError(MarketDataStreamError):
     pass
+
+
+class StreamRecordingError(InvestError):
+    pass
+
+
+class StreamStalledError(InvestError):
+    def __init__(self, stall: Any) -> None:
+        super().__init__(f"Stream {stall.stream_name} stalled for {stall.stalled_for}")
+        self.stall = stall
@@ -1,11 +1,24 @@
-import asyncio
-import threading
-from asyncio import Queue
-from typing import AsyncIterable, AsyncIterator, Awaitable
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Optional,
+    TypeVar,
+)
 
+from tinkoff.invest.market_data_stream.latency import StreamLatencyStats
 from tinkoff.invest.market_data_stream.market_data_stream_interface import (
     IMarketDataStreamManager,
 )
+from tinkoff.invest.market_data_stream.payload import (
+    PAYLOAD_FIELDS,
+    RawPayloadFilter,
+    get_stream_options,
+)
+from tinkoff.invest.market_data_stream.request_queue import AsyncRequestQueue
 from tinkoff.invest.market_data_stream.stream_managers import (
     CandlesStreamManager,
     InfoStreamManager,
@@ -13,28 +26,90 @@ from tinkoff.invest.market_data_stream.stream_managers import (
     OrderBookStreamManager,
     TradesStreamManager,
 )
-from tinkoff.invest.schemas import MarketDataRequest, MarketDataResponse
+from tinkoff.invest.market_data_stream.subscriptions import MAX_INSTRUMENTS_PER_REQUEST
+from tinkoff.invest.schemas import (
+    Candle,
+    LastPrice,
+    MarketDataRequest,
+    MarketDataResponse,
+    OpenInterest,
+    OrderBook,
+    Ping,
+    Trade,
+    TradingStatus,
+)
+
+PayloadHandler = Callable[[Any], Awaitable[None]]
+THandler = TypeVar("THandler", bound=Callable[..., Awaitable[None]])
+
+
+class _PayloadTypeTracker:
+    """Фильтр стрима, запоминающий тип payload последнего пропущенного сообщения.
+
+    Сервис вызывает фильтр для protobuf-сообщения непосредственно перед его
+    конвертацией и выдачей, поэтому тип payload известен без перебора полей
+    MarketDataResponse, а сообщения без обработчика не конвертируются.
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, PayloadHandler],
+        payload_filter: Optional[RawPayloadFilter],
+    ):
+        self._handlers = handlers
+        self._payload_filter = payload_filter
+        self.payload_type = ""
+
+    def __call__(self, payload_type: Optional[str], instrument_id: str) -> bool:
+        if payload_type not in self._handlers:
+            return False
+        if self._payload_filter is not None and not self._payload_filter(
+            payload_type, instrument_id
+        ):
+            return False
+        self.payload_type = payload_type
+        return True
 
 
 class AsyncMarketDataStreamManager(IMarketDataStreamManager):
+    """Асинхронный менеджер стрима рыночных данных.
+
+    Стрим можно читать через async for или зарегистрировать обработчики
+    по типам payload и запустить run(), который завершается после stop()
+    или при отмене задачи:
+
+        market_data_stream = client.create_market_data_stream()
+        market_data_stream.on_candle(handle_candle)
+        market_data_stream.candles.subscribe([...])
+        task = asyncio.create_task(market_data_stream.run())
+    """
+
     def __init__(
         self,
         market_data_stream: "MarketDataStreamService",  # type: ignore  # noqa: F821
+        payload_filter: Optional[RawPayloadFilter] = None,
+        latency_stats: Optional[StreamLatencyStats] = None,
+        max_instruments_per_request: int = MAX_INSTRUMENTS_PER_REQUEST,
     ):
         self._market_data_stream_service = market_data_stream
+        self._max_instruments_per_request = max_instruments_per_request
+        self._payload_filter = payload_filter
+        self.latency_stats = latency_stats
         self._market_data_stream: AsyncIterator[MarketDataResponse]
-        self._requests: Queue[MarketDataRequest] = Queue()
-        self._unsubscribe_event = threading.Event()
-
-    async def _get_request_generator(self) -> AsyncIterable[MarketDataRequest]:
-        while not self._unsubscribe_event.is_set() or not self._requests.empty():
-            try:
-                request = await asyncio.wait_for(self._requests.get(), timeout=1.0)
-            except asyncio.exceptions.TimeoutError:
-                pass
-            else:
-                yield request
-                self._requests.task_done()
+        self._requests = AsyncRequestQueue()
+        self._handlers: Dict[str, PayloadHandler] = {}
+
+    def _get_request_generator(self) -> AsyncIterable[MarketDataRequest]:
+        return self._requests.iterate(self._max_instruments_per_request)
+
+    def _open_stream(
+        self, payload_filter: Optional[RawPayloadFilter]
+    ) -> AsyncIterable[MarketDataResponse]:
+        self._requests.open()
+        return self._market_data_stream_service.market_data_stream(
+            self._get_request_generator(),
+            **get_stream_options(payload_filter, self.latency_stats),
+        )
 
     @property
     def candles(self) -> "CandlesStreamManager[AsyncMarketDataStreamManager]":
@@ -57,19 +132,81 @@ class AsyncMarketDataStreamManager(IMarketDataStreamManager):
         return LastPriceStreamManager[AsyncMarketDataStreamManager](parent_manager=self)
 
     def subscribe(self, market_data_request: MarketDataRequest) -> None:
-        self._requests.put_nowait(market_data_request)
+        self._requests.put(market_data_request)
 
     def unsubscribe(self, market_data_request: MarketDataRequest) -> None:
-        self._requests.put_nowait(market_data_request)
+        self._requests.put(market_data_request)
 
     def stop(self) -> None:
-        self._unsubscribe_event.set()
+        self._requests.close()
+
+    def on(self, payload_type: str, handler: THandler) -> THandler:
+        """Зарегистрировать обработчик поля payload MarketDataResponse."""
+        if payload_type not in PAYLOAD_FIELDS:
+            raise ValueError(f"Unknown payload type: {payload_type}")
+        self._handlers[payload_type] = handler
+        return handler
+
+    def remove_handler(self, payload_type: str) -> None:
+        self._handlers.pop(payload_type, None)
+
+    def on_candle(
+        self, handler: Callable[[Candle], Awaitable[None]]
+    ) -> Callable[[Candle], Awaitable[None]]:
+        return self.on("candle", handler)
+
+    def on_orderbook(
+        self, handler: Callable[[OrderBook], Awaitable[None]]
+    ) -> Callable[[OrderBook], Awaitable[None]]:
+        return self.on("orderbook", handler)
+
+    def on_trade(
+        self, handler: Callable[[Trade], Awaitable[None]]
+    ) -> Callable[[Trade], Awaitable[None]]:
+        return self.on("trade", handler)
+
+    def on_trading_status(
+        self, handler: Callable[[TradingStatus], Awaitable[None]]
+    ) -> Callable[[TradingStatus], Awaitable[None]]:
+        return self.on("trading_status", handler)
+
+    def on_last_price(
+        self, handler: Callable[[LastPrice], Awaitable[None]]
+    ) -> Callable[[LastPrice], Awaitable[None]]:
+        return self.on("last_price", handler)
+
+    def on_open_interest(
+        self, handler: Callable[[OpenInterest], Awaitable[None]]
+    ) -> Callable[[OpenInterest], Awaitable[None]]:
+        return self.on("open_interest", handler)
+
+    def on_ping(
+        self, handler: Callable[[Ping], Awaitable[None]]
+    ) -> Callable[[Ping], Awaitable[None]]:
+        return self.on("ping", handler)
+
+    async def run(self) -> None:
+        """Читать стрим и вызывать обработчики до stop() или отмены задачи.
+
+        Исключение обработчика прерывает стрим и пробрасывается из run().
+        """
+        tracker = _PayloadTypeTracker(self._handlers, self._payload_filter)
+        stream = self._open_stream(tracker)
+        try:
+            async for market_data in stream:
+                payload_type = tracker.payload_type
+                handler = self._handlers.get(payload_type)
+                if handler is not None:
+                    await handler(getattr(market_data, payload_type))
+        finally:
+            self._requests.close()
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
 
     def __aiter__(self) -> "AsyncMarketDataStreamManager":
-        self._unsubscribe_event.clear()
-        self._market_data_stream = self._market_data_stream_service.market_data_stream(
-            self._get_request_generator()
-        ).__aiter__()
+        stream = self._open_stream(self._payload_filter)
+        self._market_data_stream = stream.__aiter__()
 
         return self
 
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Collection, Hashable, Optional
+
+from tinkoff.invest.market_data_stream.async_market_data_stream_manager import (
+    AsyncMarketDataStreamManager,
+)
+from tinkoff.invest.market_data_stream.multiplexer import (
+    ConsumerBuffer,
+    ConsumerFilter,
+    ConsumerRegistry,
+    OverflowPolicy,
+)
+from tinkoff.invest.schemas import MarketDataResponse
+
+__all__ = (
+    "AsyncMarketDataConsumer",
+    "AsyncMarketDataMultiplexer",
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncMarketDataConsumer:
+    def __init__(
+        self,
+        consumer_filter: ConsumerFilter,
+        maxsize: int,
+        overflow_policy: OverflowPolicy,
+    ):
+        self.filter = consumer_filter
+        self._buffer = ConsumerBuffer(maxsize, overflow_policy)
+        self._condition = asyncio.Condition()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+
+    @property
+    def dropped(self) -> int:
+        return self._buffer.dropped
+
+    async def put(self, key: Hashable, market_data: MarketDataResponse) -> None:
+        async with self._condition:
+            while not self._closed and not self._buffer.put(key, market_data):
+                await self._condition.wait()
+            self._condition.notify_all()
+
+    async def get(self) -> MarketDataResponse:
+        """Следующее сообщение. StopAsyncIteration, если подписчик закрыт."""
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: len(self._buffer) > 0 or self._closed
+            )
+            if len(self._buffer) == 0:
+                if self._error is not None:
+                    raise self._error
+                raise StopAsyncIteration
+            market_data = self._buffer.get()
+            self._condition.notify_all()
+            return market_data
+
+    async def close(self, error: Optional[BaseException] = None) -> None:
+        async with self._condition:
+            self._closed = True
+            self._error = error
+            self._condition.notify_all()
+
+    def __aiter__(self) -> AsyncIterator[MarketDataResponse]:
+        return self
+
+    async def __anext__(self) -> MarketDataResponse:
+        return await self.get()
+
+
+class AsyncMarketDataMultiplexer:
+    """Асинхронный вариант MarketDataMultiplexer."""
+
+    def __init__(self, market_data_stream: AsyncMarketDataStreamManager):
+        self._manager = market_data_stream
+        self._consumers = ConsumerRegistry()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def manager(self) -> AsyncMarketDataStreamManager:
+        return self._manager
+
+    def add_consumer(
+        self,
+        *,
+        payload_types: Optional[Collection[str]] = None,
+        instrument_ids: Optional[Collection[str]] = None,
+        maxsize: int = 1000,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+    ) -> AsyncMarketDataConsumer:
+        consumer = AsyncMarketDataConsumer(
+            ConsumerFilter(payload_types, instrument_ids), maxsize, overflow_policy
+        )
+        self._consumers.add(consumer)
+        return consumer
+
+    async def remove_consumer(self, consumer: AsyncMarketDataConsumer) -> None:
+        self._consumers.remove(consumer)
+        await consumer.close()
+
+    async def dispatch(self, market_data: MarketDataResponse) -> None:
+        key, consumers = self._consumers.route(market_data)
+        for consumer in consumers:
+            await consumer.put(key, market_data)
+
+    async def run(self) -> None:
+        error: Optional[BaseException] = None
+        try:
+            async for market_data in self._manager:
+                await self.dispatch(market_data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:  # pylint:disable=broad-except
+            logger.exception("Market data stream failed")
+            error = e
+        finally:
+            for consumer in self._consumers:
+                await consumer.close(error)
+
+    def start(self) -> asyncio.Task:
+        self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        self._manager.stop()
+        if self._task is not None:
+            await self._task
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from tinkoff.invest.market_data_stream.async_market_data_stream_manager import (
+    AsyncMarketDataStreamManager,
+)
+from tinkoff.invest.market_data_stream.market_data_stream_interface import (
+    IMarketDataStreamManager,
+)
+from tinkoff.invest.market_data_stream.sharding import (
+    ShardAllocator,
+    ShardingSettings,
+    ShardRequests,
+)
+from tinkoff.invest.market_data_stream.stream_managers import (
+    CandlesStreamManager,
+    InfoStreamManager,
+    LastPriceStreamManager,
+    OrderBookStreamManager,
+    TradesStreamManager,
+)
+from tinkoff.invest.schemas import MarketDataRequest, MarketDataResponse
+
+logger = logging.getLogger(__name__)
+
+_STOPPED = object()
+
+
+class _ShardFailure:
+    def __init__(self, shard_id: int, error: Exception):
+        self.shard_id = shard_id
+        self.error = error
+
+
+class AsyncShardedMarketDataStreamManager(IMarketDataStreamManager):
+    """Асинхронный вариант ShardedMarketDataStreamManager."""
+
+    def __init__(
+        self,
+        market_data_stream: "MarketDataStreamService",  # type: ignore  # noqa: F821
+        settings: Optional[ShardingSettings] = None,
+    ):
+        self._market_data_stream_service = market_data_stream
+        self._settings = settings or ShardingSettings()
+        if self._settings.reconnect_settings is not None:
+            raise ValueError(
+                "reconnect_settings are not supported by "
+                "AsyncShardedMarketDataStreamManager"
+            )
+        self._allocator = ShardAllocator(self._settings)
+        self._shards: Dict[int, AsyncMarketDataStreamManager] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._responses: "asyncio.Queue[Any]" = asyncio.Queue()
+        self._running = False
+
+    @property
+    def candles(self) -> "CandlesStreamManager[AsyncShardedMarketDataStreamManager]":
+        return CandlesStreamManager[AsyncShardedMarketDataStreamManager](
+            parent_manager=self
+        )
+
+    @property
+    def order_book(
+        self,
+    ) -> "OrderBookStreamManager[AsyncShardedMarketDataStreamManager]":
+        return OrderBookStreamManager[AsyncShardedMarketDataStreamManager](
+            parent_manager=self
+        )
+
+    @property
+    def trades(self) -> "TradesStreamManager[AsyncShardedMarketDataStreamManager]":
+        return TradesStreamManager[AsyncShardedMarketDataStreamManager](
+            parent_manager=self
+        )
+
+    @property
+    def info(self) -> "InfoStreamManager[AsyncShardedMarketDataStreamManager]":
+        return InfoStreamManager[AsyncShardedMarketDataStreamManager](
+            parent_manager=self
+        )
+
+    @property
+    def last_price(
+        self,
+    ) -> "LastPriceStreamManager[AsyncShardedMarketDataStreamManager]":
+        return LastPriceStreamManager[AsyncShardedMarketDataStreamManager](
+            parent_manager=self
+        )
+
+    def get_shard_loads(self) -> Dict[int, int]:
+        return {
+            shard_id: self._allocator.get_load(shard_id)
+            for shard_id in self._allocator.shard_ids
+        }
+
+    def subscribe(self, market_data_request: MarketDataRequest) -> None:
+        self._send(self._allocator.allocate(market_data_request))
+
+    def unsubscribe(self, market_data_request: MarketDataRequest) -> None:
+        self._send(self._allocator.allocate(market_data_request))
+        self._send(self._allocator.rebalance())
+        for shard_id in self._allocator.pop_empty_shards():
+            logger.debug("Closing empty market data stream shard %s", shard_id)
+            shard = self._shards.pop(shard_id, None)
+            if shard is not None:
+                shard.stop()
+
+    def _send(self, shard_requests: ShardRequests) -> None:
+        for shard_id, request in shard_requests:
+            self._get_shard(shard_id).subscribe(request)
+
+    def _get_shard(self, shard_id: int) -> AsyncMarketDataStreamManager:
+        shard = self._shards.get(shard_id)
+        if shard is None:
+            shard = AsyncMarketDataStreamManager(
+                self._market_data_stream_service,
+                max_instruments_per_request=self._settings.max_instruments_per_request,
+            )
+            self._shards[shard_id] = shard
+            if self._running:
+                self._start_shard(shard_id, shard)
+        return shard
+
+    def _start_shard(self, shard_id: int, shard: AsyncMarketDataStreamManager) -> None:
+        self._tasks[shard_id] = asyncio.create_task(self._run_shard(shard_id, shard))
+
+    async def _run_shard(
+        self, shard_id: int, shard: AsyncMarketDataStreamManager
+    ) -> None:
+        try:
+            async for market_data in shard:
+                await self._responses.put(market_data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:  # pylint:disable=broad-except
+            logger.exception("Market data stream shard %s failed", shard_id)
+            await self._responses.put(_ShardFailure(shard_id, e))
+        finally:
+            self._tasks.pop(shard_id, None)
+
+    def stop(self) -> None:
+        self._running = False
+        for shard in self._shards.values():
+            shard.stop()
+        self._responses.put_nowait(_STOPPED)
+
+    def __aiter__(self) -> "AsyncShardedMarketDataStreamManager":
+        self._running = True
+        for shard_id, shard in self._shards.items():
+            self._start_shard(shard_id, shard)
+        return self
+
+    async def __anext__(self) -> MarketDataResponse:
+        item = await self._responses.get()
+        if item is _STOPPED:
+            raise StopAsyncIteration
+        if isinstance(item, _ShardFailure):
+            raise item.error
+        return item
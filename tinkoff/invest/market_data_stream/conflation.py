@@ -0,0 +1,114 @@
+import logging
+from typing import Collection, Optional
+
+from tinkoff.invest.market_data_stream.async_market_data_stream_manager import (
+    AsyncMarketDataStreamManager,
+)
+from tinkoff.invest.market_data_stream.async_multiplexer import (
+    AsyncMarketDataMultiplexer,
+)
+from tinkoff.invest.market_data_stream.market_data_stream_manager import (
+    MarketDataStreamManager,
+)
+from tinkoff.invest.market_data_stream.multiplexer import (
+    MarketDataMultiplexer,
+    OverflowPolicy,
+)
+from tinkoff.invest.schemas import MarketDataResponse
+
+__all__ = (
+    "ConflatingMarketDataStream",
+    "AsyncConflatingMarketDataStream",
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SLOTS = 100_000
+
+
+class ConflatingMarketDataStream:
+    """Стрим, отдающий только последние значения по (тип payload, инструмент).
+
+    Фоновый поток постоянно вычитывает стрим, поэтому медленный потребитель не
+    накапливает очередь: пока сообщение не забрано, оно заменяется более
+    свежим, сохраняя место в очереди. max_slots ограничивает число пар
+    (тип payload, инструмент) и должен быть больше числа подписок.
+
+        stream = ConflatingMarketDataStream(client.create_market_data_stream())
+        stream.manager.order_book.subscribe([...])
+        for marketdata in stream:
+            ...
+    """
+
+    def __init__(
+        self,
+        market_data_stream: MarketDataStreamManager,
+        payload_types: Optional[Collection[str]] = None,
+        max_slots: int = DEFAULT_MAX_SLOTS,
+    ):
+        self._multiplexer = MarketDataMultiplexer(market_data_stream)
+        self._consumer = self._multiplexer.add_consumer(
+            payload_types=payload_types,
+            maxsize=max_slots,
+            overflow_policy=OverflowPolicy.CONFLATE,
+        )
+        self._started = False
+
+    @property
+    def manager(self) -> MarketDataStreamManager:
+        return self._multiplexer.manager
+
+    @property
+    def conflated(self) -> int:
+        """Сколько сообщений заменено более свежими."""
+        return self._consumer.dropped
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._multiplexer.stop(timeout)
+
+    def __iter__(self) -> "ConflatingMarketDataStream":
+        if not self._started:
+            self._started = True
+            self._multiplexer.start()
+        return self
+
+    def __next__(self) -> MarketDataResponse:
+        return self._consumer.get()
+
+
+class AsyncConflatingMarketDataStream:
+    """Асинхронный вариант ConflatingMarketDataStream."""
+
+    def __init__(
+        self,
+        market_data_stream: AsyncMarketDataStreamManager,
+        payload_types: Optional[Collection[str]] = None,
+        max_slots: int = DEFAULT_MAX_SLOTS,
+    ):
+        self._multiplexer = AsyncMarketDataMultiplexer(market_data_stream)
+        self._consumer = self._multiplexer.add_consumer(
+            payload_types=payload_types,
+            maxsize=max_slots,
+            overflow_policy=OverflowPolicy.CONFLATE,
+        )
+        self._started = False
+
+    @property
+    def manager(self) -> AsyncMarketDataStreamManager:
+        return self._multiplexer.manager
+
+    @property
+    def conflated(self) -> int:
+        return self._consumer.dropped
+
+    async def stop(self) -> None:
+        await self._multiplexer.stop()
+
+    def __aiter__(self) -> "AsyncConflatingMarketDataStream":
+        if not self._started:
+            self._started = True
+            self._multiplexer.start()
+        return self
+
+    async def __anext__(self) -> MarketDataResponse:
+        return await self._consumer.get()
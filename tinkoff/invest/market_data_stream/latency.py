@@ -0,0 +1,176 @@
+import bisect
+import contextlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+__all__ = (
+    "LatencyHistogram",
+    "LatencySnapshot",
+    "PayloadLatency",
+    "StreamLatencyStats",
+)
+
+_NANOSECONDS = 1_000_000_000
+# границы корзин в секундах: от 10 мкс до ~168 с с шагом x2
+DEFAULT_BUCKET_BOUNDS: Tuple[float, ...] = tuple(0.00001 * 2**i for i in range(25))
+
+
+@dataclass(frozen=True)
+class LatencySnapshot:
+    count: int
+    mean: float
+    min: float
+    max: float
+    p50: float
+    p90: float
+    p99: float
+
+
+class LatencyHistogram:
+    """Гистограмма задержек в секундах с экспоненциальными корзинами."""
+
+    def __init__(self, bucket_bounds: Sequence[float] = DEFAULT_BUCKET_BOUNDS):
+        self._bounds = tuple(bucket_bounds)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts: List[int] = [0] * (len(self._bounds) + 1)
+            self._count = 0
+            self._sum = 0.0
+            self._min = float("inf")
+            self._max = float("-inf")
+
+    def record(self, seconds: float) -> None:
+        bucket = bisect.bisect_left(self._bounds, seconds)
+        with self._lock:
+            self._counts[bucket] += 1
+            self._count += 1
+            self._sum += seconds
+            self._min = min(self._min, seconds)
+            self._max = max(self._max, seconds)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def bucket_bounds(self) -> Tuple[float, ...]:
+        return self._bounds
+
+    @property
+    def bucket_counts(self) -> List[int]:
+        """Количество значений в корзинах, последняя — выше всех границ."""
+        with self._lock:
+            return list(self._counts)
+
+    def percentile(self, q: float) -> float:
+        """Верхняя граница корзины, в которую попадает q-й перцентиль."""
+        with self._lock:
+            return self._percentile(q)
+
+    def _percentile(self, q: float) -> float:
+        if self._count == 0:
+            return 0.0
+        rank = q / 100 * self._count
+        seen = 0
+        for bucket, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank and count:
+                if bucket == len(self._bounds):
+                    return self._max
+                return min(self._bounds[bucket], self._max)
+        return self._max
+
+    def snapshot(self) -> LatencySnapshot:
+        with self._lock:
+            if self._count == 0:
+                return LatencySnapshot(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+            return LatencySnapshot(
+                count=self._count,
+                mean=self._sum / self._count,
+                min=self._min,
+                max=self._max,
+                p50=self._percentile(50),
+                p90=self._percentile(90),
+                p99=self._percentile(99),
+            )
+
+
+@dataclass(frozen=True)
+class PayloadLatency:
+    # время сервера -> получение сообщения клиентом
+    server_to_receive: LatencyHistogram
+    # получение -> выдача сконвертированного сообщения потребителю
+    receive_to_yield: LatencyHistogram
+
+
+def _get_server_time_ns(payload: Any) -> Optional[int]:
+    if "time" not in payload.DESCRIPTOR.fields_by_name or not payload.HasField("time"):
+        return None
+    return payload.time.ToNanoseconds()
+
+
+class StreamLatencyStats:
+    """Задержки сообщений стрима по типам payload.
+
+    stats = StreamLatencyStats()
+    stream = client.create_market_data_stream(latency_stats=stats)
+    ...
+    stats.get("candle").server_to_receive.snapshot()
+    """
+
+    def __init__(self, bucket_bounds: Sequence[float] = DEFAULT_BUCKET_BOUNDS):
+        self._bucket_bounds = tuple(bucket_bounds)
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, PayloadLatency] = {}
+
+    def get(self, payload_type: str) -> PayloadLatency:
+        latency = self._latencies.get(payload_type)
+        if latency is None:
+            with self._lock:
+                latency = self._latencies.setdefault(
+                    payload_type,
+                    PayloadLatency(
+                        server_to_receive=LatencyHistogram(self._bucket_bounds),
+                        receive_to_yield=LatencyHistogram(self._bucket_bounds),
+                    ),
+                )
+        return latency
+
+    @property
+    def payload_types(self) -> List[str]:
+        return list(self._latencies)
+
+    def snapshot(self) -> Dict[str, Dict[str, LatencySnapshot]]:
+        return {
+            payload_type: {
+                "server_to_receive": latency.server_to_receive.snapshot(),
+                "receive_to_yield": latency.receive_to_yield.snapshot(),
+            }
+            for payload_type, latency in list(self._latencies.items())
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latencies.clear()
+
+    @contextlib.contextmanager
+    def measure(self, response: Any) -> Iterator[None]:
+        """Замерить обработку сырого protobuf-сообщения MarketDataResponse."""
+        received_at_ns = time.time_ns()
+        started = time.perf_counter()
+        payload_type = response.WhichOneof("payload")
+        yield
+        if payload_type is None:
+            return
+        latency = self.get(payload_type)
+        latency.receive_to_yield.record(time.perf_counter() - started)
+        server_time_ns = _get_server_time_ns(getattr(response, payload_type))
+        if server_time_ns is not None:
+            latency.server_to_receive.record(
+                (received_at_ns - server_time_ns) / _NANOSECONDS
+            )
@@ -1,10 +1,22 @@
-import queue
+import logging
 import threading
-from typing import Iterable, Iterator
+from typing import Iterable, Iterator, Optional
 
+from tinkoff.invest.exceptions import RequestError
+from tinkoff.invest.market_data_stream.latency import StreamLatencyStats
 from tinkoff.invest.market_data_stream.market_data_stream_interface import (
     IMarketDataStreamManager,
 )
+from tinkoff.invest.market_data_stream.payload import (
+    RawPayloadFilter,
+    get_stream_options,
+)
+from tinkoff.invest.market_data_stream.reconnect import (
+    GapCallback,
+    ReconnectSettings,
+    StreamGap,
+)
+from tinkoff.invest.market_data_stream.request_queue import RequestQueue
 from tinkoff.invest.market_data_stream.stream_managers import (
     CandlesStreamManager,
     InfoStreamManager,
@@ -12,7 +24,14 @@ from tinkoff.invest.market_data_stream.stream_managers import (
     OrderBookStreamManager,
     TradesStreamManager,
 )
+from tinkoff.invest.market_data_stream.subscriptions import (
+    MAX_INSTRUMENTS_PER_REQUEST,
+    SubscriptionState,
+)
 from tinkoff.invest.schemas import MarketDataRequest, MarketDataResponse
+from tinkoff.invest.utils import now
+
+logger = logging.getLogger(__name__)
 
 
 class MarketDataStreamManager(IMarketDataStreamManager):
@@ -21,20 +40,43 @@ class MarketDataStreamManager(IMarketDataStreamManager):
         market_data_stream_service: (  # type: ignore
             "MarketDataStreamService"  # noqa: F821
         ),
+        reconnect_settings: Optional[ReconnectSettings] = None,
+        on_gap: Optional[GapCallback] = None,
+        payload_filter: Optional[RawPayloadFilter] = None,
+        latency_stats: Optional[StreamLatencyStats] = None,
+        max_instruments_per_request: Optional[int] = None,
     ):
         self._market_data_stream_service = market_data_stream_service
+        self._max_instruments = max_instruments_per_request
         self._market_data_stream: Iterator[MarketDataResponse]
-        self._requests: queue.Queue[MarketDataRequest] = queue.Queue()
-        self._unsubscribe_event = threading.Event()
+        self._requests = RequestQueue()
+        self._reconnect_settings = reconnect_settings
+        self._on_gap = on_gap
+        self._stream_options = get_stream_options(payload_filter, latency_stats)
+        self.latency_stats = latency_stats
+        self._subscriptions = SubscriptionState()
+        self._stop_event = threading.Event()
+        # номер стрима, открытого через reconnect()
+        self._generation = 0
+        self.last_gap: Optional[StreamGap] = None
+
+    def _open_stream(self) -> Iterator[MarketDataResponse]:
+        return iter(
+            self._market_data_stream_service.market_data_stream(
+                self._get_request_generator(), **self._stream_options
+            )
+        )
 
     def _get_request_generator(self) -> Iterable[MarketDataRequest]:
-        while not self._unsubscribe_event.is_set() or not self._requests.empty():
-            try:
-                request = self._requests.get(timeout=1.0)
-            except queue.Empty:
-                pass
-            else:
-                yield request
+        return self._requests.iterate(self._max_instruments_per_request)
+
+    @property
+    def _max_instruments_per_request(self) -> int:
+        if self._max_instruments is not None:
+            return self._max_instruments
+        if self._reconnect_settings is None:
+            return MAX_INSTRUMENTS_PER_REQUEST
+        return self._reconnect_settings.max_instruments_per_request
 
     @property
     def candles(self) -> "CandlesStreamManager[MarketDataStreamManager]":
@@ -56,23 +98,123 @@ class MarketDataStreamManager(IMarketDataStreamManager):
     def last_price(self) -> "LastPriceStreamManager[MarketDataStreamManager]":
         return LastPriceStreamManager[MarketDataStreamManager](parent_manager=self)
 
+    @property
+    def subscriptions(self) -> SubscriptionState:
+        return self._subscriptions
+
     def subscribe(self, market_data_request: MarketDataRequest) -> None:
+        self._subscriptions.apply(market_data_request)
         self._requests.put(market_data_request)
 
     def unsubscribe(self, market_data_request: MarketDataRequest) -> None:
+        self._subscriptions.apply(market_data_request)
         self._requests.put(market_data_request)
 
     def stop(self) -> None:
-        self._unsubscribe_event.set()
+        self._stop_event.set()
+        self._requests.close()
 
     def __iter__(self) -> "MarketDataStreamManager":
-        self._unsubscribe_event.clear()
-        self._market_data_stream = iter(
-            self._market_data_stream_service.market_data_stream(
-                self._get_request_generator()
-            )
-        )
+        self._stop_event.clear()
+        self._requests.open()
+        self._market_data_stream = self._open_stream()
         return self
 
+    def reconnect(self) -> Iterator[MarketDataResponse]:
+        """Переоткрыть стрим с восстановлением подписок, например при зависании.
+
+        Возвращает итератор по новому стриму, который завершается при
+        следующем вызове reconnect().
+        """
+        logger.info("Reopening market data stream")
+        self._stop_event.clear()
+        # номер меняется до замены стрима, чтобы старые итераторы не читали новый
+        self._generation += 1
+        self._reopen_stream(self._max_instruments_per_request)
+        return self._iterate_stream(self._generation, self._market_data_stream)
+
+    def _iterate_stream(
+        self, generation: int, market_data_stream: Iterator[MarketDataResponse]
+    ) -> Iterator[MarketDataResponse]:
+        while generation == self._generation:
+            try:
+                market_data = self._next(market_data_stream)
+            except StopIteration:
+                return
+            if generation != self._generation:
+                return
+            # после автоматического переподключения стрим заменён
+            market_data_stream = self._market_data_stream
+            yield market_data
+
     def __next__(self) -> MarketDataResponse:
-        return next(self._market_data_stream)
+        return self._next(self._market_data_stream)
+
+    def _next(
+        self, market_data_stream: Iterator[MarketDataResponse]
+    ) -> MarketDataResponse:
+        try:
+            return next(market_data_stream)
+        except RequestError as e:
+            if (
+                market_data_stream is not self._market_data_stream
+                or not self._is_reconnectable(e)
+            ):
+                raise
+            return self._reconnect(e)
+
+    def _is_reconnectable(self, error: RequestError) -> bool:
+        return (
+            self._reconnect_settings is not None
+            and not self._stop_event.is_set()
+            and error.code in self._reconnect_settings.retryable_status_codes
+        )
+
+    def _reconnect(self, error: RequestError) -> MarketDataResponse:
+        settings = self._reconnect_settings
+        assert settings is not None  # noqa:S101 # nosec
+        disconnected_at = now()
+        logger.warning("Market data stream failed, reconnecting: %s", error.details)
+        attempts = 0
+        for delay in settings.get_backoff_delays():
+            if self._stop_event.wait(delay):
+                raise StopIteration
+            attempts += 1
+            self._reopen_stream(settings.max_instruments_per_request)
+            try:
+                market_data = next(self._market_data_stream)
+            except RequestError as e:
+                if not self._is_reconnectable(e):
+                    raise
+                logger.debug("Reconnect attempt %s failed: %s", attempts, e.details)
+                error = e
+                continue
+            self._report_gap(
+                StreamGap(
+                    disconnected_at=disconnected_at,
+                    reconnected_at=now(),
+                    reconnect_attempts=attempts,
+                    error=error,
+                )
+            )
+            return market_data
+        logger.error("Market data stream reconnect attempts exhausted")
+        raise error
+
+    def _reopen_stream(self, max_instruments_per_request: int) -> None:
+        self._requests.close()
+        self._requests = RequestQueue()
+        for request in self._subscriptions.get_replay_requests(
+            max_instruments_per_request
+        ):
+            self._requests.put(request)
+        self._market_data_stream = self._open_stream()
+
+    def _report_gap(self, gap: StreamGap) -> None:
+        logger.info(
+            "Market data stream reconnected after %s attempts",
+            gap.reconnect_attempts,
+        )
+        self.last_gap = gap
+        if self._on_gap is not None:
+            self._on_gap(gap)
@@ -0,0 +1,266 @@
+import collections
+import enum
+import logging
+import threading
+from typing import (
+    Any,
+    Collection,
+    Deque,
+    FrozenSet,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from tinkoff.invest.market_data_stream.market_data_stream_manager import (
+    MarketDataStreamManager,
+)
+from tinkoff.invest.market_data_stream.payload import (
+    get_payload,
+    get_payload_instrument_id,
+)
+from tinkoff.invest.schemas import MarketDataResponse
+
+__all__ = (
+    "OverflowPolicy",
+    "MarketDataConsumer",
+    "MarketDataMultiplexer",
+)
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(enum.Enum):
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    CONFLATE = "conflate"
+
+
+class ConsumerBuffer:
+    """Ограниченная очередь подписчика без синхронизации.
+
+    При CONFLATE хранится только последнее сообщение для каждой пары
+    (тип payload, инструмент), а сообщение сохраняет место в очереди.
+    """
+
+    def __init__(self, maxsize: int, overflow_policy: OverflowPolicy):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.overflow_policy = overflow_policy
+        self.dropped = 0
+        self._items: Deque[MarketDataResponse] = collections.deque()
+        self._conflated: "collections.OrderedDict[Hashable, MarketDataResponse]" = (
+            collections.OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._items) + len(self._conflated)
+
+    def is_full(self) -> bool:
+        return len(self) >= self.maxsize
+
+    def put(self, key: Hashable, market_data: MarketDataResponse) -> bool:
+        """Добавить сообщение. False, если очередь полна и политика BLOCK."""
+        if self.overflow_policy == OverflowPolicy.CONFLATE:
+            if key in self._conflated:
+                self._conflated[key] = market_data
+                self.dropped += 1
+                return True
+            if self.is_full():
+                self._conflated.popitem(last=False)
+                self.dropped += 1
+            self._conflated[key] = market_data
+            return True
+        if self.is_full():
+            if self.overflow_policy == OverflowPolicy.BLOCK:
+                return False
+            self._items.popleft()
+            self.dropped += 1
+        self._items.append(market_data)
+        return True
+
+    def get(self) -> MarketDataResponse:
+        if self._conflated:
+            _, market_data = self._conflated.popitem(last=False)
+            return market_data
+        return self._items.popleft()
+
+
+class ConsumerFilter:
+    def __init__(
+        self,
+        payload_types: Optional[Collection[str]],
+        instrument_ids: Optional[Collection[str]],
+    ):
+        self.payload_types: Optional[FrozenSet[str]] = (
+            None if payload_types is None else frozenset(payload_types)
+        )
+        self.instrument_ids: Optional[FrozenSet[str]] = (
+            None if instrument_ids is None else frozenset(instrument_ids)
+        )
+
+    def matches(self, payload_type: str, payload: Any) -> bool:
+        if self.payload_types is not None and payload_type not in self.payload_types:
+            return False
+        if self.instrument_ids is None:
+            return True
+        return (
+            getattr(payload, "instrument_uid", None) in self.instrument_ids
+            or getattr(payload, "figi", None) in self.instrument_ids
+        )
+
+
+class MarketDataConsumer:
+    """Подписчик мультиплексора. Итерируется по предназначенным ему сообщениям."""
+
+    def __init__(
+        self,
+        consumer_filter: ConsumerFilter,
+        maxsize: int,
+        overflow_policy: OverflowPolicy,
+    ):
+        self.filter = consumer_filter
+        self._buffer = ConsumerBuffer(maxsize, overflow_policy)
+        self._condition = threading.Condition()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+
+    @property
+    def dropped(self) -> int:
+        return self._buffer.dropped
+
+    def put(self, key: Hashable, market_data: MarketDataResponse) -> None:
+        with self._condition:
+            while not self._closed and not self._buffer.put(key, market_data):
+                self._condition.wait()
+            self._condition.notify_all()
+
+    def get(self, timeout: Optional[float] = None) -> MarketDataResponse:
+        """Следующее сообщение. StopIteration, если подписчик закрыт."""
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: len(self._buffer) > 0 or self._closed, timeout=timeout
+            ):
+                raise TimeoutError
+            if len(self._buffer) == 0:
+                if self._error is not None:
+                    raise self._error
+                raise StopIteration
+            market_data = self._buffer.get()
+            self._condition.notify_all()
+            return market_data
+
+    def close(self, error: Optional[BaseException] = None) -> None:
+        with self._condition:
+            self._closed = True
+            self._error = error
+            self._condition.notify_all()
+
+    def __iter__(self) -> Iterator[MarketDataResponse]:
+        return self
+
+    def __next__(self) -> MarketDataResponse:
+        return self.get()
+
+
+class ConsumerRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._consumers: List[Any] = []
+
+    def add(self, consumer: Any) -> None:
+        with self._lock:
+            self._consumers = [*self._consumers, consumer]
+
+    def remove(self, consumer: Any) -> None:
+        with self._lock:
+            self._consumers = [c for c in self._consumers if c is not consumer]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._consumers)
+
+    def route(
+        self, market_data: MarketDataResponse
+    ) -> Tuple[Optional[Tuple[str, str]], List[Any]]:
+        payload_type, payload = get_payload(market_data)
+        if payload_type is None:
+            return None, []
+        key = (payload_type, get_payload_instrument_id(payload))
+        return key, [
+            consumer
+            for consumer in self._consumers
+            if consumer.filter.matches(payload_type, payload)
+        ]
+
+
+class MarketDataMultiplexer:
+    """Раздаёт сообщения одного стрима нескольким подписчикам.
+
+    Подписки на данные оформляются через manager, а подписчики получают
+    сообщения по типу payload и инструменту в свои ограниченные очереди:
+
+        multiplexer = MarketDataMultiplexer(client.create_market_data_stream())
+        multiplexer.manager.candles.subscribe([...])
+        consumer = multiplexer.add_consumer(payload_types=["candle"])
+        multiplexer.start()
+        for marketdata in consumer:
+            ...
+    """
+
+    def __init__(self, market_data_stream: MarketDataStreamManager):
+        self._manager = market_data_stream
+        self._consumers = ConsumerRegistry()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def manager(self) -> MarketDataStreamManager:
+        return self._manager
+
+    def add_consumer(
+        self,
+        *,
+        payload_types: Optional[Collection[str]] = None,
+        instrument_ids: Optional[Collection[str]] = None,
+        maxsize: int = 1000,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+    ) -> MarketDataConsumer:
+        consumer = MarketDataConsumer(
+            ConsumerFilter(payload_types, instrument_ids), maxsize, overflow_policy
+        )
+        self._consumers.add(consumer)
+        return consumer
+
+    def remove_consumer(self, consumer: MarketDataConsumer) -> None:
+        self._consumers.remove(consumer)
+        consumer.close()
+
+    def dispatch(self, market_data: MarketDataResponse) -> None:
+        key, consumers = self._consumers.route(market_data)
+        for consumer in consumers:
+            consumer.put(key, market_data)
+
+    def run(self) -> None:
+        error: Optional[BaseException] = None
+        try:
+            for market_data in self._manager:
+                self.dispatch(market_data)
+        except Exception as e:  # pylint:disable=broad-except
+            logger.exception("Market data stream failed")
+            error = e
+        finally:
+            for consumer in self._consumers:
+                consumer.close(error)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self.run, name="MarketDataMultiplexer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._manager.stop()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,329 @@
+import enum
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tinkoff.invest.market_data_stream.payload import get_payload
+from tinkoff.invest.schemas import MarketDataResponse, Order, OrderBook, Quotation
+from tinkoff.invest.utils import (
+    datetime_to_microseconds,
+    microseconds_to_datetime,
+    nano_to_decimal,
+    nano_to_quotation,
+    quotation_to_nano,
+)
+
+__all__ = (
+    "OrderBookEngine",
+    "OrderBookSide",
+    "TopOfBook",
+)
+
+logger = logging.getLogger(__name__)
+
+
+class OrderBookSide(enum.Enum):
+    BID = "bid"
+    ASK = "ask"
+
+
+@dataclass(frozen=True)
+class TopOfBook:
+    bid_price: Optional[Quotation]
+    bid_quantity: int
+    ask_price: Optional[Quotation]
+    ask_quantity: int
+    time: datetime
+    is_consistent: bool
+
+
+def _get_instrument_ids(order_book: OrderBook) -> Tuple[str, ...]:
+    """instrument_uid и figi стакана; основным идентификатором считается uid."""
+    instrument_ids = tuple(
+        instrument_id
+        for instrument_id in (order_book.instrument_uid, order_book.figi)
+        if instrument_id
+    )
+    return instrument_ids or ("",)
+
+
+class OrderBookEngine:
+    """Локальные стаканы, которые поддерживаются из сообщений OrderBook стрима.
+
+    Уровни всех стаканов хранятся в заранее выделенных массивах numpy
+    (цены в нано-единицах), поэтому лучшие цены доступны за O(1), а запросы по
+    глубине и VWAP считаются векторно. Если is_consistent=False, по умолчанию
+    уровни не обновляются, а стакан помечается несогласованным до следующего
+    согласованного сообщения. Стакан доступен и по instrument_uid, и по figi.
+
+        engine = OrderBookEngine(max_depth=50)
+        for marketdata in market_data_stream:
+            engine.update_from_market_data(marketdata)
+        engine.spread(instrument_uid)
+    """
+
+    def __init__(
+        self,
+        max_depth: int = 50,
+        capacity: int = 1024,
+        skip_inconsistent: bool = True,
+    ):
+        self._max_depth = max_depth
+        self._skip_inconsistent = skip_inconsistent
+        self._lock = threading.RLock()
+        # строка стакана по instrument_uid и по figi
+        self._row_by_instrument: Dict[str, int] = {}
+        self._ids_by_row: List[Tuple[str, ...]] = []
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        shape = (capacity, self._max_depth)
+        self._prices = {side: np.zeros(shape, dtype=np.int64) for side in OrderBookSide}
+        self._quantities = {
+            side: np.zeros(shape, dtype=np.int64) for side in OrderBookSide
+        }
+        self._depths = {
+            side: np.zeros(capacity, dtype=np.int32) for side in OrderBookSide
+        }
+        self._times = np.zeros(capacity, dtype=np.int64)
+        self._is_consistent = np.zeros(capacity, dtype=bool)
+
+    def _grow(self) -> None:
+        capacity = len(self._times)
+        logger.debug("Growing order book engine capacity to %s", capacity * 2)
+        prices, quantities, depths = self._prices, self._quantities, self._depths
+        times, is_consistent = self._times, self._is_consistent
+        self._allocate(capacity * 2)
+        for side in OrderBookSide:
+            self._prices[side][:capacity] = prices[side]
+            self._quantities[side][:capacity] = quantities[side]
+            self._depths[side][:capacity] = depths[side]
+        self._times[:capacity] = times
+        self._is_consistent[:capacity] = is_consistent
+
+    def _get_or_create_row(self, instrument_ids: Tuple[str, ...]) -> int:
+        for instrument_id in instrument_ids:
+            row = self._row_by_instrument.get(instrument_id)
+            if row is not None:
+                break
+        else:
+            row = len(self._ids_by_row)
+            if row == len(self._times):
+                self._grow()
+            self._ids_by_row.append(())
+        known_ids = self._ids_by_row[row]
+        new_ids = tuple(i for i in instrument_ids if i not in known_ids)
+        if new_ids:
+            self._ids_by_row[row] = known_ids + new_ids
+            for instrument_id in new_ids:
+                self._row_by_instrument[instrument_id] = row
+        return row
+
+    def _get_row(self, instrument_id: str) -> int:
+        return self._row_by_instrument[instrument_id]
+
+    @property
+    def instruments(self) -> Tuple[str, ...]:
+        """Основные идентификаторы стаканов в порядке строк."""
+        return tuple(instrument_ids[0] for instrument_ids in self._ids_by_row)
+
+    def __len__(self) -> int:
+        return len(self._ids_by_row)
+
+    def __contains__(self, instrument_id: str) -> bool:
+        return instrument_id in self._row_by_instrument
+
+    def update_from_market_data(self, market_data: MarketDataResponse) -> bool:
+        payload_type, order_book = get_payload(market_data)
+        if payload_type != "orderbook":
+            return False
+        return self.update(order_book)
+
+    def update(self, order_book: OrderBook) -> bool:
+        """Применить снимок стакана. Возвращает True, если уровни обновлены."""
+        instrument_ids = _get_instrument_ids(order_book)
+        instrument_id = instrument_ids[0]
+        with self._lock:
+            row = self._get_or_create_row(instrument_ids)
+            self._is_consistent[row] = order_book.is_consistent
+            if not order_book.is_consistent and self._skip_inconsistent:
+                logger.debug("Inconsistent order book for %s skipped", instrument_id)
+                return False
+            self._set_levels(row, OrderBookSide.BID, order_book.bids)
+            self._set_levels(row, OrderBookSide.ASK, order_book.asks)
+            self._times[row] = datetime_to_microseconds(order_book.time)
+            return True
+
+    def _set_levels(self, row: int, side: OrderBookSide, orders: Sequence[Order]):
+        depth = min(len(orders), self._max_depth)
+        self._prices[side][row, :depth] = [
+            quotation_to_nano(order.price) for order in orders[:depth]
+        ]
+        self._quantities[side][row, :depth] = [
+            order.quantity for order in orders[:depth]
+        ]
+        self._quantities[side][row, depth:] = 0
+        self._depths[side][row] = depth
+
+    def remove(self, instrument_id: str) -> None:
+        with self._lock:
+            row = self._row_by_instrument[instrument_id]
+            for removed_id in self._ids_by_row[row]:
+                del self._row_by_instrument[removed_id]
+            last_row = len(self._ids_by_row) - 1
+            last_ids = self._ids_by_row.pop()
+            if row != last_row:
+                self._copy_row(last_row, row)
+                for moved_id in last_ids:
+                    self._row_by_instrument[moved_id] = row
+                self._ids_by_row[row] = last_ids
+            self._clear_row(last_row)
+
+    def _copy_row(self, from_row: int, to_row: int) -> None:
+        for side in OrderBookSide:
+            self._prices[side][to_row] = self._prices[side][from_row]
+            self._quantities[side][to_row] = self._quantities[side][from_row]
+            self._depths[side][to_row] = self._depths[side][from_row]
+        self._times[to_row] = self._times[from_row]
+        self._is_consistent[to_row] = self._is_consistent[from_row]
+
+    def _clear_row(self, row: int) -> None:
+        for side in OrderBookSide:
+            self._quantities[side][row] = 0
+            self._depths[side][row] = 0
+        self._times[row] = 0
+        self._is_consistent[row] = False
+
+    def is_consistent(self, instrument_id: str) -> bool:
+        with self._lock:
+            return bool(self._is_consistent[self._get_row(instrument_id)])
+
+    def get_time(self, instrument_id: str) -> datetime:
+        with self._lock:
+            return microseconds_to_datetime(self._times[self._get_row(instrument_id)])
+
+    def _best(self, row: int, side: OrderBookSide) -> Optional[int]:
+        if self._depths[side][row] == 0:
+            return None
+        return int(self._prices[side][row, 0])
+
+    def best_bid(self, instrument_id: str) -> Optional[Quotation]:
+        with self._lock:
+            price = self._best(self._get_row(instrument_id), OrderBookSide.BID)
+        return None if price is None else nano_to_quotation(price)
+
+    def best_ask(self, instrument_id: str) -> Optional[Quotation]:
+        with self._lock:
+            price = self._best(self._get_row(instrument_id), OrderBookSide.ASK)
+        return None if price is None else nano_to_quotation(price)
+
+    def top_of_book(self, instrument_id: str) -> TopOfBook:
+        with self._lock:
+            row = self._get_row(instrument_id)
+            bid = self._best(row, OrderBookSide.BID)
+            ask = self._best(row, OrderBookSide.ASK)
+            return TopOfBook(
+                bid_price=None if bid is None else nano_to_quotation(bid),
+                bid_quantity=int(self._quantities[OrderBookSide.BID][row, 0]),
+                ask_price=None if ask is None else nano_to_quotation(ask),
+                ask_quantity=int(self._quantities[OrderBookSide.ASK][row, 0]),
+                time=self.get_time(instrument_id),
+                is_consistent=bool(self._is_consistent[row]),
+            )
+
+    def spread(self, instrument_id: str) -> Optional[Decimal]:
+        with self._lock:
+            row = self._get_row(instrument_id)
+            bid = self._best(row, OrderBookSide.BID)
+            ask = self._best(row, OrderBookSide.ASK)
+        if bid is None or ask is None:
+            return None
+        return nano_to_decimal(ask - bid)
+
+    def mid_price(self, instrument_id: str) -> Optional[Decimal]:
+        with self._lock:
+            row = self._get_row(instrument_id)
+            bid = self._best(row, OrderBookSide.BID)
+            ask = self._best(row, OrderBookSide.ASK)
+        if bid is None or ask is None:
+            return None
+        return nano_to_decimal(bid + ask) / 2
+
+    def levels(
+        self, instrument_id: str, side: OrderBookSide
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Копии цен (в нано-единицах) и количеств уровней стороны стакана."""
+        with self._lock:
+            row = self._get_row(instrument_id)
+            depth = self._depths[side][row]
+            return (
+                self._prices[side][row, :depth].copy(),
+                self._quantities[side][row, :depth].copy(),
+            )
+
+    def depth_at_price(
+        self, instrument_id: str, side: OrderBookSide, price: Quotation
+    ) -> int:
+        prices, quantities = self.levels(instrument_id, side)
+        return int(quantities[prices == quotation_to_nano(price)].sum())
+
+    def depth_up_to_price(
+        self, instrument_id: str, side: OrderBookSide, price: Quotation
+    ) -> int:
+        """Суммарное количество на уровнях не хуже указанной цены."""
+        prices, quantities = self.levels(instrument_id, side)
+        if side == OrderBookSide.BID:
+            mask = prices >= quotation_to_nano(price)
+        else:
+            mask = prices <= quotation_to_nano(price)
+        return int(quantities[mask].sum())
+
+    def vwap(
+        self, instrument_id: str, side: OrderBookSide, quantity: int
+    ) -> Optional[Decimal]:
+        """Средняя цена исполнения quantity лотов по уровням стороны стакана.
+
+        Возвращает None, если в стакане не хватает объёма.
+        """
+        if quantity <= 0:
+            raise ValueError("Quantity must be positive")
+        prices, quantities = self.levels(instrument_id, side)
+        filled_before = np.cumsum(quantities) - quantities
+        fills = np.clip(quantity - filled_before, 0, quantities)
+        if fills.sum() < quantity:
+            return None
+        # в int64 произведение цены в нано-единицах на объём переполняется
+        notional = sum(
+            price * fill for price, fill in zip(prices.tolist(), fills.tolist())
+        )
+        return nano_to_decimal(notional) / quantity
+
+    def best_prices(self, side: OrderBookSide) -> Dict[str, Optional[Quotation]]:
+        with self._lock:
+            count = len(self._ids_by_row)
+            has_levels = self._depths[side][:count] > 0
+            prices = self._prices[side][:count, 0].tolist()
+            return {
+                instrument_ids[0]: (
+                    nano_to_quotation(prices[row]) if has_levels[row] else None
+                )
+                for row, instrument_ids in enumerate(self._ids_by_row)
+            }
+
+    def spreads(self) -> Tuple[List[str], np.ndarray]:
+        """Спреды всех стаканов в нано-единицах, nan для стаканов без уровней."""
+        with self._lock:
+            count = len(self._ids_by_row)
+            bids = self._prices[OrderBookSide.BID][:count, 0]
+            asks = self._prices[OrderBookSide.ASK][:count, 0]
+            has_levels = (self._depths[OrderBookSide.BID][:count] > 0) & (
+                self._depths[OrderBookSide.ASK][:count] > 0
+            )
+            spreads = np.full(count, np.nan)
+            spreads[has_levels] = asks[has_levels] - bids[has_levels]
+            return list(self.instruments), spreads
@@ -0,0 +1,79 @@
+import dataclasses
+from typing import Any, Callable, Collection, Dict, FrozenSet, Optional, Tuple
+
+from tinkoff.invest._grpc_helpers import PLACEHOLDER
+from tinkoff.invest.market_data_stream.latency import StreamLatencyStats
+from tinkoff.invest.schemas import MarketDataResponse
+
+PAYLOAD_FIELDS: Tuple[str, ...] = tuple(
+    field.name
+    for field in dataclasses.fields(MarketDataResponse)
+    if field.metadata["proto"].group == "payload"
+)
+
+
+def get_payload(market_data: MarketDataResponse) -> Tuple[Optional[str], Any]:
+    """Имя заполненного поля payload и его значение."""
+    for field_name in PAYLOAD_FIELDS:
+        value = getattr(market_data, field_name)
+        if value is not None and value is not PLACEHOLDER:
+            return field_name, value
+    return None, None
+
+
+def get_payload_instrument_id(payload: Any) -> str:
+    instrument_uid = getattr(payload, "instrument_uid", None)
+    if isinstance(instrument_uid, str) and instrument_uid:
+        return instrument_uid
+    figi = getattr(payload, "figi", None)
+    return figi if isinstance(figi, str) else ""
+
+
+# (тип payload, идентификатор инструмента) -> нужно ли конвертировать сообщение
+RawPayloadFilter = Callable[[Optional[str], str], bool]
+
+
+def get_raw_payload_key(response: Any) -> Tuple[Optional[str], str]:
+    """Тип payload и инструмент protobuf-сообщения без конвертации в dataclass."""
+    payload_type = response.WhichOneof("payload")
+    if payload_type is None:
+        return None, ""
+    return payload_type, get_payload_instrument_id(getattr(response, payload_type))
+
+
+class PayloadFilter:
+    """Фильтр сообщений стрима по типу payload и инструменту.
+
+    Сообщения без инструмента (ping, ответы на подписку) фильтруются только
+    по типу payload.
+    """
+
+    def __init__(
+        self,
+        payload_types: Optional[Collection[str]] = None,
+        instrument_ids: Optional[Collection[str]] = None,
+    ):
+        self.payload_types: Optional[FrozenSet[str]] = (
+            None if payload_types is None else frozenset(payload_types)
+        )
+        self.instrument_ids: Optional[FrozenSet[str]] = (
+            None if instrument_ids is None else frozenset(instrument_ids)
+        )
+
+    def __call__(self, payload_type: Optional[str], instrument_id: str) -> bool:
+        if self.payload_types is not None and payload_type not in self.payload_types:
+            return False
+        return (
+            self.instrument_ids is None
+            or not instrument_id
+            or instrument_id in self.instrument_ids
+        )
+
+
+def get_stream_options(
+    payload_filter: Optional[RawPayloadFilter],
+    latency_stats: Optional[StreamLatencyStats],
+) -> Dict[str, Any]:
+    """Необязательные аргументы market_data_stream, которые заданы явно."""
+    options = {"payload_filter": payload_filter, "latency_stats": latency_stats}
+    return {name: value for name, value in options.items() if value is not None}
@@ -0,0 +1,48 @@
+import dataclasses
+from datetime import datetime, timedelta
+from typing import Callable, Iterator, Optional, Sequence
+
+from grpc import StatusCode
+
+from tinkoff.invest.market_data_stream.subscriptions import MAX_INSTRUMENTS_PER_REQUEST
+
+RETRYABLE_STATUS_CODES = (
+    StatusCode.UNAVAILABLE,
+    StatusCode.INTERNAL,
+    StatusCode.UNKNOWN,
+    StatusCode.ABORTED,
+    StatusCode.DEADLINE_EXCEEDED,
+    StatusCode.RESOURCE_EXHAUSTED,
+)
+
+
+@dataclasses.dataclass()
+class ReconnectSettings:
+    max_attempts: Optional[int] = None
+    initial_backoff: timedelta = timedelta(seconds=1)
+    max_backoff: timedelta = timedelta(seconds=30)
+    backoff_multiplier: float = 2.0
+    retryable_status_codes: Sequence[StatusCode] = RETRYABLE_STATUS_CODES
+    max_instruments_per_request: int = MAX_INSTRUMENTS_PER_REQUEST
+
+    def get_backoff_delays(self) -> Iterator[float]:
+        delay = self.initial_backoff.total_seconds()
+        max_delay = self.max_backoff.total_seconds()
+        attempt = 0
+        while self.max_attempts is None or attempt < self.max_attempts:
+            attempt += 1
+            yield min(delay, max_delay)
+            delay *= self.backoff_multiplier
+
+
+@dataclasses.dataclass()
+class StreamGap:
+    """Период без данных между разрывом стрима и переподключением."""
+
+    disconnected_at: datetime
+    reconnected_at: datetime
+    reconnect_attempts: int
+    error: Exception
+
+
+GapCallback = Callable[[StreamGap], None]
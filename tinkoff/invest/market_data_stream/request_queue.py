@@ -0,0 +1,122 @@
+import asyncio
+import collections
+import threading
+from typing import AsyncIterator, Deque, Iterator, List, Optional
+
+from tinkoff.invest.market_data_stream.subscriptions import (
+    MAX_INSTRUMENTS_PER_REQUEST,
+    coalesce_requests,
+)
+from tinkoff.invest.schemas import MarketDataRequest
+
+__all__ = (
+    "RequestQueue",
+    "AsyncRequestQueue",
+)
+
+
+class RequestQueue:
+    """Очередь запросов стрима.
+
+    Генератор запросов просыпается сразу при put() и close(), а после close()
+    отдаёт оставшиеся запросы и завершается.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._requests: Deque[MarketDataRequest] = collections.deque()
+        self._closed = False
+
+    def put(self, request: MarketDataRequest) -> None:
+        with self._condition:
+            self._requests.append(request)
+            self._condition.notify_all()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def open(self) -> None:
+        with self._condition:
+            self._closed = False
+
+    def get_all(self) -> List[MarketDataRequest]:
+        """Дождаться запросов и забрать все. Пустой список, если очередь закрыта."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._requests or self._closed)
+            requests = list(self._requests)
+            self._requests.clear()
+            return requests
+
+    def iterate(
+        self, max_instruments_per_request: int = MAX_INSTRUMENTS_PER_REQUEST
+    ) -> Iterator[MarketDataRequest]:
+        while True:
+            requests = self.get_all()
+            if not requests:
+                return
+            yield from coalesce_requests(requests, max_instruments_per_request)
+
+
+def _get_running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class AsyncRequestQueue:
+    """Асинхронный вариант RequestQueue на примитивах asyncio.
+
+    get_all() вызывается из event loop, а put() и close() можно вызывать
+    и из других потоков: пробуждение передаётся в loop через
+    call_soon_threadsafe.
+    """
+
+    def __init__(self):
+        self._requests: Deque[MarketDataRequest] = collections.deque()
+        self._closed = False
+        # создаются в get_all, чтобы не привязываться к loop в конструкторе
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _notify(self) -> None:
+        if self._wakeup is None or self._loop is None:
+            return
+        if _get_running_loop() is self._loop:
+            self._wakeup.set()
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def put(self, request: MarketDataRequest) -> None:
+        self._requests.append(request)
+        self._notify()
+
+    def close(self) -> None:
+        self._closed = True
+        self._notify()
+
+    def open(self) -> None:
+        self._closed = False
+
+    async def get_all(self) -> List[MarketDataRequest]:
+        if self._wakeup is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+        while not self._requests and not self._closed:
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        requests = list(self._requests)
+        self._requests.clear()
+        return requests
+
+    async def iterate(
+        self, max_instruments_per_request: int = MAX_INSTRUMENTS_PER_REQUEST
+    ) -> AsyncIterator[MarketDataRequest]:
+        while True:
+            requests = await self.get_all()
+            if not requests:
+                return
+            for request in coalesce_requests(requests, max_instruments_per_request):
+                yield request
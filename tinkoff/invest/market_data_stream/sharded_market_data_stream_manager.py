@@ -0,0 +1,162 @@
+import logging
+import queue
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from tinkoff.invest.market_data_stream.market_data_stream_interface import (
+    IMarketDataStreamManager,
+)
+from tinkoff.invest.market_data_stream.market_data_stream_manager import (
+    MarketDataStreamManager,
+)
+from tinkoff.invest.market_data_stream.sharding import (
+    ShardAllocator,
+    ShardingSettings,
+    ShardRequests,
+)
+from tinkoff.invest.market_data_stream.stream_managers import (
+    CandlesStreamManager,
+    InfoStreamManager,
+    LastPriceStreamManager,
+    OrderBookStreamManager,
+    TradesStreamManager,
+)
+from tinkoff.invest.schemas import MarketDataRequest, MarketDataResponse
+
+if TYPE_CHECKING:
+    from tinkoff.invest.services import MarketDataStreamService
+
+logger = logging.getLogger(__name__)
+
+_STOPPED = object()
+
+
+class _ShardFailure:
+    def __init__(self, shard_id: int, error: Exception):
+        self.shard_id = shard_id
+        self.error = error
+
+
+class ShardedMarketDataStreamManager(IMarketDataStreamManager):
+    """Распределяет подписки по нескольким стримам market_data_stream.
+
+    Ответы всех стримов выдаются одним итератором в порядке получения.
+    """
+
+    def __init__(
+        self,
+        market_data_stream_service: "MarketDataStreamService",
+        settings: Optional[ShardingSettings] = None,
+    ):
+        self._market_data_stream_service = market_data_stream_service
+        self._settings = settings or ShardingSettings()
+        self._allocator = ShardAllocator(self._settings)
+        self._shards: Dict[int, MarketDataStreamManager] = {}
+        self._responses: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.RLock()
+        self._running = False
+
+    @property
+    def candles(self) -> "CandlesStreamManager[ShardedMarketDataStreamManager]":
+        return CandlesStreamManager[ShardedMarketDataStreamManager](parent_manager=self)
+
+    @property
+    def order_book(self) -> "OrderBookStreamManager[ShardedMarketDataStreamManager]":
+        return OrderBookStreamManager[ShardedMarketDataStreamManager](
+            parent_manager=self
+        )
+
+    @property
+    def trades(self) -> "TradesStreamManager[ShardedMarketDataStreamManager]":
+        return TradesStreamManager[ShardedMarketDataStreamManager](parent_manager=self)
+
+    @property
+    def info(self) -> "InfoStreamManager[ShardedMarketDataStreamManager]":
+        return InfoStreamManager[ShardedMarketDataStreamManager](parent_manager=self)
+
+    @property
+    def last_price(self) -> "LastPriceStreamManager[ShardedMarketDataStreamManager]":
+        return LastPriceStreamManager[ShardedMarketDataStreamManager](
+            parent_manager=self
+        )
+
+    def get_shard_loads(self) -> Dict[int, int]:
+        with self._lock:
+            return {
+                shard_id: self._allocator.get_load(shard_id)
+                for shard_id in self._allocator.shard_ids
+            }
+
+    def subscribe(self, market_data_request: MarketDataRequest) -> None:
+        with self._lock:
+            self._send(self._allocator.allocate(market_data_request))
+
+    def unsubscribe(self, market_data_request: MarketDataRequest) -> None:
+        with self._lock:
+            self._send(self._allocator.allocate(market_data_request))
+            self._send(self._allocator.rebalance())
+            self._close_empty_shards()
+
+    def _send(self, shard_requests: ShardRequests) -> None:
+        for shard_id, request in shard_requests:
+            self._get_shard(shard_id).subscribe(request)
+
+    def _get_shard(self, shard_id: int) -> MarketDataStreamManager:
+        shard = self._shards.get(shard_id)
+        if shard is None:
+            shard = MarketDataStreamManager(
+                self._market_data_stream_service,
+                reconnect_settings=self._settings.reconnect_settings,
+                max_instruments_per_request=(
+                    self._settings.max_instruments_per_request
+                ),
+            )
+            self._shards[shard_id] = shard
+            if self._running:
+                self._start_shard(shard_id, shard)
+        return shard
+
+    def _close_empty_shards(self) -> None:
+        for shard_id in self._allocator.pop_empty_shards():
+            logger.debug("Closing empty market data stream shard %s", shard_id)
+            shard = self._shards.pop(shard_id, None)
+            if shard is not None:
+                shard.stop()
+
+    def _start_shard(self, shard_id: int, shard: MarketDataStreamManager) -> None:
+        threading.Thread(
+            target=self._run_shard,
+            args=(shard_id, shard),
+            name=f"MarketDataStreamShard-{shard_id}",
+            daemon=True,
+        ).start()
+
+    def _run_shard(self, shard_id: int, shard: MarketDataStreamManager) -> None:
+        try:
+            for market_data in shard:
+                self._responses.put(market_data)
+        except Exception as e:  # pylint:disable=broad-except
+            logger.exception("Market data stream shard %s failed", shard_id)
+            self._responses.put(_ShardFailure(shard_id, e))
+
+    def stop(self) -> None:
+        with self._lock:
+            self._running = False
+            for shard in self._shards.values():
+                shard.stop()
+        self._responses.put(_STOPPED)
+
+    def __iter__(self) -> "ShardedMarketDataStreamManager":
+        with self._lock:
+            self._running = True
+            for shard_id, shard in self._shards.items():
+                self._start_shard(shard_id, shard)
+        return self
+
+    def __next__(self) -> MarketDataResponse:
+        item = self._responses.get()
+        if item is _STOPPED:
+            raise StopIteration
+        if isinstance(item, _ShardFailure):
+            raise item.error
+        return item
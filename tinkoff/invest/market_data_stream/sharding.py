@@ -0,0 +1,207 @@
+import dataclasses
+import itertools
+import logging
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from tinkoff.invest.exceptions import MarketDataStreamError
+from tinkoff.invest.market_data_stream.reconnect import ReconnectSettings
+from tinkoff.invest.market_data_stream.subscriptions import (
+    MAX_INSTRUMENTS_PER_REQUEST,
+    GroupKey,
+    chunked,
+    get_group_key,
+    get_instrument_key,
+    get_subscription_request,
+    make_request,
+)
+from tinkoff.invest.schemas import MarketDataRequest, SubscriptionAction
+
+logger = logging.getLogger(__name__)
+
+SubscriptionKey = Tuple[str, Hashable]
+ShardRequests = List[Tuple[int, MarketDataRequest]]
+
+
+@dataclasses.dataclass()
+class ShardingSettings:
+    max_subscriptions_per_stream: int = 300
+    max_streams: int = 16
+    max_instruments_per_request: int = MAX_INSTRUMENTS_PER_REQUEST
+    reconnect_settings: Optional[ReconnectSettings] = None
+
+
+@dataclasses.dataclass()
+class _Subscription:
+    group_key: GroupKey
+    request_type: type
+    instrument: Any
+
+
+class ShardAllocator:
+    """Распределяет подписки по стримам с учётом лимита подписок на стрим.
+
+    Новые инструменты попадают в наименее загруженный стрим, пустые стримы
+    закрываются, а rebalance() переносит подписки из наименее загруженного
+    стрима, если они помещаются в остальные.
+    """
+
+    def __init__(self, settings: ShardingSettings):
+        self._settings = settings
+        self._shard_ids = itertools.count()
+        self._subscriptions: Dict[int, Dict[SubscriptionKey, _Subscription]] = {}
+        self._shard_by_subscription: Dict[SubscriptionKey, int] = {}
+
+    @property
+    def shard_ids(self) -> List[int]:
+        return list(self._subscriptions)
+
+    def get_load(self, shard_id: int) -> int:
+        return len(self._subscriptions[shard_id])
+
+    def _free_capacity(self, shard_id: int) -> int:
+        return self._settings.max_subscriptions_per_stream - self.get_load(shard_id)
+
+    def _choose_shard(self) -> int:
+        candidates = [
+            shard_id
+            for shard_id in self._subscriptions
+            if self._free_capacity(shard_id) > 0
+        ]
+        if candidates:
+            return min(candidates, key=self.get_load)
+        if len(self._subscriptions) >= self._settings.max_streams:
+            raise MarketDataStreamError(
+                "Subscription limit reached: "
+                f"{self._settings.max_streams} streams with "
+                f"{self._settings.max_subscriptions_per_stream} subscriptions each"
+            )
+        shard_id = next(self._shard_ids)
+        self._subscriptions[shard_id] = {}
+        logger.debug("New market data stream shard %s", shard_id)
+        return shard_id
+
+    def allocate(self, market_data_request: MarketDataRequest) -> ShardRequests:
+        """Разбить запрос на запросы к отдельным стримам."""
+        field_name, request = get_subscription_request(market_data_request)
+        if field_name is None:
+            if not self._subscriptions:
+                self._subscriptions[next(self._shard_ids)] = {}
+            return [(shard_id, market_data_request) for shard_id in self._subscriptions]
+        if (
+            request.subscription_action
+            == SubscriptionAction.SUBSCRIPTION_ACTION_UNSUBSCRIBE
+        ):
+            return self._release(field_name, request)
+        return self._allocate(field_name, request)
+
+    def _allocate(self, field_name: str, request: Any) -> ShardRequests:
+        group_key = get_group_key(field_name, request)
+        instruments_by_shard: Dict[int, List[Any]] = {}
+        for instrument in request.instruments:
+            key = (field_name, get_instrument_key(instrument))
+            shard_id = self._shard_by_subscription.get(key)
+            if shard_id is None:
+                shard_id = self._choose_shard()
+                self._shard_by_subscription[key] = shard_id
+            self._subscriptions[shard_id][key] = _Subscription(
+                group_key, type(request), instrument
+            )
+            instruments_by_shard.setdefault(shard_id, []).append(instrument)
+        return self._make_requests(
+            group_key,
+            type(request),
+            SubscriptionAction.SUBSCRIPTION_ACTION_SUBSCRIBE,
+            instruments_by_shard,
+        )
+
+    def _release(self, field_name: str, request: Any) -> ShardRequests:
+        group_key = get_group_key(field_name, request)
+        instruments_by_shard: Dict[int, List[Any]] = {}
+        for instrument in request.instruments:
+            key = (field_name, get_instrument_key(instrument))
+            shard_id = self._shard_by_subscription.pop(key, None)
+            if shard_id is None:
+                continue
+            del self._subscriptions[shard_id][key]
+            instruments_by_shard.setdefault(shard_id, []).append(instrument)
+        return self._make_requests(
+            group_key,
+            type(request),
+            SubscriptionAction.SUBSCRIPTION_ACTION_UNSUBSCRIBE,
+            instruments_by_shard,
+        )
+
+    def _make_requests(
+        self,
+        group_key: GroupKey,
+        request_type: type,
+        subscription_action: SubscriptionAction,
+        instruments_by_shard: Dict[int, List[Any]],
+    ) -> ShardRequests:
+        return [
+            (
+                shard_id,
+                make_request(group_key, subscription_action, chunk, request_type),
+            )
+            for shard_id, instruments in instruments_by_shard.items()
+            for chunk in chunked(
+                instruments, self._settings.max_instruments_per_request
+            )
+        ]
+
+    def pop_empty_shards(self) -> List[int]:
+        empty_shard_ids = [
+            shard_id
+            for shard_id, subscriptions in self._subscriptions.items()
+            if not subscriptions
+        ]
+        # последний стрим оставляем, чтобы было куда отправлять служебные запросы
+        if len(empty_shard_ids) == len(self._subscriptions):
+            empty_shard_ids = empty_shard_ids[1:]
+        for shard_id in empty_shard_ids:
+            del self._subscriptions[shard_id]
+        return empty_shard_ids
+
+    def rebalance(self) -> ShardRequests:
+        """Перенести подписки наименее загруженного стрима в остальные."""
+        if len(self._subscriptions) < 2:
+            return []
+        source_id = min(self._subscriptions, key=self.get_load)
+        targets = [
+            shard_id for shard_id in self._subscriptions if shard_id != source_id
+        ]
+        if sum(map(self._free_capacity, targets)) < self.get_load(source_id):
+            return []
+
+        moves: Dict[Tuple[int, GroupKey, type], List[Any]] = {}
+        unsubscribes: Dict[Tuple[GroupKey, type], List[Any]] = {}
+        for key, subscription in list(self._subscriptions[source_id].items()):
+            target_id = max(targets, key=self._free_capacity)
+            del self._subscriptions[source_id][key]
+            self._subscriptions[target_id][key] = subscription
+            self._shard_by_subscription[key] = target_id
+            group = (subscription.group_key, subscription.request_type)
+            moves.setdefault((target_id, *group), []).append(subscription.instrument)
+            unsubscribes.setdefault(group, []).append(subscription.instrument)
+        logger.debug("Moving subscriptions of shard %s to other shards", source_id)
+
+        requests: ShardRequests = []
+        for (target_id, group_key, request_type), instruments in moves.items():
+            requests.extend(
+                self._make_requests(
+                    group_key,
+                    request_type,
+                    SubscriptionAction.SUBSCRIPTION_ACTION_SUBSCRIBE,
+                    {target_id: instruments},
+                )
+            )
+        for (group_key, request_type), instruments in unsubscribes.items():
+            requests.extend(
+                self._make_requests(
+                    group_key,
+                    request_type,
+                    SubscriptionAction.SUBSCRIPTION_ACTION_UNSUBSCRIBE,
+                    {source_id: instruments},
+                )
+            )
+        return requests
@@ -0,0 +1,272 @@
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar, Union
+
+import numpy as np
+
+from tinkoff.invest.market_data_stream.payload import get_payload
+from tinkoff.invest.schemas import (
+    GetTradingStatusResponse,
+    LastPrice,
+    MarketDataResponse,
+    Quotation,
+    SecurityTradingStatus,
+    TradingStatus,
+)
+from tinkoff.invest.services import MarketDataService
+from tinkoff.invest.utils import (
+    datetime_to_microseconds,
+    microseconds_to_datetime,
+    nano_to_quotation,
+    now,
+    quotation_to_nano,
+)
+
+__all__ = (
+    "LastPriceSnapshot",
+    "TradingStatusSnapshot",
+    "MarketSnapshotTable",
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class LastPriceSnapshot:
+    instrument_uid: str
+    price: Quotation
+    time: datetime
+    received_at: datetime
+
+
+@dataclass(frozen=True)
+class TradingStatusSnapshot:
+    instrument_uid: str
+    trading_status: SecurityTradingStatus
+    limit_order_available_flag: bool
+    market_order_available_flag: bool
+    received_at: datetime
+
+
+class MarketSnapshotTable:
+    """Последние цены и торговые статусы инструментов, индексированные по uid.
+
+    Таблица обновляется сообщениями last_price и trading_status стрима, а
+    get_last_prices() и get_trading_statuses() добирают отсутствующие или
+    устаревшие (старше max_age) значения одним запросом к MarketDataService:
+
+        table = MarketSnapshotTable(client.market_data, max_age=timedelta(minutes=1))
+        for marketdata in market_data_stream:
+            table.update_from_market_data(marketdata)
+        table.get_last_prices(instrument_uids)
+    """
+
+    def __init__(
+        self,
+        market_data_service: Optional[MarketDataService] = None,
+        max_age: Optional[timedelta] = None,
+        capacity: int = 1024,
+    ):
+        self._market_data_service = market_data_service
+        self._max_age = max_age
+        self._lock = threading.RLock()
+        self._row_by_uid: Dict[str, int] = {}
+        self._uids: List[str] = []
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        self._prices = np.zeros(capacity, dtype=np.int64)
+        self._price_times = np.zeros(capacity, dtype=np.int64)
+        self._price_received = np.zeros(capacity, dtype=np.int64)
+        self._has_price = np.zeros(capacity, dtype=bool)
+        self._statuses = np.zeros(capacity, dtype=np.int32)
+        self._limit_order_flags = np.zeros(capacity, dtype=bool)
+        self._market_order_flags = np.zeros(capacity, dtype=bool)
+        self._status_received = np.zeros(capacity, dtype=np.int64)
+        self._has_status = np.zeros(capacity, dtype=bool)
+
+    def _grow(self) -> None:
+        capacity = len(self._prices)
+        logger.debug("Growing market snapshot table capacity to %s", capacity * 2)
+        names = (
+            "_prices",
+            "_price_times",
+            "_price_received",
+            "_has_price",
+            "_statuses",
+            "_limit_order_flags",
+            "_market_order_flags",
+            "_status_received",
+            "_has_status",
+        )
+        old = {name: getattr(self, name) for name in names}
+        self._allocate(capacity * 2)
+        for name, values in old.items():
+            getattr(self, name)[:capacity] = values
+
+    def _get_or_create_row(self, instrument_uid: str) -> int:
+        row = self._row_by_uid.get(instrument_uid)
+        if row is None:
+            row = len(self._uids)
+            if row == len(self._prices):
+                self._grow()
+            self._row_by_uid[instrument_uid] = row
+            self._uids.append(instrument_uid)
+        return row
+
+    def __len__(self) -> int:
+        return len(self._uids)
+
+    def __contains__(self, instrument_uid: str) -> bool:
+        return instrument_uid in self._row_by_uid
+
+    def update_from_market_data(self, market_data: MarketDataResponse) -> bool:
+        payload_type, payload = get_payload(market_data)
+        if payload_type == "last_price":
+            self.update_last_price(payload)
+            return True
+        if payload_type == "trading_status":
+            self.update_trading_status(payload)
+            return True
+        return False
+
+    def update_last_price(
+        self, last_price: LastPrice, received_at: Optional[datetime] = None
+    ) -> None:
+        if not last_price.instrument_uid:
+            return
+        received = datetime_to_microseconds(received_at or now())
+        with self._lock:
+            row = self._get_or_create_row(last_price.instrument_uid)
+            price_time = datetime_to_microseconds(last_price.time)
+            if self._has_price[row] and price_time < self._price_times[row]:
+                return
+            self._prices[row] = quotation_to_nano(last_price.price)
+            self._price_times[row] = price_time
+            self._price_received[row] = received
+            self._has_price[row] = True
+
+    def update_trading_status(
+        self,
+        trading_status: Union[TradingStatus, GetTradingStatusResponse],
+        received_at: Optional[datetime] = None,
+    ) -> None:
+        if not trading_status.instrument_uid:
+            return
+        received = datetime_to_microseconds(received_at or now())
+        with self._lock:
+            row = self._get_or_create_row(trading_status.instrument_uid)
+            self._statuses[row] = trading_status.trading_status
+            self._limit_order_flags[row] = trading_status.limit_order_available_flag
+            self._market_order_flags[row] = trading_status.market_order_available_flag
+            self._status_received[row] = received
+            self._has_status[row] = True
+
+    def get_last_price(self, instrument_uid: str) -> Optional[LastPriceSnapshot]:
+        """Последняя цена из таблицы без обращения к API."""
+        with self._lock:
+            row = self._row_by_uid.get(instrument_uid)
+            if row is None or not self._has_price[row]:
+                return None
+            return LastPriceSnapshot(
+                instrument_uid=instrument_uid,
+                price=nano_to_quotation(int(self._prices[row])),
+                time=microseconds_to_datetime(self._price_times[row]),
+                received_at=microseconds_to_datetime(self._price_received[row]),
+            )
+
+    def get_trading_status(
+        self, instrument_uid: str
+    ) -> Optional[TradingStatusSnapshot]:
+        with self._lock:
+            row = self._row_by_uid.get(instrument_uid)
+            if row is None or not self._has_status[row]:
+                return None
+            return TradingStatusSnapshot(
+                instrument_uid=instrument_uid,
+                trading_status=SecurityTradingStatus(int(self._statuses[row])),
+                limit_order_available_flag=bool(self._limit_order_flags[row]),
+                market_order_available_flag=bool(self._market_order_flags[row]),
+                received_at=microseconds_to_datetime(self._status_received[row]),
+            )
+
+    def _get_cold(
+        self,
+        instrument_uids: Sequence[str],
+        has_value: np.ndarray,
+        received: np.ndarray,
+    ) -> List[str]:
+        min_received = (
+            None
+            if self._max_age is None
+            else datetime_to_microseconds(now() - self._max_age)
+        )
+        cold = []
+        for instrument_uid in instrument_uids:
+            row = self._row_by_uid.get(instrument_uid)
+            if (
+                row is None
+                or not has_value[row]
+                or (min_received is not None and received[row] < min_received)
+            ):
+                cold.append(instrument_uid)
+        return cold
+
+    def _require_service(self) -> MarketDataService:
+        if self._market_data_service is None:
+            raise ValueError("market_data_service is required to load cold values")
+        return self._market_data_service
+
+    def get_last_prices(
+        self, instrument_uids: Sequence[str]
+    ) -> Dict[str, LastPriceSnapshot]:
+        """Последние цены, отсутствующие и устаревшие загружаются одним запросом."""
+        with self._lock:
+            cold = self._get_cold(
+                instrument_uids, self._has_price, self._price_received
+            )
+        if cold:
+            logger.debug("Loading last prices of %s cold instruments", len(cold))
+            response = self._require_service().get_last_prices(instrument_id=cold)
+            received_at = now()
+            for last_price in response.last_prices:
+                self.update_last_price(last_price, received_at)
+        return self._collect(instrument_uids, self.get_last_price)
+
+    def get_trading_statuses(
+        self, instrument_uids: Sequence[str]
+    ) -> Dict[str, TradingStatusSnapshot]:
+        with self._lock:
+            cold = self._get_cold(
+                instrument_uids, self._has_status, self._status_received
+            )
+        if cold:
+            logger.debug("Loading trading statuses of %s cold instruments", len(cold))
+            response = self._require_service().get_trading_statuses(instrument_ids=cold)
+            received_at = now()
+            for trading_status in response.trading_statuses:
+                self.update_trading_status(trading_status, received_at)
+        return self._collect(instrument_uids, self.get_trading_status)
+
+    @staticmethod
+    def _collect(
+        instrument_uids: Sequence[str], getter: Callable[[str], Optional[T]]
+    ) -> Dict[str, T]:
+        result = {}
+        for instrument_uid in instrument_uids:
+            value = getter(instrument_uid)
+            if value is not None:
+                result[instrument_uid] = value
+        return result
+
+    def last_prices_array(self) -> Tuple[List[str], np.ndarray]:
+        """Цены всех инструментов в нано-единицах, -1 для инструментов без цены."""
+        with self._lock:
+            count = len(self._uids)
+            return list(self._uids), np.where(
+                self._has_price[:count], self._prices[:count], -1
+            )
@@ -0,0 +1,203 @@
+import dataclasses
+import logging
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from tinkoff.invest._grpc_helpers import PLACEHOLDER
+from tinkoff.invest.schemas import MarketDataRequest, SubscriptionAction
+
+__all__ = (
+    "SUBSCRIPTION_REQUEST_FIELDS",
+    "MAX_INSTRUMENTS_PER_REQUEST",
+    "get_subscription_request",
+    "coalesce_requests",
+    "SubscriptionState",
+)
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIPTION_REQUEST_FIELDS = (
+    "subscribe_candles_request",
+    "subscribe_order_book_request",
+    "subscribe_trades_request",
+    "subscribe_info_request",
+    "subscribe_last_price_request",
+)
+MAX_INSTRUMENTS_PER_REQUEST = 100
+
+_NOT_OPTION_FIELDS = frozenset(("subscription_action", "instruments"))
+
+# (поле запроса, параметры запроса кроме инструментов)
+GroupKey = Tuple[str, Tuple[Tuple[str, Any], ...]]
+
+
+def get_subscription_request(
+    market_data_request: MarketDataRequest,
+) -> Tuple[Optional[str], Any]:
+    for field_name in SUBSCRIPTION_REQUEST_FIELDS:
+        request = getattr(market_data_request, field_name, None)
+        if request is not None and request is not PLACEHOLDER:
+            return field_name, request
+    return None, None
+
+
+def get_group_key(field_name: str, request: Any) -> GroupKey:
+    return field_name, tuple(
+        (field.name, getattr(request, field.name))
+        for field in dataclasses.fields(request)
+        if field.name not in _NOT_OPTION_FIELDS
+    )
+
+
+def get_instrument_key(instrument: Any) -> Hashable:
+    return tuple(
+        getattr(instrument, field.name) for field in dataclasses.fields(instrument)
+    )
+
+
+def make_request(
+    group_key: GroupKey,
+    subscription_action: SubscriptionAction,
+    instruments: List[Any],
+    request_type: type,
+) -> MarketDataRequest:
+    field_name, options = group_key
+    return MarketDataRequest(
+        **{
+            field_name: request_type(
+                subscription_action=subscription_action,
+                instruments=instruments,
+                **dict(options),
+            )
+        }
+    )
+
+
+def chunked(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def coalesce_requests(
+    market_data_requests: List[MarketDataRequest],
+    max_instruments_per_request: int = MAX_INSTRUMENTS_PER_REQUEST,
+) -> List[MarketDataRequest]:
+    """Объединить запросы одного вида и действия в минимальное число сообщений.
+
+    Запрос присоединяется к последнему запросу того же вида, только если у них
+    совпадают действие и параметры, поэтому порядок subscribe/unsubscribe
+    одного вида сохраняется.
+    """
+    batches: List[Tuple[GroupKey, SubscriptionAction, type, Dict[Hashable, Any]]] = []
+    last_batch_by_field: Dict[str, int] = {}
+    other_requests = []
+    for market_data_request in market_data_requests:
+        field_name, request = get_subscription_request(market_data_request)
+        if field_name is None:
+            other_requests.append(market_data_request)
+            continue
+        group_key = get_group_key(field_name, request)
+        action = request.subscription_action
+        index = last_batch_by_field.get(field_name)
+        if index is None or batches[index][:2] != (group_key, action):
+            index = len(batches)
+            batches.append((group_key, action, type(request), {}))
+            last_batch_by_field[field_name] = index
+        instruments = batches[index][3]
+        for instrument in request.instruments:
+            instruments[get_instrument_key(instrument)] = instrument
+
+    coalesced = other_requests
+    for group_key, action, request_type, instruments in batches:
+        for chunk in chunked(list(instruments.values()), max_instruments_per_request):
+            coalesced.append(make_request(group_key, action, chunk, request_type))
+    if len(coalesced) < len(market_data_requests):
+        logger.debug(
+            "%s market data requests coalesced into %s",
+            len(market_data_requests),
+            len(coalesced),
+        )
+    return coalesced
+
+
+class SubscriptionState:
+    """Активные подписки стрима, собранные из запросов subscribe/unsubscribe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._instruments: Dict[GroupKey, Dict[Hashable, Any]] = {}
+        self._request_types: Dict[GroupKey, type] = {}
+        self._ping_settings: Any = None
+
+    def apply(self, market_data_request: MarketDataRequest) -> None:
+        ping_settings = getattr(market_data_request, "ping_settings", None)
+        if ping_settings is not None and ping_settings is not PLACEHOLDER:
+            with self._lock:
+                self._ping_settings = ping_settings
+            return
+
+        field_name, request = get_subscription_request(market_data_request)
+        if field_name is None:
+            return
+        with self._lock:
+            if (
+                request.subscription_action
+                == SubscriptionAction.SUBSCRIPTION_ACTION_UNSUBSCRIBE
+            ):
+                self._remove(field_name, request.instruments)
+            else:
+                self._add(field_name, request)
+
+    def _add(self, field_name: str, request: Any) -> None:
+        group_key = get_group_key(field_name, request)
+        self._request_types[group_key] = type(request)
+        instruments = self._instruments.setdefault(group_key, {})
+        for instrument in request.instruments:
+            instruments[get_instrument_key(instrument)] = instrument
+
+    def _remove(self, field_name: str, instruments: List[Any]) -> None:
+        instrument_keys = {get_instrument_key(instrument) for instrument in instruments}
+        for group_key in list(self._instruments):
+            if group_key[0] != field_name:
+                continue
+            group = self._instruments[group_key]
+            for instrument_key in instrument_keys:
+                group.pop(instrument_key, None)
+            if not group:
+                del self._instruments[group_key]
+                del self._request_types[group_key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(group) for group in self._instruments.values())
+
+    def is_empty(self) -> bool:
+        return len(self) == 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._instruments.clear()
+            self._request_types.clear()
+            self._ping_settings = None
+
+    def get_replay_requests(
+        self, max_instruments_per_request: int = MAX_INSTRUMENTS_PER_REQUEST
+    ) -> List[MarketDataRequest]:
+        """Минимальный набор запросов, восстанавливающий все подписки."""
+        with self._lock:
+            requests = []
+            if self._ping_settings is not None:
+                requests.append(MarketDataRequest(ping_settings=self._ping_settings))
+            for group_key, group in self._instruments.items():
+                for instruments in chunked(
+                    list(group.values()), max_instruments_per_request
+                ):
+                    requests.append(
+                        make_request(
+                            group_key,
+                            SubscriptionAction.SUBSCRIPTION_ACTION_SUBSCRIBE,
+                            instruments,
+                            self._request_types[group_key],
+                        )
+                    )
+            logger.debug("%s requests to replay subscriptions", len(requests))
+            return requests
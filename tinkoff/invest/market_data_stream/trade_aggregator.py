@@ -0,0 +1,346 @@
+import enum
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from tinkoff.invest.market_data_stream.payload import get_payload
+from tinkoff.invest.schemas import (
+    Candle,
+    CandleSource,
+    HistoricCandle,
+    MarketDataResponse,
+    SubscriptionInterval,
+    Trade,
+)
+from tinkoff.invest.utils import (
+    datetime_to_microseconds,
+    microseconds_to_datetime,
+    nano_to_quotation,
+    quotation_to_nano,
+)
+
+__all__ = (
+    "BarType",
+    "TradeAggregator",
+    "candle_to_historic_candle",
+)
+
+logger = logging.getLogger(__name__)
+
+
+class BarType(enum.Enum):
+    TIME = "time"
+    TICK = "tick"
+    VOLUME = "volume"
+
+
+def candle_to_historic_candle(candle: Candle, is_complete: bool) -> HistoricCandle:
+    return HistoricCandle(
+        open=candle.open,
+        high=candle.high,
+        low=candle.low,
+        close=candle.close,
+        volume=candle.volume,
+        time=candle.time,
+        is_complete=is_complete,
+        candle_source=candle.candle_source_type,
+    )
+
+
+class TradeAggregator:
+    """Собирает бары OHLCV из сделок стрима сразу по многим инструментам.
+
+    BarType.TIME — бары длительностью size (timedelta), выровненные от начала
+    эпохи; BarType.TICK — бары из size сделок; BarType.VOLUME — бары по size
+    лотов, границы которых проходят через каждые size лотов накопленного
+    объёма, поэтому сделка, пересекающая границу, остаётся в текущем баре.
+
+    Пачка сделок обрабатывается векторно, update() возвращает завершённые бары
+    в виде Candle, а незавершённые доступны через in_progress():
+
+        aggregator = TradeAggregator(BarType.TIME, timedelta(seconds=10))
+        for marketdata in market_data_stream:
+            for candle in aggregator.update_from_market_data(marketdata):
+                ...
+    """
+
+    def __init__(
+        self,
+        bar_type: BarType,
+        size: Union[int, timedelta],
+        capacity: int = 1024,
+    ):
+        if bar_type == BarType.TIME:
+            if not isinstance(size, timedelta):
+                raise ValueError("Time bars require timedelta size")
+            self._size = size // timedelta(microseconds=1)
+        else:
+            if isinstance(size, timedelta):
+                raise ValueError("Tick and volume bars require integer size")
+            self._size = size
+        if self._size <= 0:
+            raise ValueError("Bar size must be positive")
+        self._bar_type = bar_type
+        self._lock = threading.RLock()
+        self._row_by_instrument: Dict[str, int] = {}
+        self._instrument_by_row: List[str] = []
+        self._figi_by_row: List[str] = []
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        self._opens = np.zeros(capacity, dtype=np.int64)
+        self._highs = np.zeros(capacity, dtype=np.int64)
+        self._lows = np.zeros(capacity, dtype=np.int64)
+        self._closes = np.zeros(capacity, dtype=np.int64)
+        self._volumes = np.zeros(capacity, dtype=np.int64)
+        self._starts = np.zeros(capacity, dtype=np.int64)
+        self._last_trade_ts = np.zeros(capacity, dtype=np.int64)
+        self._keys = np.zeros(capacity, dtype=np.int64)
+        # накопленное число сделок или лотов для тиковых и объёмных баров
+        self._positions = np.zeros(capacity, dtype=np.int64)
+        self._active = np.zeros(capacity, dtype=bool)
+
+    def _grow(self) -> None:
+        capacity = len(self._active)
+        logger.debug("Growing trade aggregator capacity to %s", capacity * 2)
+        names = (
+            "_opens",
+            "_highs",
+            "_lows",
+            "_closes",
+            "_volumes",
+            "_starts",
+            "_last_trade_ts",
+            "_keys",
+            "_positions",
+            "_active",
+        )
+        old = {name: getattr(self, name) for name in names}
+        self._allocate(capacity * 2)
+        for name, values in old.items():
+            getattr(self, name)[:capacity] = values
+
+    def _get_or_create_row(self, trade: Trade) -> int:
+        instrument_id = trade.instrument_uid or trade.figi
+        row = self._row_by_instrument.get(instrument_id)
+        if row is None:
+            row = len(self._instrument_by_row)
+            if row == len(self._active):
+                self._grow()
+            self._row_by_instrument[instrument_id] = row
+            self._instrument_by_row.append(instrument_id)
+            self._figi_by_row.append(trade.figi)
+        return row
+
+    def update_from_market_data(self, market_data: MarketDataResponse) -> List[Candle]:
+        payload_type, trade = get_payload(market_data)
+        if payload_type != "trade":
+            return []
+        return self.update([trade])
+
+    def update(self, trades: Sequence[Trade]) -> List[Candle]:
+        """Добавить пачку сделок и вернуть бары, завершённые ею."""
+        if not trades:
+            return []
+        with self._lock:
+            return self._update(trades)
+
+    def _update(self, trades: Sequence[Trade]) -> List[Candle]:
+        count = len(trades)
+        rows = np.fromiter(
+            (self._get_or_create_row(trade) for trade in trades),
+            dtype=np.int64,
+            count=count,
+        )
+        times = np.fromiter(
+            (datetime_to_microseconds(trade.time) for trade in trades),
+            dtype=np.int64,
+            count=count,
+        )
+        prices = np.fromiter(
+            (quotation_to_nano(trade.price) for trade in trades),
+            dtype=np.int64,
+            count=count,
+        )
+        quantities = np.fromiter(
+            (trade.quantity for trade in trades), dtype=np.int64, count=count
+        )
+        order = np.lexsort((times, rows))
+        rows, times = rows[order], times[order]
+        prices, quantities = prices[order], quantities[order]
+
+        row_starts = np.r_[True, rows[1:] != rows[:-1]]
+        keys, positions_after = self._get_keys(rows, times, quantities, row_starts)
+
+        starts = np.flatnonzero(row_starts | np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], count] - 1
+        group_rows = rows[starts]
+        group_keys = keys[starts]
+        opens = prices[starts]
+        closes = prices[ends]
+        highs = np.maximum.reduceat(prices, starts)
+        lows = np.minimum.reduceat(prices, starts)
+        volumes = np.add.reduceat(quantities, starts)
+        bar_starts = (
+            group_keys.copy() if self._bar_type == BarType.TIME else times[starts]
+        )
+        last_trade_ts = times[ends]
+
+        first_of_row = row_starts[starts]
+        was_active = first_of_row & self._active[group_rows]
+        continues = was_active & (group_keys == self._keys[group_rows])
+        merged = group_rows[continues]
+        opens[continues] = self._opens[merged]
+        highs[continues] = np.maximum(highs[continues], self._highs[merged])
+        lows[continues] = np.minimum(lows[continues], self._lows[merged])
+        volumes[continues] += self._volumes[merged]
+        bar_starts[continues] = self._starts[merged]
+
+        completed: List[Tuple[int, Candle]] = [
+            (int(self._starts[row]), self._make_state_candle(row))
+            for row in group_rows[was_active & ~continues].tolist()
+        ]
+
+        last_of_row = np.r_[group_rows[1:] != group_rows[:-1], True]
+        if self._bar_type == BarType.TIME:
+            is_full = np.zeros(len(starts), dtype=bool)
+        else:
+            is_full = positions_after[ends] >= (group_keys + 1) * self._size
+        is_done = ~last_of_row | is_full
+        for index in np.flatnonzero(is_done).tolist():
+            completed.append(
+                (
+                    int(bar_starts[index]),
+                    self._make_candle(
+                        int(group_rows[index]),
+                        int(opens[index]),
+                        int(highs[index]),
+                        int(lows[index]),
+                        int(closes[index]),
+                        int(volumes[index]),
+                        int(bar_starts[index]),
+                        int(last_trade_ts[index]),
+                    ),
+                )
+            )
+
+        pending = last_of_row & ~is_full
+        pending_rows = group_rows[pending]
+        self._opens[pending_rows] = opens[pending]
+        self._highs[pending_rows] = highs[pending]
+        self._lows[pending_rows] = lows[pending]
+        self._closes[pending_rows] = closes[pending]
+        self._volumes[pending_rows] = volumes[pending]
+        self._starts[pending_rows] = bar_starts[pending]
+        self._last_trade_ts[pending_rows] = last_trade_ts[pending]
+        self._keys[pending_rows] = group_keys[pending]
+        self._active[pending_rows] = True
+        self._active[group_rows[last_of_row & is_full]] = False
+        if self._bar_type != BarType.TIME:
+            row_ends = np.r_[rows[1:] != rows[:-1], True]
+            self._positions[rows[row_ends]] = positions_after[row_ends]
+
+        completed.sort(key=lambda item: item[0])
+        return [candle for _, candle in completed]
+
+    def _get_keys(
+        self,
+        rows: np.ndarray,
+        times: np.ndarray,
+        quantities: np.ndarray,
+        row_starts: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Ключ бара для каждой сделки и накопленная позиция после сделки."""
+        if self._bar_type == BarType.TIME:
+            keys = times - times % self._size
+            # опоздавшие сделки попадают в текущий бар
+            active = self._active[rows]
+            keys = np.where(active, np.maximum(keys, self._keys[rows]), keys)
+            return keys, keys
+
+        increments = (
+            np.ones_like(quantities) if self._bar_type == BarType.TICK else quantities
+        )
+        cumulative = np.cumsum(increments)
+        row_first = np.maximum.accumulate(np.where(row_starts, np.arange(len(rows)), 0))
+        before_in_batch = cumulative - increments - (cumulative - increments)[row_first]
+        positions_before = self._positions[rows] + before_in_batch
+        return positions_before // self._size, positions_before + increments
+
+    def _make_candle(
+        self,
+        row: int,
+        open_: int,
+        high: int,
+        low: int,
+        close: int,
+        volume: int,
+        start: int,
+        last_trade_ts: int,
+    ) -> Candle:
+        return Candle(
+            figi=self._figi_by_row[row],
+            interval=SubscriptionInterval.SUBSCRIPTION_INTERVAL_UNSPECIFIED,
+            open=nano_to_quotation(open_),
+            high=nano_to_quotation(high),
+            low=nano_to_quotation(low),
+            close=nano_to_quotation(close),
+            volume=volume,
+            time=microseconds_to_datetime(start),
+            last_trade_ts=microseconds_to_datetime(last_trade_ts),
+            instrument_uid=self._instrument_by_row[row],
+            candle_source_type=CandleSource.CANDLE_SOURCE_UNSPECIFIED,
+        )
+
+    def _make_state_candle(self, row: int) -> Candle:
+        return self._make_candle(
+            row,
+            int(self._opens[row]),
+            int(self._highs[row]),
+            int(self._lows[row]),
+            int(self._closes[row]),
+            int(self._volumes[row]),
+            int(self._starts[row]),
+            int(self._last_trade_ts[row]),
+        )
+
+    def in_progress(self, instrument_id: str) -> Optional[Candle]:
+        """Незавершённый бар инструмента."""
+        with self._lock:
+            row = self._row_by_instrument.get(instrument_id)
+            if row is None or not self._active[row]:
+                return None
+            return self._make_state_candle(row)
+
+    def in_progress_bars(self) -> List[Candle]:
+        with self._lock:
+            count = len(self._instrument_by_row)
+            return [
+                self._make_state_candle(row)
+                for row in np.flatnonzero(self._active[:count]).tolist()
+            ]
+
+    def close_expired(self, now: datetime) -> List[Candle]:
+        """Завершить временные бары, интервал которых закончился к now."""
+        if self._bar_type != BarType.TIME:
+            return []
+        with self._lock:
+            count = len(self._instrument_by_row)
+            expired = self._active[:count] & (
+                self._starts[:count] + self._size <= datetime_to_microseconds(now)
+            )
+            return self._close_rows(np.flatnonzero(expired))
+
+    def flush(self) -> List[Candle]:
+        """Завершить все незавершённые бары."""
+        with self._lock:
+            count = len(self._instrument_by_row)
+            return self._close_rows(np.flatnonzero(self._active[:count]))
+
+    def _close_rows(self, rows: np.ndarray) -> List[Candle]:
+        candles = [self._make_state_candle(row) for row in rows.tolist()]
+        self._active[rows] = False
+        return candles
@@ -28,7 +28,14 @@ from .grpc import (
     users_pb2_grpc,
 )
 from .logging import get_tracking_id_from_call, log_request
+from .market_data_stream.latency import StreamLatencyStats
 from .market_data_stream.market_data_stream_manager import MarketDataStreamManager
+from .market_data_stream.payload import RawPayloadFilter, get_raw_payload_key
+from .market_data_stream.reconnect import GapCallback, ReconnectSettings
+from .market_data_stream.sharded_market_data_stream_manager import (
+    ShardedMarketDataStreamManager,
+)
+from .market_data_stream.sharding import ShardingSettings
 from .metadata import get_metadata
 from .schemas import (
     AssetRequest,
@@ -255,9 +262,26 @@ class Services:
         self.stop_orders = StopOrdersService(channel, metadata)
         self.signals = SignalService(channel, metadata)
 
-    def create_market_data_stream(self) -> MarketDataStreamManager:
+    def create_market_data_stream(
+        self,
+        reconnect_settings: Optional[ReconnectSettings] = None,
+        on_gap: Optional[GapCallback] = None,
+        payload_filter: Optional[RawPayloadFilter] = None,
+        latency_stats: Optional[StreamLatencyStats] = None,
+    ) -> MarketDataStreamManager:
         return MarketDataStreamManager(
-            market_data_stream_service=self.market_data_stream
+            market_data_stream_service=self.market_data_stream,
+            reconnect_settings=reconnect_settings,
+            on_gap=on_gap,
+            payload_filter=payload_filter,
+            latency_stats=latency_stats,
+        )
+
+    def create_sharded_market_data_stream(
+        self, settings: Optional[ShardingSettings] = None
+    ) -> ShardedMarketDataStreamManager:
+        return ShardedMarketDataStreamManager(
+            market_data_stream_service=self.market_data_stream, settings=settings
         )
 
     def cancel_all_orders(self, account_id: AccountId) -> None:
@@ -1205,12 +1229,25 @@ class MarketDataStreamService(_grpc_helpers.Service):
     def market_data_stream(
         self,
         request_iterator: Iterable[MarketDataRequest],
+        payload_filter: Optional[RawPayloadFilter] = None,
+        latency_stats: Optional[StreamLatencyStats] = None,
     ) -> Iterator[MarketDataResponse]:
         for response in self.stub.MarketDataStream(
             request_iterator=self._convert_market_data_stream_request(request_iterator),
             metadata=self.metadata,
         ):
-            yield _grpc_helpers.protobuf_to_dataclass(response, MarketDataResponse)
+            if payload_filter is not None and not payload_filter(
+                *get_raw_payload_key(response)
+            ):
+                continue
+            if latency_stats is None:
+                yield _grpc_helpers.protobuf_to_dataclass(response, MarketDataResponse)
+                continue
+            with latency_stats.measure(response):
+                market_data = _grpc_helpers.protobuf_to_dataclass(
+                    response, MarketDataResponse
+                )
+            yield market_data
 
     @staticmethod
     def _convert_market_data_server_side_stream_request(
@@ -0,0 +1,139 @@
+import enum
+import logging
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Collection, Dict, Iterator, Optional, Type, Union
+
+from tinkoff.invest.exceptions import StreamRecordingError
+from tinkoff.invest.grpc import marketdata_pb2, operations_pb2, orders_pb2
+
+__all__ = (
+    "RecordType",
+    "Record",
+    "RecordWriter",
+    "read_records",
+)
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TINVREC1"
+# тип сообщения, время получения в наносекундах, длина сообщения
+RECORD_HEADER = struct.Struct("<BqI")
+
+PathType = Union[str, "os.PathLike[str]"]
+
+
+class RecordType(enum.IntEnum):
+    MARKET_DATA = 1
+    ORDER_STATE = 2
+    PORTFOLIO = 3
+    POSITIONS = 4
+    TRADES = 5
+
+
+RECORD_MESSAGE_TYPES: Dict[RecordType, Type[Any]] = {
+    RecordType.MARKET_DATA: marketdata_pb2.MarketDataResponse,
+    RecordType.ORDER_STATE: orders_pb2.OrderStateStreamResponse,
+    RecordType.PORTFOLIO: operations_pb2.PortfolioStreamResponse,
+    RecordType.POSITIONS: operations_pb2.PositionsStreamResponse,
+    RecordType.TRADES: orders_pb2.TradesStreamResponse,
+}
+
+
+@dataclass(frozen=True)
+class Record:
+    record_type: RecordType
+    received_at_ns: int
+    data: bytes
+
+    def parse(self) -> Any:
+        return RECORD_MESSAGE_TYPES[self.record_type].FromString(self.data)
+
+
+class RecordWriter:
+    """Дописывает сообщения стримов в файл записи.
+
+    Каждая запись: заголовок RECORD_HEADER и сериализованное protobuf-сообщение.
+    """
+
+    def __init__(self, path: PathType, flush_every: int = 1000):
+        self._file: BinaryIO = open(path, "ab")  # pylint:disable=consider-using-with
+        self._flush_every = flush_every
+        self._lock = threading.Lock()
+        self._unflushed = 0
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+    def write(
+        self,
+        record_type: RecordType,
+        data: bytes,
+        received_at_ns: Optional[int] = None,
+    ) -> None:
+        if received_at_ns is None:
+            received_at_ns = time.time_ns()
+        header = RECORD_HEADER.pack(record_type, received_at_ns, len(data))
+        with self._lock:
+            self._file.write(header + data)
+            self._unflushed += 1
+            if self._unflushed >= self._flush_every:
+                self._flush()
+
+    def write_message(self, record_type: RecordType, message: Any) -> None:
+        self.write(record_type, message.SerializeToString())
+
+    def _flush(self) -> None:
+        self._file.flush()
+        self._unflushed = 0
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def read_records(
+    path: PathType, record_types: Optional[Collection[RecordType]] = None
+) -> Iterator[Record]:
+    """Записи файла по порядку.
+
+    Оборванная последняя запись и записи неизвестных типов пропускаются.
+    """
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise StreamRecordingError(f"{path} is not a stream recording")
+        while True:
+            offset = file.tell()
+            header = file.read(RECORD_HEADER.size)
+            if not header:
+                return
+            if len(header) < RECORD_HEADER.size:
+                logger.warning("Truncated record header in %s", path)
+                return
+            record_type, received_at_ns, size = RECORD_HEADER.unpack(header)
+            data = file.read(size)
+            if len(data) < size:
+                logger.warning("Truncated record in %s", path)
+                return
+            if record_type not in RECORD_MESSAGE_TYPES:
+                logger.warning(
+                    "Skipping record of unknown type %s at offset %s in %s",
+                    record_type,
+                    offset,
+                    path,
+                )
+                continue
+            if record_types is None or record_type in record_types:
+                yield Record(RecordType(record_type), received_at_ns, data)
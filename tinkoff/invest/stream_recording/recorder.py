@@ -0,0 +1,120 @@
+from typing import Any, AsyncIterator, Callable, Dict, Iterator
+
+from tinkoff.invest.stream_recording.format import RecordType, RecordWriter
+
+__all__ = (
+    "STREAM_RECORD_TYPES",
+    "record_service",
+    "record_async_service",
+)
+
+# методы grpc-стабов со стримами ответов
+STREAM_RECORD_TYPES: Dict[str, RecordType] = {
+    "MarketDataStream": RecordType.MARKET_DATA,
+    "MarketDataServerSideStream": RecordType.MARKET_DATA,
+    "OrderStateStream": RecordType.ORDER_STATE,
+    "PortfolioStream": RecordType.PORTFOLIO,
+    "PositionsStream": RecordType.POSITIONS,
+    "TradesStream": RecordType.TRADES,
+}
+
+
+def _cancel(call: Any) -> None:
+    cancel = getattr(call, "cancel", None)
+    if cancel is not None:
+        cancel()
+
+
+class _RecordingMultiCallable:
+    """Получает ответы стрима байтами, записывает их и только потом разбирает."""
+
+    def __init__(
+        self,
+        multi_callable: Any,
+        record_type: RecordType,
+        response_deserializer: Callable[[bytes], Any],
+        writer: RecordWriter,
+    ):
+        self._multi_callable = multi_callable
+        self._record_type = record_type
+        self._response_deserializer = response_deserializer
+        self._writer = writer
+
+    def __call__(self, *args, **kwargs) -> Iterator[Any]:
+        call = self._multi_callable(*args, **kwargs)
+        try:
+            for data in call:
+                self._writer.write(self._record_type, data)
+                yield self._response_deserializer(data)
+        finally:
+            _cancel(call)
+
+
+class _AsyncRecordingMultiCallable(_RecordingMultiCallable):
+    async def __call__(  # type: ignore[override]
+        self, *args, **kwargs
+    ) -> AsyncIterator[Any]:
+        call = self._multi_callable(*args, **kwargs)
+        try:
+            async for data in call:
+                self._writer.write(self._record_type, data)
+                yield self._response_deserializer(data)
+        finally:
+            _cancel(call)
+
+
+class _RecordingChannel:
+    """Канал, у стримов которого grpc не разбирает ответы."""
+
+    _multi_callable_factory = _RecordingMultiCallable
+
+    def __init__(self, channel: Any, writer: RecordWriter):
+        self._channel = channel
+        self._writer = writer
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._channel, name)
+
+    def unary_stream(self, method: str, **kwargs) -> Any:
+        return self._create_multi_callable(self._channel.unary_stream, method, kwargs)
+
+    def stream_stream(self, method: str, **kwargs) -> Any:
+        return self._create_multi_callable(self._channel.stream_stream, method, kwargs)
+
+    def _create_multi_callable(
+        self, factory: Callable[..., Any], method: str, kwargs: Dict[str, Any]
+    ) -> Any:
+        record_type = STREAM_RECORD_TYPES.get(method.rsplit("/", 1)[-1])
+        if record_type is None:
+            return factory(method, **kwargs)
+        response_deserializer = kwargs.pop("response_deserializer")
+        multi_callable = factory(method, response_deserializer=None, **kwargs)
+        return self._multi_callable_factory(
+            multi_callable, record_type, response_deserializer, self._writer
+        )
+
+
+class _AsyncRecordingChannel(_RecordingChannel):
+    _multi_callable_factory = _AsyncRecordingMultiCallable
+
+
+def record_service(service: Any, writer: RecordWriter) -> None:
+    """Записывать ответы стримов сервиса в том виде, в котором их прислал сервер.
+
+    Стаб сервиса пересоздаётся поверх канала, который отдаёт ответы байтами:
+    они пишутся в файл без повторной сериализации и разбираются один раз.
+
+    with RecordWriter("market_data.rec") as writer:
+        record_service(client.market_data_stream, writer)
+        for marketdata in client.create_market_data_stream():
+            ...
+    """
+    service.stub = service._stub_factory(  # pylint:disable=protected-access
+        _RecordingChannel(service.channel, writer)
+    )
+
+
+def record_async_service(service: Any, writer: RecordWriter) -> None:
+    service.stub = service._stub_factory(  # pylint:disable=protected-access
+        _AsyncRecordingChannel(service.channel, writer)
+    )
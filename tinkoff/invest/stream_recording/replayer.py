@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Callable, Collection, Iterator, Optional
+
+from tinkoff.invest.stream_recording.format import (
+    PathType,
+    Record,
+    RecordType,
+    read_records,
+)
+from tinkoff.invest.stream_recording.recorder import STREAM_RECORD_TYPES
+
+__all__ = (
+    "StreamReplayer",
+    "replay_service",
+    "replay_async_service",
+)
+
+logger = logging.getLogger(__name__)
+
+_NANOSECONDS = 1_000_000_000
+
+
+class StreamReplayer:
+    """Воспроизводит файл записи с исходными интервалами между сообщениями.
+
+    speed=1.0 соответствует реальному времени, speed=10.0 ускоряет
+    воспроизведение в 10 раз, а speed=None отдаёт сообщения без пауз.
+    """
+
+    def __init__(
+        self,
+        path: PathType,
+        speed: Optional[float] = 1.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive")
+        self._path = path
+        self._speed = speed
+        self._sleep = sleep
+
+    def _get_delay(
+        self, record: Record, first_received_at_ns: int, started_at: float
+    ) -> float:
+        assert self._speed is not None  # noqa:S101 # nosec
+        offset = (record.received_at_ns - first_received_at_ns) / _NANOSECONDS
+        return offset / self._speed - (time.monotonic() - started_at)
+
+    def iter_records(
+        self, record_types: Optional[Collection[RecordType]] = None
+    ) -> Iterator[Record]:
+        first_received_at_ns: Optional[int] = None
+        started_at = time.monotonic()
+        for record in read_records(self._path, record_types):
+            if self._speed is not None:
+                if first_received_at_ns is None:
+                    first_received_at_ns = record.received_at_ns
+                delay = self._get_delay(record, first_received_at_ns, started_at)
+                if delay > 0:
+                    self._sleep(delay)
+            yield record
+
+    async def aiter_records(
+        self, record_types: Optional[Collection[RecordType]] = None
+    ) -> AsyncIterator[Record]:
+        first_received_at_ns: Optional[int] = None
+        started_at = time.monotonic()
+        for record in read_records(self._path, record_types):
+            if self._speed is not None:
+                if first_received_at_ns is None:
+                    first_received_at_ns = record.received_at_ns
+                delay = self._get_delay(record, first_received_at_ns, started_at)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield record
+
+    def iter_messages(self, record_type: RecordType) -> Iterator[Any]:
+        for record in self.iter_records((record_type,)):
+            yield record.parse()
+
+    async def aiter_messages(self, record_type: RecordType) -> AsyncIterator[Any]:
+        async for record in self.aiter_records((record_type,)):
+            yield record.parse()
+
+
+class _ReplayStub:
+    """Стаб, отдающий записанные ответы вместо обращения к серверу.
+
+    Запросы клиента не отправляются и на воспроизведение не влияют.
+    """
+
+    def __init__(self, replayer: StreamReplayer):
+        self._replayer = replayer
+
+    def __getattr__(self, name: str) -> Any:
+        record_type = STREAM_RECORD_TYPES.get(name)
+        if record_type is None:
+            raise AttributeError(f"{name} is not available in replay")
+
+        def stream(*args, **kwargs) -> Iterator[Any]:
+            logger.debug("Replaying %s", name)
+            return self._replayer.iter_messages(record_type)
+
+        return stream
+
+
+class _AsyncReplayStub(_ReplayStub):
+    def __getattr__(self, name: str) -> Any:
+        record_type = STREAM_RECORD_TYPES.get(name)
+        if record_type is None:
+            raise AttributeError(f"{name} is not available in replay")
+
+        def stream(*args, **kwargs) -> AsyncIterator[Any]:
+            logger.debug("Replaying %s", name)
+            return self._replayer.aiter_messages(record_type)
+
+        return stream
+
+
+def replay_service(service: Any, replayer: StreamReplayer) -> None:
+    """Подменить стаб сервиса воспроизведением записи.
+
+    replay_service(client.market_data_stream, StreamReplayer(path, speed=None))
+    for marketdata in client.create_market_data_stream():
+        ...
+    """
+    service.stub = _ReplayStub(replayer)
+
+
+def replay_async_service(service: Any, replayer: StreamReplayer) -> None:
+    service.stub = _AsyncReplayStub(replayer)
@@ -0,0 +1,356 @@
+import asyncio
+import dataclasses
+import enum
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    TypeVar,
+)
+
+from tinkoff.invest._grpc_helpers import PLACEHOLDER
+from tinkoff.invest.exceptions import StreamStalledError
+from tinkoff.invest.utils import now
+
+__all__ = (
+    "StallAction",
+    "StallKind",
+    "StreamStall",
+    "StreamStats",
+    "WatchdogSettings",
+    "StreamWatchdog",
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class StallAction(enum.Enum):
+    CALLBACK = "callback"
+    RAISE = "raise"
+    RECONNECT = "reconnect"
+
+
+class StallKind(enum.Enum):
+    # не приходят никакие сообщения, включая ping
+    MESSAGES = "messages"
+    # приходят только ping
+    DATA = "data"
+
+
+@dataclasses.dataclass(frozen=True)
+class StreamStall:
+    stream_name: str
+    kind: StallKind
+    stalled_for: timedelta
+    detected_at: datetime
+
+
+StallCallback = Callable[[StreamStall], None]
+
+
+@dataclasses.dataclass()
+class WatchdogSettings:
+    stall_timeout: timedelta = timedelta(seconds=30)
+    data_stall_timeout: Optional[timedelta] = None
+    check_interval: timedelta = timedelta(seconds=1)
+    action: StallAction = StallAction.RAISE
+    on_stall: Optional[StallCallback] = None
+    buffer_size: int = 10_000
+
+
+@dataclasses.dataclass()
+class StreamStats:
+    messages: int = 0
+    pings: int = 0
+    stalls: int = 0
+    reconnects: int = 0
+    max_gap: timedelta = timedelta()
+    last_message_at: Optional[datetime] = None
+    last_data_at: Optional[datetime] = None
+
+
+def _is_ping(message: Any) -> bool:
+    ping = getattr(message, "ping", None)
+    return ping is not None and ping is not PLACEHOLDER
+
+
+class _StreamState:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.stats = StreamStats()
+        self.reset()
+
+    def reset(self) -> None:
+        self.last_message = time.monotonic()
+        self.last_data = self.last_message
+        self.stalled = False
+
+    def on_message(self, message: Any) -> None:
+        received = time.monotonic()
+        received_at = now()
+        with self.lock:
+            gap = timedelta(seconds=received - self.last_message)
+            self.stats.max_gap = max(self.stats.max_gap, gap)
+            self.stats.messages += 1
+            self.stats.last_message_at = received_at
+            self.last_message = received
+            self.stalled = False
+            if _is_ping(message):
+                self.stats.pings += 1
+            else:
+                self.stats.last_data_at = received_at
+                self.last_data = received
+
+    def check(
+        self, stream_name: str, settings: WatchdogSettings, backlogged: bool
+    ) -> Optional[StreamStall]:
+        """Проверить паузу в стриме.
+
+        Если в буфере есть непрочитанные сообщения, поток чтения может ждать
+        медленного потребителя, поэтому отсутствие сообщений не проверяется.
+        """
+        current = time.monotonic()
+        with self.lock:
+            if self.stalled:
+                return None
+            kind = None
+            stalled_for = current - self.last_message
+            if not backlogged and stalled_for >= settings.stall_timeout.total_seconds():
+                kind = StallKind.MESSAGES
+            elif settings.data_stall_timeout is not None:
+                stalled_for = current - self.last_data
+                if stalled_for >= settings.data_stall_timeout.total_seconds():
+                    kind = StallKind.DATA
+            if kind is None:
+                return None
+            self.stalled = True
+            self.stats.stalls += 1
+        return StreamStall(
+            stream_name=stream_name,
+            kind=kind,
+            stalled_for=timedelta(seconds=stalled_for),
+            detected_at=now(),
+        )
+
+
+class _End:
+    pass
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class _StreamReader:
+    """Читает стрим в отдельном потоке в ограниченный буфер.
+
+    После stop() поток больше не читает стрим и не пишет в буфер, поэтому
+    брошенный при переподключении поток не забирает сообщения и не зависает
+    на заполненном буфере.
+    """
+
+    _PUT_TIMEOUT = 0.1
+
+    def __init__(self, stream: Iterable[Any], state: _StreamState, buffer_size: int):
+        self._stream = stream
+        self._state = state
+        self._stopped = threading.Event()
+        self.buffer: "queue.Queue[Any]" = queue.Queue(maxsize=buffer_size)
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _put(self, item: Any) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.buffer.put(item, timeout=self._PUT_TIMEOUT)
+                return
+            except queue.Full:
+                continue
+
+    def run(self) -> None:
+        try:
+            iterator = iter(self._stream)
+            while not self._stopped.is_set():
+                try:
+                    message = next(iterator)
+                except StopIteration:
+                    self._put(_End())
+                    return
+                if self._stopped.is_set():
+                    return
+                self._state.on_message(message)
+                self._put(message)
+        except Exception as e:  # pylint:disable=broad-except
+            self._put(_Failure(e))
+
+
+class StreamWatchdog:
+    """Следит за паузами в стримах и реагирует на их зависание.
+
+    Стрим вычитывается в отдельном потоке (или задаче), поэтому зависание
+    обнаруживается, даже когда чтение из стрима заблокировано. Если дольше
+    stall_timeout не приходит ни одного сообщения (или дольше
+    data_stall_timeout приходят только ping), выполняется settings.action:
+    вызывается on_stall, выбрасывается StreamStalledError или стрим
+    переоткрывается через reconnect:
+
+        watchdog = StreamWatchdog(WatchdogSettings(action=StallAction.RECONNECT))
+        market_data_stream = client.create_market_data_stream()
+        for marketdata in watchdog.watch(
+            market_data_stream, "market_data", reconnect=market_data_stream.reconnect
+        ):
+            ...
+    """
+
+    def __init__(self, settings: Optional[WatchdogSettings] = None):
+        self._settings = settings or WatchdogSettings()
+        self._lock = threading.Lock()
+        self._streams: Dict[str, _StreamState] = {}
+
+    def _register(self, name: str, reconnect: Optional[Callable]) -> _StreamState:
+        if self._settings.action == StallAction.RECONNECT and reconnect is None:
+            raise ValueError("reconnect is required for StallAction.RECONNECT")
+        with self._lock:
+            state = self._streams.setdefault(name, _StreamState())
+        state.reset()
+        return state
+
+    def get_stats(self, name: str) -> StreamStats:
+        state = self._streams[name]
+        with state.lock:
+            return dataclasses.replace(state.stats)
+
+    def get_all_stats(self) -> Dict[str, StreamStats]:
+        return {name: self.get_stats(name) for name in list(self._streams)}
+
+    def _handle_stall(self, stall: StreamStall, state: _StreamState) -> bool:
+        """Обработать зависание. True, если стрим нужно переоткрыть."""
+        logger.warning(
+            "Stream %s stalled for %s (%s)",
+            stall.stream_name,
+            stall.stalled_for,
+            stall.kind.value,
+        )
+        if self._settings.on_stall is not None:
+            self._settings.on_stall(stall)
+        if self._settings.action == StallAction.RAISE:
+            raise StreamStalledError(stall)
+        if self._settings.action == StallAction.RECONNECT:
+            with state.lock:
+                state.stats.reconnects += 1
+            state.reset()
+            return True
+        return False
+
+    def _start_reader(
+        self, stream: Iterable[Any], name: str, state: _StreamState
+    ) -> "_StreamReader":
+        reader = _StreamReader(stream, state, self._settings.buffer_size)
+        threading.Thread(
+            target=reader.run, name=f"StreamWatchdog-{name}", daemon=True
+        ).start()
+        return reader
+
+    def watch(
+        self,
+        stream: Iterable[T],
+        name: str,
+        reconnect: Optional[Callable[[], Iterable[T]]] = None,
+    ) -> Iterator[T]:
+        state = self._register(name, reconnect)
+        timeout = self._settings.check_interval.total_seconds()
+        reader = self._start_reader(stream, name, state)
+        next_check = time.monotonic() + timeout
+        try:
+            while True:
+                try:
+                    item = reader.buffer.get(timeout=timeout)
+                except queue.Empty:
+                    pass
+                else:
+                    if isinstance(item, _End):
+                        return
+                    if isinstance(item, _Failure):
+                        raise item.error
+                    yield item
+                current = time.monotonic()
+                if current < next_check:
+                    continue
+                next_check = current + timeout
+                stall = state.check(name, self._settings, not reader.buffer.empty())
+                if stall is not None and self._handle_stall(stall, state):
+                    assert reconnect is not None  # noqa:S101 # nosec
+                    # старый поток завершится, когда чтение мёртвого стрима вернётся
+                    reader.stop()
+                    reader = self._start_reader(reconnect(), name, state)
+        finally:
+            reader.stop()
+
+    async def _read_async(
+        self,
+        stream: AsyncIterable[Any],
+        state: _StreamState,
+        buffer: "asyncio.Queue[Any]",
+    ) -> None:
+        try:
+            async for message in stream:
+                state.on_message(message)
+                await buffer.put(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:  # pylint:disable=broad-except
+            await buffer.put(_Failure(e))
+        else:
+            await buffer.put(_End())
+
+    async def watch_async(
+        self,
+        stream: AsyncIterable[T],
+        name: str,
+        reconnect: Optional[Callable[[], AsyncIterable[T]]] = None,
+    ) -> AsyncIterator[T]:
+        state = self._register(name, reconnect)
+        timeout = self._settings.check_interval.total_seconds()
+        buffer: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=self._settings.buffer_size)
+        reader = asyncio.create_task(self._read_async(stream, state, buffer))
+        next_check = time.monotonic() + timeout
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(buffer.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                else:
+                    if isinstance(item, _End):
+                        return
+                    if isinstance(item, _Failure):
+                        raise item.error
+                    yield item
+                current = time.monotonic()
+                if current < next_check:
+                    continue
+                next_check = current + timeout
+                stall = state.check(name, self._settings, not buffer.empty())
+                if stall is not None and self._handle_stall(stall, state):
+                    assert reconnect is not None  # noqa:S101 # nosec
+                    reader.cancel()
+                    buffer = asyncio.Queue(maxsize=self._settings.buffer_size)
+                    reader = asyncio.create_task(
+                        self._read_async(reconnect(), state, buffer)
+                    )
+        finally:
+            reader.cancel()
@@ -8,13 +8,25 @@ from typing import Any, Callable, Generator, Iterable, List, Protocol, Tuple
 
 import dateutil.parser
 
-from .schemas import CandleInterval, HistoricCandle, Quotation, SubscriptionInterval
+from .schemas import (
+    CandleInterval,
+    HistoricCandle,
+    MoneyValue,
+    Quotation,
+    SubscriptionInterval,
+)
 
 __all__ = (
     "get_intervals",
     "quotation_to_decimal",
     "money_to_decimal",
     "decimal_to_quotation",
+    "quotation_to_nano",
+    "nano_to_quotation",
+    "nano_to_money",
+    "nano_to_decimal",
+    "datetime_to_microseconds",
+    "microseconds_to_datetime",
     "candle_interval_to_subscription_interval",
     "now",
     "candle_interval_to_timedelta",
@@ -77,6 +89,44 @@ def money_to_decimal(money: MoneyProtocol) -> Decimal:
     return Decimal(money.units) + fractional
 
 
+_NANO = 1_000_000_000
+_UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def quotation_to_nano(quotation: MoneyProtocol) -> int:
+    """Цена в целых нано-единицах, удобная для массивов numpy."""
+    return quotation.units * _NANO + quotation.nano
+
+
+def _split_nano(value: int) -> Tuple[int, int]:
+    units = -(-value // _NANO) if value < 0 else value // _NANO
+    return units, value - units * _NANO
+
+
+def nano_to_quotation(value: int) -> Quotation:
+    units, nano = _split_nano(value)
+    return Quotation(units=units, nano=nano)
+
+
+def nano_to_money(value: int, currency: str) -> MoneyValue:
+    units, nano = _split_nano(value)
+    return MoneyValue(currency=currency, units=units, nano=nano)
+
+
+def nano_to_decimal(value: int) -> Decimal:
+    return Decimal(value).scaleb(-9)
+
+
+def datetime_to_microseconds(value: datetime) -> int:
+    """Микросекунды от начала эпохи для datetime с часовым поясом."""
+    return (value - _UNIX_EPOCH) // _MICROSECOND
+
+
+def microseconds_to_datetime(value: int) -> datetime:
+    return _UNIX_EPOCH + int(value) * _MICROSECOND
+
+
 # fmt: off
 _CANDLE_INTERVAL_TO_SUBSCRIPTION_INTERVAL_MAPPING = {
     CandleInterval.CANDLE_INTERVAL_1_MIN: